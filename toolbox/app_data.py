@@ -17,6 +17,7 @@ class AppData:
     else:
         APP_PATH = os.path.dirname(__file__)
     APP_PATH = os.path.dirname(APP_PATH)
+    CACHE_PATH = os.path.join(APP_PATH, "toolbox", "cache")
 
 
 if __name__ == "__main__":
@@ -25,3 +26,4 @@ if __name__ == "__main__":
     print("App version:", AppData.VERSION)
     print("Exe name   :", AppData.EXE_NAME)
     print("App folder :", AppData.APP_PATH)
+    print("Cache path :", AppData.CACHE_PATH)
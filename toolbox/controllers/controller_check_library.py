@@ -7,6 +7,7 @@ import wx
 from toolbox.app_data import AppData
 from toolbox.controllers.controller_base import ControllerBase
 from toolbox.models.id_manager import IdManager
+from toolbox.models.checkers.checker_runner import CheckerRunner
 from toolbox.models.checkers.erp_checker import ErpChecker
 from toolbox.models.checkers.footprints_checker import FootprintsChecker
 from toolbox.models.checkers.projects_checker import ProjectsChecker
@@ -19,6 +20,8 @@ class ControllerCheckLibrary(ControllerBase):
 
     name = "Check Libraries"
 
+    _POLL_INTERVAL = 100
+
     _checkers = {
         "Check symbols": SymbolsChecker,
         "Check footprints": FootprintsChecker,
@@ -31,26 +34,37 @@ class ControllerCheckLibrary(ControllerBase):
         super().__init__(main_view, ViewCheckLibrary(notebook))
         self._view.initialize_tree(list(self._checkers.keys()))
         self.bind(wx.EVT_BUTTON, self._on_check_click, IdManager.ID_BTN_CHECK)
-
-    ###########
-    # Private #
-    ###########
-
-    def _run_checker(self, checker):
-        self._main_view.add_to_console(f"\nRun checker: {checker}")
-        self._checkers[checker].stdout = self._main_view.add_to_console
-        messages = self._checkers[checker].run()
-        self._view.add_messages(checker, messages)
+        # The checkers run in the background, the timer reads their output
+        self._runner = CheckerRunner(self._checkers)
+        self._timer = wx.Timer(self._view)
+        self._view.Bind(wx.EVT_TIMER, self._on_timer, self._timer)
 
     ##################
     # Event handlers #
     ##################
 
     def _on_check_click(self, _event):
+        if self._runner.is_running():
+            self._main_view.add_to_console("Cancel checks")
+            self._runner.cancel()
+            return
         self._view.initialize_tree(list(self._checkers.keys()))
         self._main_view.clear_console()
-        for checker in self._checkers:
-            wx.CallAfter(self._run_checker, checker)
+        self._view.set_running(True)
+        self._runner.start()
+        self._timer.Start(self._POLL_INTERVAL)
+
+    def _on_timer(self, _event):
+        for event, name, value in self._runner.get_events():
+            if event == CheckerRunner.OUTPUT:
+                prefix = f"{name}: " if name is not None else ""
+                self._main_view.add_to_console("\n".join(f"{prefix}{line}" for line in value.split("\n")))
+            elif event == CheckerRunner.MESSAGES:
+                self._view.add_messages(name, value)
+            elif event == CheckerRunner.FINISHED:
+                self._timer.Stop()
+                self._view.set_running(False)
+                self._main_view.add_to_console(f"Checks done in {value:.1f} s")
 
 
 if __name__ == "__main__":
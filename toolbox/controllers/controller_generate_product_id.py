@@ -5,7 +5,7 @@ Generate product ID controller.
 import wx
 
 from toolbox.controllers.controller_base import ControllerBase
-from toolbox.models.erp_connect import get_components_from_erp
+from toolbox.models.erp_mirror import ErpMirror
 from toolbox.models.id_manager import IdManager
 from toolbox.models.product_categories import ProductCategories
 from toolbox.views.view_generate_product_id import ViewGenerateProductId
@@ -64,13 +64,13 @@ class ControllerGenerateProductId(ControllerBase):
             series = ""
             if "," in data["series"]:
                 series = data["series"].split(",")[0]
-            id_filter = f"{properties["product_id"][:properties["product_id"].index("-") + 1]}{series}%"
-            print(id_filter)
-            result = get_components_from_erp(self._main_view.add_to_console, id_filter)
-            if not result[0]:
+            id_prefix = f"{properties["product_id"][:properties["product_id"].index("-") + 1]}{series}"
+            erp_mirror = ErpMirror(stdout=self._main_view.add_to_console)
+            if not erp_mirror.sync():
                 error = "Failed to retrieve components from the ERP database."
             else:
-                product_ids = sorted(list(map(lambda r: r["default_code"], result[1])))
+                products = erp_mirror.get_products_by_prefix(id_prefix)
+                product_ids = sorted(list(map(lambda r: r["default_code"], products)))
                 output = {
                     "low": "na" if len(product_ids) == 0 else product_ids[0],
                     "high": "na" if len(product_ids) == 0 else product_ids[-1],
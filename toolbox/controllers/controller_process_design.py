@@ -13,6 +13,7 @@ from datetime import datetime
 from toolbox.controllers.controller_base import ControllerBase
 from toolbox.models.parsers.design_parser import DesignParser
 from toolbox.models.id_manager import IdManager
+from toolbox.models.job_scheduler import JobScheduler
 from toolbox.models.process_design import ProcessDesign
 from toolbox.models.checkers.projects_checker import ProjectsChecker
 from toolbox.views.view_process_design import ViewProcessDesign
@@ -38,6 +39,17 @@ class ControllerProcessDesign(ControllerBase):
         "JLCPCB"
     ]
 
+    # Maximum number of outputs that are generated at the same time
+    _MAX_PARALLEL_JOBS = 4
+    # Run all kicad-cli exports at once in a jobset (KiCad 9 and newer)
+    # A jobset runs the exports one after another, the scheduler runs them in parallel. Off until the jobset is
+    # measured against the parallel exports with KiCad (the benchmark only uses the kicad-cli stand-in).
+    _USE_JOBSET = False
+    # Compare the generated BOM with the BOM exported by kicad-cli
+    _VERIFY_BOM = False
+    # Compare the position data generated from the layout with the position file exported by kicad-cli
+    _VERIFY_POSITION = False
+
     def __init__(self, main_view, notebook):
         super().__init__(main_view, ViewProcessDesign(notebook))
         self._view.init_outputs(self._OUTPUTS)
@@ -92,10 +104,14 @@ class ControllerProcessDesign(ControllerBase):
             report.append(f"{version}")
 
             properties = self._check_design(project_folder, report)
-            self._generate_outputs(process, sch_filename, pcb_filename, properties, report)
+            errors = self._generate_outputs(process, design_filename, sch_filename, pcb_filename, properties,
+                                            report)
             self._copy_design(pca_folder, design_filename, project_folder, report)
 
             report.append("\nProcess finished")
+            if len(errors) > 0:
+                dialog_message = "\n".join(["Generating outputs failed:", *errors])
+                report.append(dialog_message)
             for line in report:
                 if "warning" in line.lower():
                     self._main_view.add_to_console("Warnings were reported in the report file")
@@ -152,36 +168,72 @@ class ControllerProcessDesign(ControllerBase):
 
         return pcb_props
 
-    def _generate_outputs(self, process, sch_filename, pcb_filename, properties, report):
+    def _generate_outputs(self, process, design_filename, sch_filename, pcb_filename, properties, report):
+        # The outputs are generated in parallel, the report is in the order of the outputs
+        # Returns a list with the errors of the jobs that failed, a failed job does not stop the other outputs
+        scheduler = JobScheduler(self._MAX_PARALLEL_JOBS)
+        scheduler.stdout = self._main_view.add_to_console
+        jobs = {}
         for output in self._view.get_outputs():
-            self._main_view.add_to_console(f"Generate {output}")
-            report.append(f"\nGenerate {output}")
-
             if output == "Schematics to PDF":
-                report.append(process.schematics_to_pdf(sch_filename))
+                jobs[output] = [scheduler.add_job(output, process.schematics_to_pdf, sch_filename)]
 
             elif output == "Bill of materials (BOM)":
-                options = self._view.get_bom_options()
-                report.append(process.create_bom(sch_filename, options, properties["pca_id"]))
+                jobs[output] = [scheduler.add_job(f"BOM {option}", process.create_bom, sch_filename, [option],
+                                                  properties["pca_id"])
+                                for option in self._view.get_bom_options()]
+                if self._VERIFY_BOM:
+                    jobs[output].append(scheduler.add_job("Verify BOM", process.verify_bom, sch_filename,
+                                                          self._view.get_bom_options()))
 
             elif output == "Gerbers and drill data":
-                report.append(process.create_gerbers_and_drill(pcb_filename, properties["n_layers"]))
+                gerbers = scheduler.add_job("Gerbers", process.create_gerbers, pcb_filename, properties["n_layers"])
+                drill = scheduler.add_job("Drill data", process.create_drill, pcb_filename)
+                jobs[output] = [gerbers, drill,
+                                scheduler.add_job("Gerbers ZIP file", process.create_gerbers_zip,
+                                                  depends_on=[gerbers, drill])]
 
             elif output == "Position data":
-                report.append(process.create_position_file(pcb_filename))
+                jobs[output] = [scheduler.add_job(output, process.create_position_file, pcb_filename)]
+                if self._VERIFY_POSITION:
+                    jobs[output].append(scheduler.add_job("Verify position data", process.verify_position_file,
+                                                          pcb_filename))
 
             elif output == "PCB placement to PDF":
-                report.append(process.pcb_to_pdf(pcb_filename, properties["has_comp_bot"]))
+                jobs[output] = [scheduler.add_job(output, process.pcb_to_pdf, pcb_filename,
+                                                  properties["has_comp_bot"])]
 
             elif output == "ODB+":
-                report.append(process.create_odb(pcb_filename))
+                jobs[output] = [scheduler.add_job(output, process.create_odb, pcb_filename)]
 
             elif output == "PCB 3D model (step)":
-                report.append(process.create_3d_model(pcb_filename))
+                jobs[output] = [scheduler.add_job(output, process.create_3d_model, pcb_filename)]
 
             else:
                 raise Exception(f"Output '{output}' is not defined")
 
+        if self._USE_JOBSET:
+            self._main_view.add_to_console("Run exports in a jobset")
+            calls = [(function, args) for _, function, args in scheduler.get_jobs()]
+            message = process.run_batch(design_filename, calls)
+            self._main_view.add_to_console(message.split("\n")[0])
+            report.append(f"\nRun exports in a jobset\n{message}")
+
+        self._main_view.add_to_console(f"Generate {len(jobs)} outputs")
+        scheduler.run()
+        errors = []
+        for output, job_ids in jobs.items():
+            report.append(f"\nGenerate {output}")
+            for job_id in job_ids:
+                try:
+                    report.append(scheduler.get_result(job_id))
+                except Exception as e:
+                    report.append(f"Error: {e}")
+                    if scheduler.get_state(job_id) == "failed":
+                        report.append("".join(traceback.format_exception(e)).strip())
+                    errors.append(f"{output}: {e}")
+        return errors
+
     def _copy_design(self, pca_folder, design_filename, project_folder, report):
         self._main_view.add_to_console("Copy design files")
         report.append("\nCopy design files")
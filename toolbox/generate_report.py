@@ -34,7 +34,8 @@ def generate_report():
     # Symbols
     generic_symbols_data = ""
     parts_data = ""
-    symbols = LibParser.get_symbols()
+    # The symbols with the fields inherited from their parent symbols
+    symbols = LibParser.get_symbol_graph().get_effective_symbols()
     symbol_fields = SYMBOL_FIRST_FIELDS[:]
     symbol_fields.extend(filter(lambda x: x not in SYMBOL_FIRST_FIELDS and x not in SYMBOL_LAST_FIELDS, symbols[0]))
     symbol_fields.extend(SYMBOL_LAST_FIELDS)
@@ -0,0 +1,152 @@
+"""
+Cache for the files created by kicad-cli exports.
+
+An export is identified by a key, that is the hash of the command (without the output path), the KiCad version and
+the content of the input files. When an export with the same key is done again, the output is copied from the
+cache instead of running kicad-cli. An output can be a file or a folder with files.
+The oldest entries are removed when the total size of the cache is larger than the maximum size.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from toolbox.app_data import AppData
+
+
+class ArtifactCache:
+
+    ENABLED = True
+    CACHE_PATH = os.path.join(AppData.CACHE_PATH, "artifacts")
+    MAX_SIZE = 2 * 1024 * 1024 * 1024
+
+    # Hashes of the input files: filename: (signature, hash)
+    _file_hashes = {}
+    _lock = threading.Lock()
+
+    ###########
+    # Private #
+    ###########
+
+    @classmethod
+    def _get_file_hash(cls, filename):
+        # The same input files are used by many exports, only hash them again when they are changed
+        stat = os.stat(filename)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with cls._lock:
+            entry = cls._file_hashes.get(filename, None)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        file_hash = hashlib.sha256()
+        with open(filename, "rb") as fp:
+            for block in iter(lambda: fp.read(1 << 20), b""):
+                file_hash.update(block)
+        file_hash = file_hash.hexdigest()
+        with cls._lock:
+            cls._file_hashes[filename] = (signature, file_hash)
+        return file_hash
+
+    def _prune(self):
+        entries = []
+        total_size = 0
+        for key in os.listdir(self.CACHE_PATH):
+            folder = os.path.join(self.CACHE_PATH, key)
+            if not os.path.isdir(folder) or key.endswith(".tmp"):
+                continue
+            size = sum(os.path.getsize(os.path.join(current_folder, filename))
+                       for current_folder, _, filenames in os.walk(folder) for filename in filenames)
+            entries.append((os.path.getmtime(folder), size, folder))
+            total_size += size
+        for _, size, folder in sorted(entries):
+            if total_size <= self.MAX_SIZE:
+                break
+            shutil.rmtree(folder, ignore_errors=True)
+            total_size -= size
+
+    ##########
+    # Public #
+    ##########
+
+    @staticmethod
+    def copy_output(source, target):
+        """
+        Copies an output file, or the files of an output folder (to an existing or new folder).
+        """
+        if os.path.isdir(source):
+            os.makedirs(target, exist_ok=True)
+            for item in os.listdir(source):
+                shutil.copy2(os.path.join(source, item), os.path.join(target, item))
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+
+    def get_key(self, command, input_files):
+        """
+        Returns the key for the command (list of strings) and the content of the input files.
+        """
+        key = hashlib.sha256(json.dumps(command).encode("utf-8"))
+        for filename in sorted(input_files):
+            key.update(f"\n{os.path.basename(filename)}:{self._get_file_hash(filename)}".encode("utf-8"))
+        return key.hexdigest()
+
+    def restore(self, key, output):
+        """
+        Copies the cached output to the output file or folder. Returns False if the output is not in the cache.
+        """
+        if not self.ENABLED:
+            return False
+        folder = os.path.join(self.CACHE_PATH, key)
+        source = os.path.join(folder, "output")
+        if not os.path.exists(source):
+            return False
+        self.copy_output(source, output)
+        # Used entries are kept longest
+        os.utime(folder)
+        return True
+
+    def store(self, key, output):
+        """
+        Stores the output file or folder in the cache.
+        """
+        if not self.ENABLED or not os.path.exists(output):
+            return
+        folder = os.path.join(self.CACHE_PATH, key)
+        # Copy to a temporary folder first, so a partial entry is never used
+        temp_folder = f"{folder}.{uuid.uuid4().hex}.tmp"
+        self.copy_output(output, os.path.join(temp_folder, "output"))
+        with open(os.path.join(temp_folder, "info.json"), "w") as fp:
+            json.dump({"output": os.path.basename(output), "created": time.time()}, fp)
+        try:
+            shutil.rmtree(folder, ignore_errors=True)
+            os.replace(temp_folder, folder)
+        except OSError:
+            # Stored at the same time by another export
+            shutil.rmtree(temp_folder, ignore_errors=True)
+        with self._lock:
+            self._prune()
+
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    _folder = tempfile.mkdtemp()
+    ArtifactCache.CACHE_PATH = os.path.join(_folder, "cache")
+    _input = os.path.join(_folder, "design.kicad_pcb")
+    with open(_input, "w") as _fp:
+        _fp.write("(kicad_pcb)")
+    _cache = ArtifactCache()
+    _key = _cache.get_key(["9.0.1", "pcb", "export", "step"], [_input])
+    print("Restored:", _cache.restore(_key, os.path.join(_folder, "out", "pcb.step")))
+    with open(os.path.join(_folder, "pcb.step"), "w") as _fp:
+        _fp.write("step data")
+    _cache.store(_key, os.path.join(_folder, "pcb.step"))
+    print("Restored:", _cache.restore(_key, os.path.join(_folder, "out", "pcb.step")))
+    with open(_input, "w") as _fp:
+        _fp.write("(kicad_pcb (changed))")
+    print("Key changed:", _cache.get_key(["9.0.1", "pcb", "export", "step"], [_input]) != _key)
+    shutil.rmtree(_folder)
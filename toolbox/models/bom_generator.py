@@ -0,0 +1,150 @@
+"""
+Generates the bill of materials (BOM) from the components of the schematics, without kicad-cli.
+
+The BOM is made the same way as kicad-cli does with the BOM settings of KiCadCli: the components are grouped by the
+group by field, the references of a group are sorted and consecutive references are written as a range (R1-R3).
+Components that are not in the BOM, not populated (DNP) or power symbols are left out.
+The rows can be compared with a BOM exported by kicad-cli, for verifying the generator.
+"""
+
+import csv
+import re
+
+from toolbox.models.kicad_cli import KiCadCli
+
+
+class BomGenerator:
+
+    # Value of a field that is not the same for all components of a group, the same as kicad-cli
+    MIXED_VALUES = "-- mixed values --"
+
+    ###########
+    # Private #
+    ###########
+
+    @classmethod
+    def _get_components(cls, components, exclude_dnp):
+        # A component with multiple units is only once in the BOM
+        bom_components = {}
+        for component in components:
+            if (component["Reference"].startswith("#") or not component["in_bom"] or
+                    (exclude_dnp and component["dnp"])):
+                continue
+            bom_components.setdefault(component["Reference"], component)
+        return sorted(bom_components.values(), key=lambda x: cls.get_reference_key(x["Reference"]))
+
+    @classmethod
+    def _format_references(cls, references, use_ranges):
+        # Three or more consecutive references are written as a range
+        parts = []
+        i = 0
+        while i < len(references):
+            prefix, number = cls.get_reference_key(references[i])
+            n = 1
+            while (i + n < len(references) and number > -1 and
+                   cls.get_reference_key(references[i + n]) == (prefix, number + n)):
+                n += 1
+            if use_ranges and n > 2:
+                parts.append(f"{references[i]}-{references[i + n - 1]}")
+            else:
+                parts.extend(references[i:i + n])
+            i += n
+        return ",".join(parts)
+
+    @classmethod
+    def _get_value(cls, group, field, use_ranges):
+        if field == "Reference":
+            return cls._format_references([component["Reference"] for component in group], use_ranges)
+        if field == "${QUANTITY}":
+            return str(len(group))
+        values = set(component["fields"].get(field, "") for component in group)
+        if len(values) > 1:
+            return cls.MIXED_VALUES
+        return values.pop()
+
+    ##########
+    # Public #
+    ##########
+
+    @staticmethod
+    def get_reference_key(reference):
+        """
+        Returns the key for sorting references by prefix and number (R2 before R10).
+        """
+        match = re.match(r"(.*?)(\d+)$", reference)
+        if match is None:
+            return reference, -1
+        return match.group(1), int(match.group(2))
+
+    @staticmethod
+    def get_label(field):
+        """
+        Returns the column label of a field, text variables like ${QUANTITY} are written without ${}.
+        """
+        match = re.match(r"\$\{(.*)}$", field)
+        return field if match is None else match.group(1)
+
+    @classmethod
+    def get_rows(cls, components, option="", exclude_dnp=True, use_ranges=True):
+        """
+        Returns the rows of the BOM for the kicad-cli BOM option, as dictionaries with the values by column label.
+        The components are from DesignParser.get_components.
+        """
+        fields, group_by, _ = KiCadCli.get_bom_settings(option)
+        fields = fields.split(",")
+        group_by = group_by.split(",")
+        groups = {}
+        for component in cls._get_components(components, exclude_dnp):
+            key = tuple(component["fields"].get(field, "") for field in group_by)
+            groups.setdefault(key, []).append(component)
+        # The groups are sorted by their first reference, the components are already sorted
+        rows = []
+        for group in sorted(groups.values(), key=lambda x: cls.get_reference_key(x[0]["Reference"])):
+            rows.append({cls.get_label(field): cls._get_value(group, field, use_ranges) for field in fields})
+        return rows
+
+    @classmethod
+    def write_rows(cls, filename, rows, option=""):
+        """
+        Writes the rows in the same format as kicad-cli.
+        """
+        fields, _, delimiter = KiCadCli.get_bom_settings(option)
+        with open(filename, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, [cls.get_label(field) for field in fields.split(",")],
+                                    delimiter=delimiter, quoting=csv.QUOTE_ALL, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(rows)
+
+    @classmethod
+    def compare_rows(cls, rows, cli_filename, option=""):
+        """
+        Compares the rows with a BOM exported by kicad-cli for the same option. Returns a list with the differences.
+        """
+        _, _, delimiter = KiCadCli.get_bom_settings(option)
+        with open(cli_filename, mode="r", newline="", encoding="utf-8") as file:
+            cli_rows = list(csv.DictReader(file, delimiter=delimiter))
+        differences = []
+        if len(rows) != len(cli_rows):
+            differences.append(f"Number of rows: {len(rows)}, kicad-cli: {len(cli_rows)}")
+        for i, (row, cli_row) in enumerate(zip(rows, cli_rows), 1):
+            for label in sorted(set(row) | set(cli_row)):
+                if row.get(label, None) != cli_row.get(label, None):
+                    differences.append(f"Row {i}, {label}: '{row.get(label, "")}', "
+                                       f"kicad-cli: '{cli_row.get(label, "")}'")
+        return differences
+
+
+if __name__ == "__main__":
+
+    import os
+
+    from toolbox.models.parsers.design_parser import DesignParser
+
+    DesignParser.stdout = lambda x: None
+    _test_project_folder = os.path.join(os.path.dirname(__file__), "..", "..", "projects", "lib_test", "multi_channel")
+    _components = DesignParser.get_components(_test_project_folder)
+    for _option in ("", "lily_erp", "jlcpcb"):
+        _rows = BomGenerator.get_rows(_components, _option)
+        print(f"BOM option '{_option}': {len(_rows)} rows")
+        for _row in _rows[:5]:
+            print(_row)
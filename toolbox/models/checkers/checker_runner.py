@@ -0,0 +1,160 @@
+"""
+Runs the checkers in background threads.
+
+The checkers run in parallel, so the total time is about the time of the slowest checker. The output and the
+messages of the checkers are put in a queue as events, the GUI reads the events from the queue. This way the
+checkers never access the GUI directly.
+A cancel is handled the next time a checker writes output, checkers that did not start yet are skipped.
+The name of the checker is kept in a context variable. A checker that runs a function in another thread binds the
+function to its context (bind_context), so the output of that thread also has the name of the checker and the
+thread is also stopped by a cancel.
+"""
+
+import contextvars
+import queue
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Name of the checker that runs in the context
+_checker_name = contextvars.ContextVar("checker_name", default=None)
+
+
+class CheckerCancelled(Exception):
+    pass
+
+
+class CheckerRunner:
+
+    # Events: (event, checker name, value)
+    OUTPUT = 1
+    MESSAGES = 2
+    FINISHED = 3
+
+    # None runs all checkers at the same time
+    MAX_WORKERS = None
+
+    def __init__(self, checkers):
+        self._checkers = checkers
+        self._queue = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = None
+
+    ###########
+    # Private #
+    ###########
+
+    def _write(self, message):
+        # Used as stdout for the checkers and the parsers they use
+        name = _checker_name.get()
+        if name is not None and self._cancel_event.is_set():
+            raise CheckerCancelled()
+        self._queue.put((self.OUTPUT, name, message))
+
+    def _run_checker(self, name):
+        if self._cancel_event.is_set():
+            self._queue.put((self.OUTPUT, name, "Cancelled"))
+            return
+        checker = self._checkers[name]
+        token = _checker_name.set(name)
+        start = time.perf_counter()
+        try:
+            self._write(f"Run checker: {name}")
+            messages = checker.run()
+            self._write(f"Checker done in {time.perf_counter() - start:.1f} s")
+            self._queue.put((self.MESSAGES, name, messages))
+        except CheckerCancelled:
+            self._queue.put((self.OUTPUT, name, "Cancelled"))
+        except Exception as e:
+            self._queue.put((self.OUTPUT, name, f"Checker failed: {e}"))
+            self._queue.put((self.MESSAGES, name, [{"item": name, "message": f"checker failed: {e}"}]))
+        finally:
+            _checker_name.reset(token)
+
+    def _run(self):
+        start = time.perf_counter()
+        for checker in self._checkers.values():
+            checker.stdout = self._write
+        max_workers = self.MAX_WORKERS if self.MAX_WORKERS is not None else max(1, len(self._checkers))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self._run_checker, self._checkers))
+        self._queue.put((self.FINISHED, None, time.perf_counter() - start))
+
+    ##########
+    # Public #
+    ##########
+
+    @staticmethod
+    def bind_context(function):
+        """
+        Returns the function bound to the checker context of the calling thread, for running it in another thread.
+        """
+        context = contextvars.copy_context()
+        # A context can only be entered by one thread at a time, each call gets its own copy
+        return lambda *args, **kwargs: context.copy().run(function, *args, **kwargs)
+
+    def start(self):
+        """
+        Starts running the checkers in the background.
+        """
+        if self.is_running():
+            raise Exception("The checkers are already running")
+        self._cancel_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """
+        Requests the running checkers to stop, the FINISHED event is sent when all checkers are stopped.
+        """
+        self._cancel_event.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_events(self):
+        """
+        Returns a list with the events that are in the queue, without waiting.
+        """
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def wait_event(self, timeout=None):
+        """
+        Returns the next event, waits until there is one. Returns None on timeout.
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+if __name__ == "__main__":
+
+    from toolbox.models.checkers.footprints_checker import FootprintsChecker
+    from toolbox.models.checkers.projects_checker import ProjectsChecker
+    from toolbox.models.checkers.symbols_checker import SymbolsChecker
+    from toolbox.models.checkers.unused_items_checker import UnusedItemsChecker
+
+    _runner = CheckerRunner({
+        "Check symbols": SymbolsChecker,
+        "Check footprints": FootprintsChecker,
+        "Check unused items": UnusedItemsChecker,
+        "Check projects": ProjectsChecker
+    })
+    _runner.start()
+    while True:
+        _event, _name, _value = _runner.wait_event()
+        if _event == CheckerRunner.OUTPUT:
+            print(f"{_name}: {_value}")
+        elif _event == CheckerRunner.MESSAGES:
+            print(f"{_name}: {len(_value)} messages")
+        elif _event == CheckerRunner.FINISHED:
+            print(f"All checkers done in {_value:.1f} s")
+            break
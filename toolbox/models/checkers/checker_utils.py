@@ -0,0 +1,24 @@
+"""
+Helpers that are used by more than one checker.
+"""
+
+
+class CheckerUtils:
+
+    @staticmethod
+    def create_index(items, get_key):
+        """
+        Returns a dictionary with the items per key, the items keep their order.
+        get_key is a function that returns the key of an item.
+        """
+        index = {}
+        for item in items:
+            index.setdefault(get_key(item), []).append(item)
+        return index
+
+
+if __name__ == "__main__":
+
+    _items = [{"Name": "res_10k", "Lily_ID": "1"}, {"Name": "res_4k7", "Lily_ID": "2"},
+              {"Name": "res_10k", "Lily_ID": "3"}]
+    print(CheckerUtils.create_index(_items, lambda x: x["Name"]))
@@ -1,14 +1,26 @@
 """
 Class that checks the library against the ERP database
+The ERP components are read in a separate thread while the library is parsed, so the time for reading is the time
+of the slowest of the two instead of the sum.
 """
 
-from toolbox.models.erp_connect import get_components_from_erp
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from toolbox.models.checkers.checker_runner import CheckerRunner
+from toolbox.models.checkers.checker_utils import CheckerUtils
+from toolbox.models.erp_mirror import ErpMirror
 from toolbox.models.parsers.lib_parser import LibParser
 
 
 class ErpChecker:
 
     stdout = print
+    # None reads the configuration from erp_connect.json
+    erp_config = None
+    # Timings of the last run in seconds
+    timings = {}
 
     @staticmethod
     def lib_filter(comp):
@@ -21,30 +33,67 @@ class ErpChecker:
             not comp["Name"].startswith("test_point_")
         )
 
+    @classmethod
+    def _read_erp_components(cls):
+        # Runs in a separate thread, in the context of the checker
+        start = time.perf_counter()
+        erp_components = []
+        erp_mirror = ErpMirror(cls.erp_config, stdout=cls.stdout)
+        # Checking against the copy of the last synchronization is better than no check
+        if erp_mirror.sync(allow_local_copy=True):
+            erp_components = erp_mirror.get_components()
+        return erp_components, time.perf_counter() - start
+
     @classmethod
     def run(cls):
         cls.stdout("Check ERP components against library components")
+        start = time.perf_counter()
         report_messages = []
-        erp_components = []
-        result = get_components_from_erp(cls.stdout)
-        if result[0]:
-            erp_components = result[1]
-        lib_components = list(filter(lambda c: cls.lib_filter(c), LibParser.get_symbols()))
+        with ThreadPoolExecutor(1) as executor:
+            erp_future = executor.submit(CheckerRunner.bind_context(cls._read_erp_components))
+            # The symbols with the fields inherited from their parent symbols
+            lib_symbols = LibParser.get_symbol_graph().get_effective_symbols()
+            lib_duration = time.perf_counter() - start
+            erp_components, erp_duration = erp_future.result()
+        read_duration = time.perf_counter() - start
+        lib_components = list(filter(lambda c: cls.lib_filter(c), lib_symbols))
         # Make name format in library components same as the name in the ERP database
         lib_components = [{**c, "Name": c["Name"].replace("_", " ")} for c in lib_components]
         cls.stdout(f"Checking {len(erp_components)} ERP components")
         cls.stdout(f"Checking {len(lib_components)} library components")
-        cls._check_lib_to_erp(lib_components, erp_components, report_messages)
-        cls._check_erp_to_lib(erp_components, lib_components, report_messages)
+        report_messages.extend(cls.check_components(lib_components, erp_components))
+        total_duration = time.perf_counter() - start
+        cls.timings = {
+            "erp": erp_duration,
+            "library": lib_duration,
+            "read": read_duration,
+            "check": total_duration - read_duration,
+            "total": total_duration
+        }
+        cls.stdout(f"Read ERP components in {erp_duration:.2f} s and library in {lib_duration:.2f} s "
+                   f"at the same time, critical path: {"ERP" if erp_duration > lib_duration else "library"}")
+        cls.stdout(f"Checked in {cls.timings["check"]:.2f} s, total {cls.timings["total"]:.2f} s")
+        return report_messages
+
+    @classmethod
+    def check_components(cls, lib_components, erp_components):
+        report_messages = []
+        # Indexes for looking up components by ID and name, created once for both checks
+        erp_by_id = CheckerUtils.create_index(erp_components, lambda x: x["default_code"])
+        erp_by_name = CheckerUtils.create_index(erp_components, lambda x: x["name"])
+        lib_by_id = CheckerUtils.create_index(lib_components, lambda x: x["Lily_ID"])
+        lib_by_name = CheckerUtils.create_index(lib_components, lambda x: x["Name"])
+        cls._check_lib_to_erp(lib_components, erp_by_id, erp_by_name, report_messages)
+        cls._check_erp_to_lib(erp_components, lib_by_id, lib_by_name, report_messages)
         return report_messages
 
     @classmethod
-    def _check_lib_to_erp(cls, lib_components, erp_components, report_messages):
+    def _check_lib_to_erp(cls, lib_components, erp_by_id, erp_by_name, report_messages):
         caller = f"({cls.__name__}._check_lib_to_erp)"
         # Check if library component is available in the ERP database
         for lib_comp in lib_components:
             # Check by ID
-            matches = list(filter(lambda c: c["default_code"] == lib_comp["Lily_ID"], erp_components))
+            matches = erp_by_id.get(lib_comp["Lily_ID"], [])
             if len(matches) > 1:
                 # Duplicate ID
                 report_messages.append({
@@ -73,7 +122,7 @@ class ErpChecker:
                     })
             else:
                 # ID not found, try to find by name
-                matches = list(filter(lambda c: c["name"] == lib_comp["Name"], erp_components))
+                matches = erp_by_name.get(lib_comp["Name"], [])
                 if len(matches) > 1:
                     # Multiple components with the same name found
                     report_messages.append({
@@ -108,12 +157,12 @@ class ErpChecker:
                     })
 
     @classmethod
-    def _check_erp_to_lib(cls, erp_components, lib_components, report_messages):
+    def _check_erp_to_lib(cls, erp_components, lib_by_id, lib_by_name, report_messages):
         caller = f"({cls.__name__}._check_erp_to_lib)"
         # Check if ERP components are missing in the library
         for erp_comp in erp_components:
             # Check by ID
-            matches = list(filter(lambda c: c["Lily_ID"] == erp_comp["default_code"], lib_components))
+            matches = lib_by_id.get(erp_comp["default_code"], [])
             if len(matches) > 1:
                 # Duplicate ID
                 report_messages.append({
@@ -127,7 +176,7 @@ class ErpChecker:
                     })
             elif len(matches) < 1:
                 # ID not found, try to find by name
-                matches = list(filter(lambda c: c["Name"] == erp_comp["name"], lib_components))
+                matches = lib_by_name.get(erp_comp["name"], [])
                 if len(matches) > 1:
                     # Multiple components with the same name found
                     report_messages.append({
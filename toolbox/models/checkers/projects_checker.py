@@ -5,6 +5,7 @@ Checks the projects to the library.
 import os
 
 from toolbox.app_data import AppData
+from toolbox.models.checkers.checker_utils import CheckerUtils
 from toolbox.models.parsers.design_parser import DesignParser
 from toolbox.models.parsers.lib_parser import LibParser
 
@@ -41,13 +42,23 @@ class ProjectsChecker:
         designs = {}
         for folder in project_folder:
             cls.stdout(f"Check project: {folder}")
+            symbols = DesignParser.get_symbols(folder)
+            footprints = DesignParser.get_footprints(folder)
+            # Indexes for looking up items, created once for all checks
             designs[folder[len(cls.PROJECTS_PATH) + 1:]] = {
-                "symbols": DesignParser.get_symbols(folder),
-                "footprints": DesignParser.get_footprints(folder)
+                "symbols": symbols,
+                "footprints": footprints,
+                "symbols_by_lib_id": CheckerUtils.create_index(symbols, lambda x: x["lib_id"]),
+                "symbols_by_reference": CheckerUtils.create_index(symbols, lambda x: x["Reference"]),
+                "footprints_by_name": CheckerUtils.create_index(footprints, lambda x: x["Footprint"]),
+                "footprints_by_reference": CheckerUtils.create_index(footprints, lambda x: x["Reference"]["Value"])
             }
 
-        lib_symbols = LibParser.get_symbols()
+        # The library symbols with the fields inherited from their parent symbols
+        lib_symbols = LibParser.get_symbol_graph().get_effective_symbols()
         lib_footprints = LibParser.get_footprints()
+        lib_symbols_by_name = CheckerUtils.create_index(lib_symbols, lambda x: x["Name"])
+        lib_footprints_by_name = CheckerUtils.create_index(lib_footprints, lambda x: x["Name"])
 
         report_messages = []
 
@@ -57,10 +68,10 @@ class ProjectsChecker:
             cls._check_if_footprints_in_designs(lib_footprints, designs, report_messages)
 
         # Regular projects
-        cls._check_if_symbols_not_in_library(designs, lib_symbols, report_messages)
-        cls._check_symbols_properties(designs, lib_symbols, report_messages)
-        cls._check_if_footprints_not_in_library(designs, lib_footprints, report_messages)
-        cls._check_footprint_properties(designs, lib_footprints, report_messages)
+        cls._check_if_symbols_not_in_library(designs, lib_symbols_by_name, report_messages)
+        cls._check_symbols_properties(designs, lib_symbols_by_name, report_messages)
+        cls._check_if_footprints_not_in_library(designs, lib_footprints_by_name, report_messages)
+        cls._check_footprint_properties(designs, lib_footprints_by_name, report_messages)
         cls._check_symbols_vs_footprints(designs, report_messages)
 
         return report_messages
@@ -78,8 +89,7 @@ class ProjectsChecker:
 
             is_used = False
             for design in designs:
-                matches = list(filter(lambda x: x["lib_id"] == f"lily_symbols:{lib_symbol["Name"]}",
-                                      designs[design]["symbols"]))
+                matches = designs[design]["symbols_by_lib_id"].get(f"lily_symbols:{lib_symbol["Name"]}", [])
 
                 # Only count if it is used if it is in one of the test designs
                 if design.startswith("lib_test\\") and len(matches) > 0:
@@ -98,25 +108,24 @@ class ProjectsChecker:
                 })
 
     @classmethod
-    def _check_if_symbols_not_in_library(cls, designs, lib_symbols, report_messages):
+    def _check_if_symbols_not_in_library(cls, designs, lib_symbols_by_name, report_messages):
         caller = f"({cls.__name__}._check_if_symbols_not_in_library)"
         for design in designs:
             for design_symbol in designs[design]["symbols"]:
                 lib_name = design_symbol["lib_id"].split(":")[1]
-                matches = list(filter(lambda x: x["Name"] == lib_name, lib_symbols))
-                if len(matches) == 0:
+                if lib_name not in lib_symbols_by_name:
                     report_messages.append({
                         "item": lib_name,
                         "message": f"symbol in project {design} is not in the library {caller}"
                     })
 
     @classmethod
-    def _check_symbols_properties(cls, designs, lib_symbols, report_messages):
+    def _check_symbols_properties(cls, designs, lib_symbols_by_name, report_messages):
         caller = f"({cls.__name__}._check_symbols_properties)"
         for design in designs:
             for design_symbol in designs[design]["symbols"]:
                 lib_name = design_symbol["lib_id"].split(":")[1]
-                matches = list(filter(lambda x: x["Name"] == lib_name, lib_symbols))
+                matches = lib_symbols_by_name.get(lib_name, [])
                 if len(matches) > 0:
                     lib_symbol = matches[0]
                     # Check if keys are same
@@ -204,9 +213,7 @@ class ProjectsChecker:
         caller = f"({cls.__name__}._check_if_footprints_in_designs)"
         for lib_footprint in lib_footprints:
             for design in designs:
-                matches = list(filter(lambda x: x["Footprint"] == f"lily_footprints:{lib_footprint["Name"]}",
-                                      designs[design]["footprints"]))
-                if len(matches) > 0:
+                if f"lily_footprints:{lib_footprint["Name"]}" in designs[design]["footprints_by_name"]:
                     break
             else:
                 report_messages.append({
@@ -215,25 +222,24 @@ class ProjectsChecker:
                 })
 
     @classmethod
-    def _check_if_footprints_not_in_library(cls, designs, lib_footprints, report_messages):
+    def _check_if_footprints_not_in_library(cls, designs, lib_footprints_by_name, report_messages):
         caller = f"({cls.__name__}._check_if_footprints_not_in_library)"
         for design in designs:
             for design_footprint in designs[design]["footprints"]:
                 lib_name = design_footprint["Footprint"].split(":")[1]
-                matches = list(filter(lambda x: x["Name"] == lib_name, lib_footprints))
-                if len(matches) == 0:
+                if lib_name not in lib_footprints_by_name:
                     report_messages.append({
                         "item": lib_name,
                         "message": f"footprint in project {design} is not in the library {caller}"
                     })
 
     @classmethod
-    def _check_footprint_properties(cls, designs, lib_footprints, report_messages):
+    def _check_footprint_properties(cls, designs, lib_footprints_by_name, report_messages):
         caller = f"({cls.__name__}._check_footprint_properties)"
         for design in designs:
             for design_footprint in designs[design]["footprints"]:
                 lib_name = design_footprint["Footprint"].split(":")[1]
-                matches = list(filter(lambda x: x["Name"] == lib_name, lib_footprints))
+                matches = lib_footprints_by_name.get(lib_name, [])
                 if len(matches) > 0:
                     lib_footprint = matches[0]
                     lib_keys = list(lib_footprint.keys())
@@ -294,8 +300,7 @@ class ProjectsChecker:
             for design_symbol in designs[design]["symbols"]:
                 if design_symbol["Reference"].startswith("#PWR"):
                     continue
-                matches = list(filter(lambda x: x["Reference"]["Value"] == design_symbol["Reference"],
-                                      designs[design]["footprints"]))
+                matches = designs[design]["footprints_by_reference"].get(design_symbol["Reference"], [])
                 if len(matches) == 0:
                     report_messages.append({
                         "item": f"{design_symbol["Reference"]} ({design_symbol["lib_id"]})",
@@ -344,9 +349,7 @@ class ProjectsChecker:
             for design_footprint in designs[design]["footprints"]:
                 if design_footprint["Reference"]["Value"] == "REF**":
                     continue
-                matches = list(filter(lambda x: x["Reference"] == design_footprint["Reference"]["Value"],
-                                      designs[design]["symbols"]))
-                if len(matches) == 0:
+                if design_footprint["Reference"]["Value"] not in designs[design]["symbols_by_reference"]:
                     report_messages.append({
                         "item": f"{design_footprint["Reference"]["Value"]} ({design_footprint["Footprint"]})",
                         "message": f"footprint has no matching symbol in the schematics design {caller}"
@@ -4,12 +4,10 @@ Class that checks the symbols
 
 import os
 import re
-import threading
-import time
-import urllib.request
 
 from toolbox.app_data import AppData
 from toolbox.models.parsers.lib_parser import LibParser
+from toolbox.models.uri_checker import UriChecker
 
 
 class SymbolsChecker:
@@ -48,34 +46,26 @@ class SymbolsChecker:
 
     @classmethod
     def run(cls):
-        threads = []
+        datasheet_uris = []
         LibParser.stdout = cls.stdout
         cls.stdout("Check library symbols")
         report_messages = []
-        symbols = LibParser.get_symbols()
-        cls.stdout(f"Checking {len(symbols)} symbols")
-        for symbol in symbols:
-            for field in symbol:
+        symbol_graph = LibParser.get_symbol_graph()
+        cls.stdout(f"Checking {len(symbol_graph.get_symbols())} symbols")
+        for own_symbol in symbol_graph.get_symbols():
+            for field in own_symbol:
                 if field not in cls.SKIP_EMPTY_CHECK:
-                    cls._check_symbol_field_empty(symbol, field, report_messages)
+                    cls._check_symbol_field_empty(own_symbol, field, report_messages)
+            # The other checks are on the fields including the fields inherited from the parent symbol
+            symbol = symbol_graph.get_effective(own_symbol["Name"])
             cls._check_reference(symbol, report_messages)
             cls._check_revision(symbol, report_messages)
             cls._check_value(symbol, report_messages)
             if symbol["Footprint"] != "":
                 cls._check_footprint(symbol, report_messages)
             if symbol["Datasheet"] != "":
-                cls._check_datasheet(symbol, report_messages, threads)
-
-        n_print = 0
-        while True in list(map(lambda x: x.is_alive(), threads)):
-            time.sleep(0.1)
-            n_print += 1
-            if n_print == 5:
-                n_running = len(list(filter(lambda x: x.is_alive(), threads)))
-                cls.stdout(f"Checking {n_running} URIs")
-                n_print = 0
-        cls.stdout("Checking URIs done")
-
+                cls._check_datasheet(symbol, report_messages, datasheet_uris)
+        cls._check_datasheet_uris(datasheet_uris, report_messages)
         return report_messages
 
     ############
@@ -180,7 +170,7 @@ class SymbolsChecker:
                     })
 
     @classmethod
-    def _check_datasheet(cls, symbol_data, report_messages, threads):
+    def _check_datasheet(cls, symbol_data, report_messages, datasheet_uris):
         caller = f"({cls.__name__}._check_datasheet)"
         datasheet = symbol_data["Datasheet"]
         base_uri = "https://lilytronics.github.io/lily_kicad_lib/datasheets/"
@@ -196,11 +186,19 @@ class SymbolsChecker:
                 "message": f"Invalid datasheet URI {datasheet} {caller}"
             })
         else:
-            t = threading.Thread(target=cls._check_datasheet_uri,
-                                    args=(symbol_data["Name"], datasheet, report_messages))
-            t.daemon = True
-            t.start()
-            threads.append(t)
+            # The URIs are checked at once afterward, many symbols share the same datasheet
+            datasheet_uris.append((symbol_data["Name"], datasheet))
+
+    @classmethod
+    def _check_datasheet_uris(cls, datasheet_uris, report_messages):
+        caller = f"({cls.__name__}._check_datasheet)"
+        results = UriChecker(cls.stdout).check_uris([uri for _, uri in datasheet_uris])
+        for symbol_name, uri in datasheet_uris:
+            if not results[uri]:
+                report_messages.append({
+                    "item": symbol_name,
+                    "message": f"Datasheet URI not available {uri} {caller}"
+                })
 
     ###########
     # Helpers #
@@ -217,18 +215,6 @@ class SymbolsChecker:
             (not symbol_data["Name"].startswith("test_point_"))
         )
 
-    @classmethod
-    def _check_datasheet_uri(cls, symbol_name, uri, report_messages):
-        caller = f"({cls.__name__}._check_datasheet)"
-        try:
-            with urllib.request.urlopen(uri) as response:
-                assert response.status == 200
-        except (Exception,):
-            report_messages.append({
-                "item": symbol_name,
-                "message": f"Datasheet URI not available {uri} {caller}"
-            })
-
 
 if __name__ == "__main__":
 
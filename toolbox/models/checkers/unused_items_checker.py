@@ -3,6 +3,7 @@ Class that checks for unused items
 """
 
 import os
+import time
 
 from toolbox.app_data import AppData
 from toolbox.models.parsers.lib_parser import LibParser
@@ -18,35 +19,60 @@ class UnusedItemsChecker:
     @classmethod
     def run(cls):
         LibParser.stdout = cls.stdout
-        symbols = LibParser.get_symbols()
+        symbol_graph = LibParser.get_symbol_graph()
+        symbols = symbol_graph.get_effective_symbols()
         footprints = LibParser.get_footprints()
         report_messages = []
 
-        cls._check_unused_symbols(symbols, report_messages)
-        cls._check_unused_datasheets(symbols, report_messages)
-        cls._check_unused_footprints(symbols, footprints, report_messages)
-        cls._check_unused_3d_models(footprints, report_messages)
-        cls._check_unused_pictures(footprints, report_messages)
+        # Sets with the used items, created once, so each check is a set lookup per item
+        used_datasheets = set(cls._get_datasheet_path(s["Datasheet"]) for s in symbols)
+        used_footprints = set(s["Footprint"] for s in symbols)
+        used_models = set(f["Model"] for f in footprints if f.get("Model", None) is not None)
+        footprint_names = set(f["Name"] for f in footprints)
+
+        cls._run_check(cls._check_unused_symbols, symbol_graph, report_messages)
+        cls._run_check(cls._check_unused_datasheets, used_datasheets, report_messages)
+        cls._run_check(cls._check_unused_footprints, used_footprints, footprints, report_messages)
+        cls._run_check(cls._check_unused_3d_models, used_models, report_messages)
+        cls._run_check(cls._check_unused_pictures, footprint_names, report_messages)
 
         return report_messages
 
+    ###########
+    # Helpers #
+    ###########
+
+    @classmethod
+    def _run_check(cls, check, *args):
+        start = time.perf_counter()
+        check(*args)
+        cls.stdout(f"{check.__name__.strip("_").replace("_", " ").capitalize()}: {time.perf_counter() - start:.3f} s")
+
+    @staticmethod
+    def _get_datasheet_path(datasheet):
+        # Path of the datasheet relative to the datasheets folder, starting with a slash
+        index = datasheet.rfind("/datasheets/")
+        if index == -1:
+            return datasheet
+        return datasheet[index + len("/datasheets"):].split("#")[0].split("?")[0]
+
     ############
     # Checkers #
     ############
 
     @classmethod
-    def _check_unused_symbols(cls, symbols, report_messages):
+    def _check_unused_symbols(cls, symbol_graph, report_messages):
         caller = f"({cls.__name__}._check_unused_datasheets)"
-        for symbol in filter(lambda s: s.get("Extends", None) is None and s["Name"] not in cls._SKIP_SYMBOLS_UNUSED, symbols):
-            matches = list(filter(lambda x: x.get("Extends", None) == symbol["Name"], symbols))
-            if len(matches) == 0:
+        for symbol in filter(lambda s: s.get("Extends", None) is None and s["Name"] not in cls._SKIP_SYMBOLS_UNUSED,
+                             symbol_graph.get_symbols()):
+            if len(symbol_graph.get_children(symbol["Name"])) == 0:
                 report_messages.append({
                     "item": symbol["Name"],
                     "message": f"Symbol is not used in any part {caller}"
                 })
 
     @classmethod
-    def _check_unused_datasheets(cls, symbols, report_messages):
+    def _check_unused_datasheets(cls, used_datasheets, report_messages):
         caller = f"({cls.__name__}._check_unused_datasheets)"
         file_path = f"{AppData.APP_PATH}/docs/datasheets"
         for current_folder, sub_folders, filenames in os.walk(file_path):
@@ -54,44 +80,39 @@ class UnusedItemsChecker:
             filenames.sort()
             for filename in filenames:
                 rel_path = os.path.join(current_folder, filename).replace("\\", "/")[len(file_path):]
-                matches = list(filter(lambda x: rel_path in x["Datasheet"], symbols))
-                if len(matches) == 0:
+                if rel_path not in used_datasheets:
                     report_messages.append({
                         "item": rel_path,
                         "message": f"Datasheet file is not used in any symbol {caller}"
                     })
 
     @classmethod
-    def _check_unused_footprints(cls, symbols, footprints, report_messages):
+    def _check_unused_footprints(cls, used_footprints, footprints, report_messages):
         caller = f"({cls.__name__}._check_unused_footprints)"
         for footprint in filter(lambda f: f["Name"] not in cls._SKIP_FOOTPRINTS_UNUSED, footprints):
-            matches = list(filter(lambda x: x["Footprint"] == f"lily_footprints:{footprint["Name"]}", symbols))
-            if len(matches) == 0:
+            if f"lily_footprints:{footprint["Name"]}" not in used_footprints:
                 report_messages.append({
                     "item": footprint["Name"],
                     "message": f"Footprint is not used in any symbol {caller}"
                 })
 
     @classmethod
-    def _check_unused_3d_models(cls, footprints, report_messages):
+    def _check_unused_3d_models(cls, used_models, report_messages):
         caller = f"({cls.__name__}._check_unused_3d_models)"
         file_path = f"{AppData.APP_PATH}/3d_models"
         for filename in filter(lambda f: os.path.isfile(os.path.join(file_path, f)), os.listdir(file_path)):
-            rel_path = f"../3d_models/{filename}"
-            matches = list(filter(lambda x: rel_path == x.get("Model", None), footprints))
-            if len(matches) == 0:
+            if f"../3d_models/{filename}" not in used_models:
                 report_messages.append({
                     "item": filename,
                     "message": f"3D model file is not used in any footprint {caller}"
                 })
 
     @classmethod
-    def _check_unused_pictures(cls, footprints, report_messages):
+    def _check_unused_pictures(cls, footprint_names, report_messages):
         caller = f"({cls.__name__}._check_unused_pictures)"
         file_path = f"{AppData.APP_PATH}/lily_footprints.pretty"
         for filename in filter(lambda f: os.path.isfile(os.path.join(file_path, f)) and f.endswith(".png"), os.listdir(file_path)):
-            matches = list(filter(lambda x: filename == f"{x["Name"]}.png", footprints))
-            if len(matches) == 0:
+            if filename[:-len(".png")] not in footprint_names:
                 report_messages.append({
                     "item": filename,
                     "message": f"picture is not matching any footprint {caller}"
@@ -10,12 +10,22 @@ Filename: erp_connect.json
     "password": "secret_password"
 }
 
+The ERP client keeps the user ID and the connections to the ERP system, so it only authenticates once.
+Each thread has its own connection, that is kept open for the next calls (keep-alive).
+Large results are read in pages, a number of pages at the same time, and the records are passed on as the pages
+arrive.
 """
 
+import http.client
 import json
 import os
+import threading
 import xmlrpc.client
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+CONFIG_FILENAME = os.path.join(os.path.expanduser("~"), "erp_connect.json")
 
 _FIELDS = [
     "id",
@@ -24,32 +34,158 @@ _FIELDS = [
     "categ_id"
 ]
 
+COMPONENT_FILTERS = [
+    "|", ["categ_id", "=", "Electronic components"], ["categ_id", "=", "Draft"]
+]
 
-def get_components_from_erp(stdout, filter_value=""):
-    filters = [
-        "|", ["categ_id", "=", "Electronic components"], ["categ_id", "=", "Draft"]
-    ]
-    if filter_value != "":
-        filters = [["default_code", "like", filter_value]]
-    stdout("Reading components from ERP database")
-    json_filename = os.path.join(os.path.expanduser("~"), "erp_connect.json")
-    if not os.path.isfile(json_filename):
+
+def read_config(stdout):
+    if not os.path.isfile(CONFIG_FILENAME):
         stdout("No configuration file present")
-        return False, []
+        return None
 
     try:
-        config = json.load(open(json_filename, "r"))
+        return json.load(open(CONFIG_FILENAME, "r"))
     except Exception as e:
         stdout("Error reading configuration file")
         stdout(str(e))
+        return None
+
+
+class _KeepAliveTransport(xmlrpc.client.SafeTransport):
+    """
+    Transport for HTTP and HTTPS with a timeout. The connection is kept open for the next requests.
+    """
+
+    def __init__(self, use_https, timeout):
+        super().__init__()
+        self._use_https = use_https
+        self._timeout = timeout
+
+    def make_connection(self, host):
+        if self._connection[1] is not None and host == self._connection[0]:
+            return self._connection[1]
+        chost, self._extra_headers, x509 = self.get_host_info(host)
+        if self._use_https:
+            connection = http.client.HTTPSConnection(chost, None, timeout=self._timeout, context=self.context,
+                                                     **(x509 or {}))
+        else:
+            connection = http.client.HTTPConnection(chost, timeout=self._timeout)
+        self._connection = host, connection
+        return connection
+
+
+class ErpClient:
+
+    PAGE_SIZE = 2000
+    WORKERS = 4
+    TIMEOUT = 60
+
+    _default_client = None
+    _default_mtime = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, config):
+        self._config = config
+        self._uid = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    ###########
+    # Private #
+    ###########
+
+    def _get_proxy(self, endpoint):
+        # Each thread has its own proxies, a proxy (connection) cannot be used by two threads at the same time
+        proxies = self._local.__dict__.setdefault("proxies", {})
+        if endpoint not in proxies:
+            transport = _KeepAliveTransport(self._config["url"].startswith("https"), self.TIMEOUT)
+            proxies[endpoint] = xmlrpc.client.ServerProxy(f"{self._config["url"]}/xmlrpc/2/{endpoint}",
+                                                          transport=transport, allow_none=True)
+        return proxies[endpoint]
+
+    def _get_uid(self):
+        with self._lock:
+            if self._uid is None:
+                uid = self._get_proxy("common").authenticate(self._config["database"], self._config["username"],
+                                                             self._config["password"], {})
+                if not uid:
+                    raise Exception(f"Authentication failed for user '{self._config["username"]}'")
+                self._uid = uid
+            return self._uid
+
+    def _read_page(self, model, domain, fields, offset, limit):
+        return self.execute(model, "search_read", domain, fields=fields, offset=offset, limit=limit, order="id")
+
+    ##########
+    # Public #
+    ##########
+
+    @classmethod
+    def get_default(cls, stdout):
+        """
+        Returns the client for the configuration in erp_connect.json, None if there is no valid configuration.
+        The configuration is read again when the file is changed.
+        """
+        with cls._default_lock:
+            mtime = os.path.getmtime(CONFIG_FILENAME) if os.path.isfile(CONFIG_FILENAME) else None
+            if cls._default_client is None or mtime != cls._default_mtime:
+                config = read_config(stdout)
+                cls._default_client = cls(config) if config is not None else None
+                cls._default_mtime = mtime
+            return cls._default_client
+
+    def get_config(self):
+        return self._config
+
+    def execute(self, model, method, *args, **kwargs):
+        """
+        Executes a method of a model in the ERP system, the positional and keyword arguments are for the method.
+        """
+        return self._get_proxy("object").execute_kw(self._config["database"], self._get_uid(),
+                                                    self._config["password"], model, method, list(args), kwargs)
+
+    def iter_records(self, model, domain, fields, page_size=None, workers=None):
+        """
+        Yields the records matching the domain. The records are read in pages (ordered by ID), a number of pages at
+        the same time. The records of a page are yielded when the page arrives, so the pages can be out of order.
+        """
+        page_size = self.PAGE_SIZE if page_size is None else page_size
+        workers = self.WORKERS if workers is None else workers
+        n_records = self.execute(model, "search_count", domain)
+        offsets = iter(range(0, n_records, page_size))
+        with ThreadPoolExecutor(workers) as executor:
+            futures = set()
+            while True:
+                # Keep all workers busy, without reading ahead too far
+                for offset in offsets:
+                    futures.add(executor.submit(self._read_page, model, domain, fields, offset, page_size))
+                    if len(futures) >= workers * 2:
+                        break
+                if len(futures) == 0:
+                    break
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+    def search_read(self, model, domain, fields, page_size=None, workers=None):
+        """
+        Returns the records matching the domain, ordered by ID.
+        """
+        return sorted(self.iter_records(model, domain, fields, page_size, workers), key=lambda x: x["id"])
+
+
+def get_components_from_erp(stdout, filter_value=""):
+    filters = COMPONENT_FILTERS
+    if filter_value != "":
+        filters = [["default_code", "like", filter_value]]
+    stdout("Reading components from ERP database")
+    client = ErpClient.get_default(stdout)
+    if client is None:
         return False, []
 
     try:
-        common = xmlrpc.client.ServerProxy('{}/xmlrpc/2/common'.format(config["url"]))
-        uid = common.authenticate(config["database"], config["username"], config["password"], {})
-        models = xmlrpc.client.ServerProxy('{}/xmlrpc/2/object'.format(config["url"]))
-        records = models.execute_kw(config["database"], uid, config["password"], 'product.template',
-                                    'search_read', [filters], {'fields': _FIELDS})
+        records = client.search_read("product.template", filters, _FIELDS)
     except Exception as e:
         stdout("Error reading records")
         stdout(str(e))
@@ -0,0 +1,242 @@
+"""
+Local copy of the products in the ERP system, in an SQLite database in the cache folder.
+
+The copy has the electronic components and the products with a product ID. It is synchronized incrementally:
+only the records that are changed since the last synchronization (write date of the ERP records) are read.
+The write date is the start of the transaction in the ERP system, a record committed later can have a write date
+before the last synchronization. Therefore the records written in the 10 minutes before the last synchronization are
+read again, and all records are read once a day.
+The IDs of the records are read to remove the records that are deleted or archived in the ERP system, and to read
+the records that are not in the copy.
+The queries are done on the local database, with indexes on the product ID and the category.
+If the ERP system cannot be reached, the copy of the last synchronization can be used for reading only: new product
+IDs must not be generated from an old copy, another user could have used them since.
+"""
+
+import contextlib
+import os
+import sqlite3
+import threading
+
+from toolbox.app_data import AppData
+from toolbox.models.erp_connect import COMPONENT_FILTERS, ErpClient
+
+
+class ErpMirror:
+
+    stdout = print
+
+    DATABASE_FILENAME = os.path.join(AppData.CACHE_PATH, "erp_products.sqlite")
+
+    # Records written this number of seconds before the newest record in the copy are read again
+    SYNC_OVERLAP = 600
+    # All records are read if the last full read is older than this number of hours
+    FULL_SYNC_INTERVAL = 24
+
+    _CATEGORIES = ["Electronic components", "Draft"]
+    _FIELDS = ["name", "default_code", "categ_id", "write_date"]
+    # Electronic components, or products with a product ID
+    _FILTERS = ["|", ["default_code", "!=", False], *COMPONENT_FILTERS]
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            default_code TEXT,
+            categ_id INTEGER,
+            categ_name TEXT,
+            write_date TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS products_default_code ON products (default_code);
+        CREATE INDEX IF NOT EXISTS products_categ_name ON products (categ_name);
+        CREATE TABLE IF NOT EXISTS sync (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, config=None, filename=None, stdout=None):
+        """
+        The configuration is read from erp_connect.json if no configuration is given.
+        The messages are written to stdout, the stdout of the class if not given.
+        """
+        self._stdout = stdout if stdout is not None else type(self).stdout
+        self._client = ErpClient(config) if config is not None else None
+        self._filename = filename if filename is not None else self.DATABASE_FILENAME
+
+    ###########
+    # Private #
+    ###########
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self._filename)), exist_ok=True)
+        connection = sqlite3.connect(self._filename)
+        connection.executescript(self._SCHEMA)
+        return contextlib.closing(connection)
+
+    @staticmethod
+    def _get_value(connection, key, default=None):
+        row = connection.execute("SELECT value FROM sync WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else default
+
+    @staticmethod
+    def _set_value(connection, key, value):
+        connection.execute("INSERT OR REPLACE INTO sync (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _to_row(record):
+        category = record["categ_id"] or [None, None]
+        return (record["id"], record["name"], record["default_code"] or None, category[0], category[1],
+                record["write_date"])
+
+    @staticmethod
+    def _to_record(row):
+        # Same format as the records from the ERP system
+        return {
+            "id": row[0],
+            "name": row[1],
+            "default_code": row[2] if row[2] is not None else False,
+            "categ_id": [row[3], row[4]] if row[3] is not None else False
+        }
+
+    def _query(self, where, parameters):
+        with self._connect() as connection:
+            rows = connection.execute("SELECT id, name, default_code, categ_id, categ_name FROM products "
+                                      f"WHERE {where} ORDER BY name, id", parameters).fetchall()
+        return list(map(self._to_record, rows))
+
+    def _get_watermark(self, connection):
+        # Write date from which the records are read, empty if all records must be read
+        watermark = self._get_value(connection, "write_date", "")
+        full_sync = self._get_value(connection, "full_sync")
+        if watermark == "" or full_sync is None or connection.execute(
+                "SELECT ? < datetime('now', 'localtime', ?)",
+                (full_sync, f"-{self.FULL_SYNC_INTERVAL} hours")).fetchone()[0]:
+            return ""
+        return connection.execute("SELECT datetime(?, ?)", (watermark, f"-{self.SYNC_OVERLAP} seconds")).fetchone()[0]
+
+    def _fetch(self, client, watermark, local_ids):
+        # Returns the changed records, the IDs of all records and the number of records that were missed before
+        filters = self._FILTERS
+        if watermark != "":
+            filters = [*filters, ["write_date", ">=", watermark]]
+        records = list(client.iter_records("product.template", filters, self._FIELDS))
+        ids = client.execute("product.template", "search", self._FILTERS)
+        # Records that are not in the copy and not changed since the watermark
+        missing = set(ids).difference(local_ids, map(lambda x: x["id"], records))
+        if len(missing) > 0:
+            records.extend(client.iter_records("product.template", [["id", "in", sorted(missing)]], self._FIELDS))
+        return records, ids, len(missing)
+
+    def _update(self, connection, source, records, ids):
+        if self._get_value(connection, "source") != source:
+            # Other ERP system or database, start over
+            connection.execute("DELETE FROM products")
+            connection.execute("DELETE FROM sync")
+            self._set_value(connection, "source", source)
+        connection.executemany("INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?)",
+                               map(self._to_row, records))
+        connection.execute("CREATE TEMP TABLE erp_ids (id INTEGER PRIMARY KEY)")
+        connection.executemany("INSERT INTO erp_ids VALUES (?)", ((record_id,) for record_id in ids))
+        n_deleted = connection.execute("DELETE FROM products WHERE id NOT IN (SELECT id FROM erp_ids)").rowcount
+        connection.execute("DROP TABLE erp_ids")
+        watermark = connection.execute("SELECT MAX(write_date) FROM products").fetchone()[0]
+        if watermark is not None:
+            self._set_value(connection, "write_date", watermark)
+        return n_deleted
+
+    ##########
+    # Public #
+    ##########
+
+    def sync(self, allow_local_copy=False):
+        """
+        Reads the changes from the ERP system into the local copy.
+        Returns True if synchronized now. If the ERP system cannot be reached and allow_local_copy is True, returns True
+        if the local copy was synchronized before.
+        """
+        self._stdout("Synchronizing components from ERP database")
+        with self._lock:
+            with self._connect() as connection:
+                source = self._get_value(connection, "source")
+                watermark = self._get_watermark(connection)
+                last_sync = self._get_value(connection, "last_sync")
+                local_ids = set(row[0] for row in connection.execute("SELECT id FROM products"))
+            client = self._client if self._client is not None else ErpClient.get_default(self._stdout)
+            if client is not None:
+                config = client.get_config()
+                if source != f"{config["url"]}|{config["database"]}":
+                    # Other ERP system or database, read all records
+                    source = f"{config["url"]}|{config["database"]}"
+                    watermark = ""
+                    local_ids = set()
+                try:
+                    records, ids, n_missed = self._fetch(client, watermark, local_ids)
+                    with self._connect() as connection, connection:
+                        n_deleted = self._update(connection, source, records, ids)
+                        now = connection.execute("SELECT datetime('now', 'localtime')").fetchone()[0]
+                        self._set_value(connection, "last_sync", now)
+                        if watermark == "":
+                            self._set_value(connection, "full_sync", now)
+                    self._stdout(f"{len(records)} records updated, {n_deleted} records removed"
+                                 f"{f", {n_missed} missed records read" if n_missed > 0 else ""}")
+                    return True
+                except Exception as e:
+                    self._stdout("Error reading records")
+                    self._stdout(str(e))
+            if not allow_local_copy or last_sync is None:
+                return False
+            self._stdout(f"Using the local copy of the ERP database from {last_sync}")
+            return True
+
+    def get_last_sync(self):
+        with self._connect() as connection:
+            return self._get_value(connection, "last_sync")
+
+    def get_components(self):
+        """
+        Returns the electronic components (including the draft components), ordered by name.
+        """
+        return self._query(f"categ_name IN ({", ".join("?" * len(self._CATEGORIES))})", self._CATEGORIES)
+
+    def get_products_by_prefix(self, prefix):
+        """
+        Returns the products with a product ID that starts with the prefix, ordered by name.
+        """
+        # A range on the index, the upper bound is the prefix with the last character incremented
+        upper = f"{prefix[:-1]}{chr(ord(prefix[-1]) + 1)}"
+        return self._query("default_code >= ? AND default_code < ?", (prefix, upper))
+
+
+if __name__ == "__main__":
+
+    import tempfile
+    import time
+
+    from toolbox.scripts.fake_erp_server import FakeErpServer
+
+    _server = FakeErpServer(20000)
+    _server.start()
+    with tempfile.TemporaryDirectory() as _temp_folder:
+        _mirror = ErpMirror(_server.get_config(), os.path.join(_temp_folder, "erp_products.sqlite"))
+        for _label in ("First", "Second"):
+            _start = time.perf_counter()
+            _mirror.sync()
+            print(f"{_label} synchronization in {time.perf_counter() - _start:.3f} s")
+
+        _server.update_record(5, name="changed component")
+        _server.delete_record(6)
+        _server.update_record(40, categ_id=[3, "Office supplies"], default_code=False)
+        _server.add_record("new component", "1910-99999")
+        _mirror.sync()
+        _components = _mirror.get_components()
+        print("Components:", len(_components))
+        print([_component for _component in _components if _component["id"] in (5, 6, 40)])
+
+        _start = time.perf_counter()
+        _products = _mirror.get_products_by_prefix("1910-")
+        print(f"Products 1910-: {len(_products)} in {(time.perf_counter() - _start) * 1000:.1f} ms, "
+              f"highest: {max(_product["default_code"] for _product in _products)}")
+
+        _server.stop()
+        print("Offline:", _mirror.sync(), _mirror.sync(allow_local_copy=True), len(_mirror.get_components()))
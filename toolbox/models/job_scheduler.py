@@ -0,0 +1,150 @@
+"""
+Runs jobs in parallel, taking the dependencies between the jobs into account.
+
+A job is started as soon as all jobs it depends on are finished and a worker is available.
+When a job fails, the jobs that depend on it are not started.
+The results are retrieved per job, so the caller can report them in a fixed order, independent of the order in
+which the jobs finished. The stdout function is only called from the thread that runs the jobs.
+"""
+
+import queue
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobScheduler:
+
+    stdout = print
+
+    MAX_WORKERS = 4
+
+    def __init__(self, max_workers=None):
+        self._max_workers = max_workers if max_workers is not None else self.MAX_WORKERS
+        self._jobs = []
+
+    ###########
+    # Private #
+    ###########
+
+    @staticmethod
+    def _run_job(job, events):
+        start = time.perf_counter()
+        try:
+            job["result"] = job["function"](*job["args"])
+        except Exception as e:
+            job["error"] = e
+        job["duration"] = time.perf_counter() - start
+        events.put(job["id"])
+
+    def _can_start(self, job):
+        return all(self._jobs[job_id]["state"] == "done" for job_id in job["depends_on"])
+
+    def _is_blocked(self, job):
+        return any(self._jobs[job_id]["state"] in ("failed", "skipped") for job_id in job["depends_on"])
+
+    ##########
+    # Public #
+    ##########
+
+    def add_job(self, name, function, *args, depends_on=()):
+        """
+        Adds a job that calls function(*args) and returns the ID of the job.
+        The job is started after the jobs in depends_on (list of job IDs) are finished.
+        """
+        for job_id in depends_on:
+            if not 0 <= job_id < len(self._jobs):
+                raise Exception(f"Job '{name}' depends on an unknown job ID {job_id}")
+        self._jobs.append({
+            "id": len(self._jobs),
+            "name": name,
+            "function": function,
+            "args": args,
+            "depends_on": list(depends_on),
+            "state": "waiting",
+            "result": None,
+            "error": None,
+            "duration": 0
+        })
+        return len(self._jobs) - 1
+
+    def get_jobs(self):
+        """
+        Returns a list with the name, function and arguments of the jobs, in the order they are added.
+        """
+        return [(job["name"], job["function"], job["args"]) for job in self._jobs]
+
+    def run(self):
+        """
+        Runs all jobs and waits until they are finished.
+        """
+        start = time.perf_counter()
+        events = queue.Queue()
+        n_running = 0
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            while True:
+                # Jobs are only added before the jobs they depend on, so one pass in order is enough
+                for job in self._jobs:
+                    if job["state"] != "waiting":
+                        continue
+                    if self._is_blocked(job):
+                        job["state"] = "skipped"
+                        self.stdout(f"Skipped: {job["name"]}")
+                    elif self._can_start(job):
+                        job["state"] = "running"
+                        n_running += 1
+                        self.stdout(f"Started: {job["name"]}")
+                        executor.submit(self._run_job, job, events)
+                if n_running == 0:
+                    break
+                job = self._jobs[events.get()]
+                n_running -= 1
+                if job["error"] is None:
+                    job["state"] = "done"
+                    self.stdout(f"Finished: {job["name"]} ({job["duration"]:.1f} s)")
+                else:
+                    job["state"] = "failed"
+                    self.stdout(f"Failed: {job["name"]}: {job["error"]}")
+        self.stdout(f"All jobs done in {time.perf_counter() - start:.1f} s")
+
+    def get_state(self, job_id):
+        """
+        Returns the state of the job: waiting, running, done, failed or skipped.
+        """
+        return self._jobs[job_id]["state"]
+
+    def get_result(self, job_id):
+        """
+        Returns the result of the job. Raises the exception of the job if the job failed.
+        """
+        job = self._jobs[job_id]
+        if job["state"] == "failed":
+            raise job["error"]
+        if job["state"] == "skipped":
+            raise Exception(f"Job '{job["name"]}' is skipped, because a job it depends on failed")
+        if job["state"] != "done":
+            raise Exception(f"Job '{job["name"]}' did not run")
+        return job["result"]
+
+
+if __name__ == "__main__":
+
+    def _sleep(name, duration):
+        time.sleep(duration)
+        return f"{name} done"
+
+    def _fail():
+        raise Exception("failed on purpose")
+
+    _scheduler = JobScheduler(3)
+    _a = _scheduler.add_job("A", _sleep, "A", 0.3)
+    _b = _scheduler.add_job("B", _sleep, "B", 0.1)
+    _c = _scheduler.add_job("C", _sleep, "C", 0.1, depends_on=[_a, _b])
+    _d = _scheduler.add_job("D", _fail)
+    _e = _scheduler.add_job("E", _sleep, "E", 0.1, depends_on=[_d])
+    _scheduler.run()
+    for _job_id in (_a, _b, _c, _d, _e):
+        try:
+            print(_scheduler.get_result(_job_id))
+        except Exception as _e:
+            print("Error:", _e)
@@ -1,145 +1,564 @@
 """
 Module for using the KiCad command line interface (CLI)
+
+The exports can be run one by one (generate_* methods) or all at once in a jobset (get_*_job methods and
+run_jobset). A jobset loads the schematics and the layout only once, this is supported from KiCad 9.
+The outputs of the exports are stored in the artifact cache. When the command, the KiCad version and the input files
+are the same, the output is copied from the cache instead of running the export again.
+The input files of a schematics export are the project file and all schematic files of the design, also the sheet
+files in other folders. The key of a layout export has only the part of the layout that the export uses: the elements
+on the layers of the export and the elements without a layer (e.g. the setup and the nets). The footprints are always
+part of it, with only their children on the layers of the export (the properties only with their value). So a
+silkscreen change does not invalidate the drill files, the position file and the STEP file. The ODB++ export uses
+all layers. Changes in the layout file that are not in the content (e.g. white space) do not invalidate outputs.
+The 3D model files are also input files of the STEP export. These are resolved like KiCad does: environment variables
+(${KIPRJMOD} is the project folder) and relative to the project folder or MODEL_PATHS. If a 3D model file is not
+found, the STEP export is not cached.
+
+The kicad-cli executable is searched in this order: CLI_EXE, the KICAD_CLI environment variable, the PATH and the
+default installation folders. The first one found is used. The path and the version are stored in the cache folder,
+so the next time the executable does not have to be searched and started for getting the version.
 """
 
+import fnmatch
+import glob
+import hashlib
+import json
 import os
+import re
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import uuid
 import zipfile
 
+from toolbox.app_data import AppData
+from toolbox.models.artifact_cache import ArtifactCache
+from toolbox.models.parsers.design_model import DesignModel
+from toolbox.models.parsers.sexpr_parser import SExprParser
+
 
 class KiCadCli:
 
-    _PATH = "C:\\Program Files\\KiCad"
-    _EXE_NAME = "kicad-cli.exe"
+    # Path to the kicad-cli executable, None searches the executable
+    # A Python script can be used as a stand-in for testing (see scripts/fake_kicad_cli.py)
+    CLI_EXE = None
+    CLI_ENV_VAR = "KICAD_CLI"
+    CACHE_ENABLED = True
+    CACHE_FILENAME = os.path.join(AppData.CACHE_PATH, "kicad_cli.json")
+    JOBSET_MIN_VERSION = 9
+    # Folders for 3D model paths that are not found relative to the project folder
+    MODEL_PATHS = [os.path.join(AppData.APP_PATH, "3d_models")]
+
+    _EXE_NAME = "kicad-cli.exe" if os.name == "nt" else "kicad-cli"
+    # Default installation folders, the versions in a folder are sorted from new to old
+    _INSTALL_PATTERNS = [
+        os.path.join(os.environ.get("ProgramFiles", "C:\\Program Files"), "KiCad", "*", "bin", "kicad-cli.exe"),
+        os.path.join(os.environ.get("LOCALAPPDATA", "C:\\Users\\Default\\AppData\\Local"), "Programs", "KiCad", "*",
+                     "bin", "kicad-cli.exe"),
+        "/usr/bin/kicad-cli",
+        "/usr/local/bin/kicad-cli",
+        "/usr/lib/kicad/bin/kicad-cli",
+        "/opt/kicad/bin/kicad-cli",
+        "/Applications/KiCad/KiCad.app/Contents/MacOS/kicad-cli"
+    ]
+    # Found executable and version for this process
+    _found = None
+    _found_lock = threading.Lock()
+    # Layer names of kicad-cli that are different in the layout file
+    _LAYER_NAMES = {
+        "F.Silkscreen": "F.SilkS",
+        "B.Silkscreen": "B.SilkS",
+        "F.Courtyard": "F.CrtYd",
+        "B.Courtyard": "B.CrtYd",
+        "F.Adhesive": "F.Adhes",
+        "B.Adhesive": "B.Adhes",
+        "User.Drawings": "Dwgs.User",
+        "User.Comments": "Cmts.User",
+        "User.Eco1": "Eco1.User",
+        "User.Eco2": "Eco2.User"
+    }
+    # Layers of the layout exports that do not have a list of layers
+    _DRILL_LAYERS = ["*.Cu"]
+    _POSITION_LAYERS = []
+    _STEP_LAYERS = ["Edge.Cuts", "*.Cu"]
+    _ODB_LAYERS = ["*"]
+    # Hashes of the parts of the layouts: (filename, signature, layers): hash
+    # The hashes of the layers of the exports and all layers used before are made in one pass over the layout, the
+    # layers are in the names of the layout file
+    _layout_hashes = {}
+    _layout_layers = {("*.Cu",), (), ("Edge.Cuts", "*.Cu"), ("*",), ("Edge.Cuts", "F.Fab", "F.SilkS"),
+                      ("Edge.Cuts", "B.Fab", "B.SilkS")}
+    _layout_hashes_lock = threading.Lock()
+    _MODEL = re.compile(rb'\(model\s+"((?:[^"\\]|\\.)*)"')
+    _VARIABLE = re.compile(r"\$\{(\w+)}")
+    _PCB_PDF_OPTIONS = ["--include-border-title", "--crossout-DNP-footprints-on-fab-layers",
+                        "--drill-shape-opt", "0", "--mode-single"]
 
     def __init__(self):
-        self._cli_exe = self._find_cli_exe()
+        self._cli_exe, self._version = self._get_cli_exe()
+        self._artifact_cache = ArtifactCache()
 
     ###########
     # Private #
     ###########
 
-    def _find_cli_exe(self):
-        for current_folder, sub_folders, filenames in os.walk(self._PATH):
-            sub_folders.sort()
-            if self._EXE_NAME in filenames:
-                return os.path.join(current_folder, self._EXE_NAME)
-        raise Exception(f"Executable '{self._EXE_NAME}' not found")
+    @classmethod
+    def _get_configured_exe(cls):
+        if cls.CLI_EXE is not None:
+            return cls.CLI_EXE
+        return os.environ.get(cls.CLI_ENV_VAR, "").strip()
+
+    @classmethod
+    def _find_cli_exe(cls):
+        configured = cls._get_configured_exe()
+        if configured != "":
+            if not os.path.isfile(configured):
+                raise Exception(f"Executable '{configured}' not found")
+            return configured
+        cli_exe = shutil.which(cls._EXE_NAME)
+        if cli_exe is not None:
+            return cli_exe
+        for pattern in cls._INSTALL_PATTERNS:
+            # Newest version first, compare the version numbers in the path
+            filenames = sorted(glob.glob(pattern), reverse=True,
+                               key=lambda x: [int(number) for number in re.findall(r"\d+", x)])
+            if len(filenames) > 0:
+                return filenames[0]
+        raise Exception(f"Executable '{cls._EXE_NAME}' not found, set the path in the {cls.CLI_ENV_VAR} "
+                        f"environment variable")
+
+    @staticmethod
+    def _get_signature(filename):
+        stat = os.stat(filename)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @classmethod
+    def _load_found(cls):
+        if cls.CACHE_ENABLED and os.path.isfile(cls.CACHE_FILENAME):
+            try:
+                with open(cls.CACHE_FILENAME, "r") as fp:
+                    return json.load(fp)
+            except (Exception,):
+                # Unreadable cache file, search again
+                pass
+        return None
 
-    def _run_command(self, params):
-        cmd = [self._cli_exe]
+    @classmethod
+    def _save_found(cls, found):
+        if cls.CACHE_ENABLED:
+            os.makedirs(os.path.dirname(cls.CACHE_FILENAME), exist_ok=True)
+            temp_filename = f"{cls.CACHE_FILENAME}.{os.getpid()}.tmp"
+            with open(temp_filename, "w") as fp:
+                json.dump(found, fp, indent=2)
+            os.replace(temp_filename, cls.CACHE_FILENAME)
+
+    @classmethod
+    def _is_valid(cls, found):
+        # Still the same configuration and the executable is not changed (e.g. by an update of KiCad)
+        try:
+            return (found is not None and found["configured"] == cls._get_configured_exe() and
+                    found["signature"] == cls._get_signature(found["path"]))
+        except (Exception,):
+            return False
+
+    @classmethod
+    def _get_cli_exe(cls):
+        # Returns the path and the version of the executable
+        with cls._found_lock:
+            found = cls._found if cls.CACHE_ENABLED else None
+            if not cls._is_valid(found):
+                found = cls._load_found()
+                if not cls._is_valid(found):
+                    cli_exe = cls._find_cli_exe()
+                    found = {
+                        "configured": cls._get_configured_exe(),
+                        "path": cli_exe,
+                        "signature": cls._get_signature(cli_exe),
+                        "version": cls._run_exe(cli_exe, ["version"])[1]
+                    }
+                    cls._save_found(found)
+                cls._found = found
+            return found["path"], found["version"]
+
+    @staticmethod
+    def _run_exe(cli_exe, params):
+        cmd = [sys.executable, cli_exe] if cli_exe.endswith(".py") else [cli_exe]
         cmd.extend(params)
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-        return f"{result.stdout.strip()}\n{result.stderr.strip()}".strip()
+        # No shell and no console window, so the parameters are passed as is
+        flags = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+        result = subprocess.run(cmd, capture_output=True, text=True, creationflags=flags)
+        return result.returncode, f"{result.stdout.strip()}\n{result.stderr.strip()}".strip()
+
+    def _run(self, params):
+        return self._run_exe(self._cli_exe, params)
+
+    @staticmethod
+    def _get_input_files(input_file):
+        # Files that the output of an export depends on
+        base_name = os.path.splitext(input_file)[0]
+        input_files = [f"{base_name}.kicad_pro"]
+        if input_file.endswith(".kicad_sch"):
+            # Including the sheet files in other folders, the files in the project folder that are not found as sheet
+            # are also used (e.g. when there is no root schematic)
+            input_files.extend(glob.glob(os.path.join(glob.escape(os.path.dirname(input_file)), "*.kicad_sch")))
+            sheets = DesignModel.get_model(os.path.dirname(os.path.abspath(input_file))).get_sheet_instances()
+            input_files.extend(sheet["filename"] for sheet in sheets)
+        else:
+            input_files.extend([input_file, f"{base_name}.kicad_dru"])
+        return sorted(set(filter(os.path.isfile, input_files)))
+
+    @classmethod
+    def _resolve_model(cls, model, project_folder):
+        # Returns the full path of the 3D model file, None if not found
+        variables = {**os.environ, "KIPRJMOD": project_folder}
+        path = cls._VARIABLE.sub(lambda x: variables.get(x.group(1), x.group(0)), model)
+        if "${" in path:
+            return None
+        for folder in [project_folder, *cls.MODEL_PATHS]:
+            filename = os.path.normpath(os.path.join(folder, path))
+            if os.path.isfile(filename):
+                return filename
+        return None
+
+    @classmethod
+    def _get_model_files(cls, pcb_file):
+        # Returns the 3D model files of the layout and the 3D models that are not found
+        with open(pcb_file, "rb") as fp:
+            models = set(match.group(1).decode("utf-8") for match in cls._MODEL.finditer(fp.read()))
+        project_folder = os.path.dirname(os.path.abspath(pcb_file))
+        model_files = {}
+        for model in models:
+            model_files[model] = cls._resolve_model(model, project_folder)
+        return (sorted(set(filename for filename in model_files.values() if filename is not None)),
+                sorted(model for model, filename in model_files.items() if filename is None))
+
+    @staticmethod
+    def _is_on_layers(element, layers):
+        # True if the element has no layer or is on one of the layers, both can have wildcards (*.Cu)
+        names = [name for child in element[1:] if isinstance(child, list) and child[0] in ("layer", "layers")
+                 for name in child[1:] if isinstance(name, str)]
+        if len(names) == 0:
+            return True
+        # F&B.Cu is F.Cu and B.Cu
+        names = [item for name in names for item in
+                 ([f"F.{name[4:]}", f"B.{name[4:]}"] if name.startswith("F&B.") else [name])]
+        return any(fnmatch.fnmatchcase(name, layer) or fnmatch.fnmatchcase(layer, name)
+                   for name in names for layer in layers)
+
+    @classmethod
+    def _filter_element(cls, element, layers):
+        # Returns the part of a top level layout element for the layers, None if it is not on the layers
+        if element[0] != "footprint":
+            return element if cls._is_on_layers(element, layers) else None
+        children = []
+        for child in element[1:]:
+            if not isinstance(child, list) or cls._is_on_layers(child, layers):
+                children.append(child)
+            elif child[0] == "property":
+                # The value is used by all exports (e.g. the reference), the text only on its layer
+                children.append(child[:3])
+        return [element[0], *children]
+
+    @classmethod
+    def _get_layout_hash(cls, pcb_file, layers):
+        # Returns the hash of the part of the layout for the layers (the kicad-cli layer names)
+        layers = tuple(cls._LAYER_NAMES.get(layer, layer) for layer in layers)
+        file_key = (os.path.abspath(pcb_file), tuple(cls._get_signature(pcb_file)))
+        with cls._layout_hashes_lock:
+            if (*file_key, layers) not in cls._layout_hashes:
+                cls._layout_layers.add(layers)
+                hashes = {item: hashlib.sha256() for item in cls._layout_layers}
+                for element in SExprParser.iter_elements(pcb_file):
+                    for item, layout_hash in hashes.items():
+                        part = cls._filter_element(element, item)
+                        if part is not None:
+                            layout_hash.update(json.dumps(part).encode("utf-8"))
+                # Only the hashes of the last version of a layout are kept
+                cls._layout_hashes = {key: value for key, value in cls._layout_hashes.items() if key[0] != file_key[0]}
+                cls._layout_hashes.update({(*file_key, item): value.hexdigest() for item, value in hashes.items()})
+            return cls._layout_hashes[(*file_key, layers)]
+
+    def _get_key(self, command, input_file, with_models=False, layers=None):
+        # Returns the key and a warning, the key is None if the output cannot be cached
+        # For a layout export with layers only the part of the layout on these layers is in the key
+        input_files = self._get_input_files(input_file)
+        if layers is not None and input_file in input_files:
+            input_files.remove(input_file)
+            command = [*command, f"layout:{self._get_layout_hash(input_file, layers)}"]
+        if with_models and os.path.isfile(input_file):
+            model_files, missing = self._get_model_files(input_file)
+            if len(missing) > 0:
+                return None, f"3D models not found, the output is not cached: {", ".join(missing)}"
+            input_files.extend(model_files)
+        return self._artifact_cache.get_key(command, input_files), ""
+
+    @staticmethod
+    def _has_output(output):
+        # An output file that is not empty, or an output folder with files
+        if os.path.isdir(output):
+            return len(os.listdir(output)) > 0
+        return os.path.isfile(output) and os.path.getsize(output) > 0
+
+    def _run_export(self, cmd, input_file, output, is_folder=False, with_models=False, layers=None):
+        # The output path is not part of the key, so outputs with a different name (e.g. date) can be restored
+        key, warning = self._get_key([self.get_version(), *cmd, os.path.basename(input_file)], input_file,
+                                     with_models, layers)
+        if key is not None and self._artifact_cache.restore(key, output):
+            return f"Restored from cache: {output}"
+        # The export is done in an empty folder first, so only the output of this export is stored
+        # and an old output is never stored for a failed export
+        with tempfile.TemporaryDirectory() as temp_folder:
+            temp_output = temp_folder if is_folder else os.path.join(temp_folder, os.path.basename(output))
+            return_code, result = self._run([*cmd, "--output", temp_output, input_file])
+            if os.path.exists(temp_output) and (not is_folder or len(os.listdir(temp_output)) > 0):
+                self._artifact_cache.copy_output(temp_output, output)
+            if key is not None and return_code == 0 and self._has_output(temp_output):
+                self._artifact_cache.store(key, temp_output)
+        return "\n".join(filter(None, [warning, result.replace(temp_output, output)]))
+
+    @staticmethod
+    def _get_gerber_layers(n_layers):
+        layers = "Edge.Cuts,F.Cu,B.Cu"
+        for i in range(1, n_layers - 1):
+            layers += f",In{i}.Cu"
+        layers += ",F.Mask,B.Mask,F.Silkscreen,B.Silkscreen,F.Paste,B.Paste"
+        return layers
+
+    @staticmethod
+    def _create_job(job_type, description, output, settings, is_folder=False, layers=None):
+        # The layers are the layers of the layout that the job uses, for the key in the artifact cache
+        return {
+            "type": job_type,
+            "description": description,
+            "settings": {"output_filename": output, **settings},
+            "is_folder": is_folder,
+            "layers": layers
+        }
 
     ##########
     # Public #
     ##########
 
     def get_version(self):
-        return self._run_command(["version"])
+        return self._version
+
+    def get_cli_exe(self):
+        return self._cli_exe
+
+    def get_major_version(self):
+        match = re.match(r"(\d+)\.", self.get_version())
+        return int(match.group(1)) if match is not None else 0
+
+    def supports_jobsets(self):
+        return self.get_major_version() >= self.JOBSET_MIN_VERSION
+
+    @staticmethod
+    def get_bom_settings(option):
+        """
+        Returns the fields (comma separated), the group by field and the field delimiter of a BOM option.
+        """
+        if option == "lily_erp":
+            return "Lily_ID,${QUANTITY}", "Lily_ID", ","
+        if option == "jlcpcb":
+            return "Reference,Value,Footprint,${QUANTITY},JLCPCB_ID", "JLCPCB_ID", ","
+        # Default
+        return "Reference,Value,Footprint,${QUANTITY},Manufacturer,Manufacturer_ID,Lily_ID", "Manufacturer_ID", "\t"
 
     def generate_schematics_pdf(self, input_file, output_file):
         cmd = ["sch", "export", "pdf"]
-        cmd.extend(["--output", output_file])
-        cmd.append(input_file)
-        return self._run_command(cmd)
+        return self._run_export(cmd, input_file, output_file)
 
     def generate_bill_of_materials(self, input_file, output_file, option=""):
+        fields, group_by, delimiter = self.get_bom_settings(option)
         cmd = ["sch", "export", "bom"]
         cmd.append("--exclude-dnp")
-        cmd.extend(["--output", output_file])
-        if option == "lily_erp":
-            cmd.extend(["--fields", "Lily_ID,${QUANTITY}"])
-            cmd.extend(["--group-by", "Lily_ID"])
-        elif option == "jlcpcb":
-            cmd.extend(["--fields", "Reference,Value,Footprint,${QUANTITY},JLCPCB_ID"])
-            cmd.extend(["--group-by", "JLCPCB_ID"])
-        else:
-            # Default
-            cmd.extend(["--fields", "Reference,Value,Footprint,${QUANTITY},Manufacturer,Manufacturer_ID,Lily_ID"])
-            cmd.extend(["--group-by", "Manufacturer_ID"])
-            cmd.extend(["--field-delimiter", "\t"])
-        cmd.append(input_file)
-        return self._run_command(cmd)
+        cmd.extend(["--fields", fields])
+        cmd.extend(["--group-by", group_by])
+        if delimiter != ",":
+            cmd.extend(["--field-delimiter", delimiter])
+        return self._run_export(cmd, input_file, output_file)
 
-    def generate_gerbers(self, input_file, output_folder, zip_filename, n_layers=2):
-        # Generate gerbers
+    def generate_gerber_files(self, input_file, output_folder, n_layers=2):
         cmd = ["pcb", "export", "gerbers"]
-        cmd.extend(["--output", output_folder])
-        layers = "Edge.Cuts,F.Cu,B.Cu"
-        for i in range(1, n_layers - 1):
-            layers += f",In{i}.Cu"
-        layers += ",F.Mask,B.Mask,F.Silkscreen,B.Silkscreen,F.Paste,B.Paste"
-        cmd.extend(["--layers", layers])
+        cmd.extend(["--layers", self._get_gerber_layers(n_layers)])
         cmd.append("--use-drill-file-origin")
         cmd.append("--no-protel-ext")
-        cmd.append(input_file)
-        result = self._run_command(cmd)
-        # Add drill
+        return self._run_export(cmd, input_file, output_folder, True,
+                                layers=self._get_gerber_layers(n_layers).split(","))
+
+    def generate_drill_files(self, input_file, output_folder):
         cmd = ["pcb", "export", "drill"]
-        cmd.extend(["--output", output_folder])
         cmd.extend(["--drill-origin", "plot"])
         cmd.append("--excellon-separate-th")
-        cmd.append(input_file)
-        result += "\n" + self._run_command(cmd)
-        # Generate ZIP file
+        return self._run_export(cmd, input_file, output_folder, True, layers=self._DRILL_LAYERS)
+
+    @staticmethod
+    def create_zip_file(input_folder, zip_filename):
         with zipfile.ZipFile(zip_filename, "w", compression=zipfile.ZIP_DEFLATED) as fp:
-            for item in os.listdir(output_folder):
-                fp.write(os.path.join(output_folder, item), item)
-        result += f"\nCreated zip file: {zip_filename}"
+            for item in sorted(os.listdir(input_folder)):
+                fp.write(os.path.join(input_folder, item), item)
+        return f"Created zip file: {zip_filename}"
+
+    def generate_gerbers(self, input_file, output_folder, zip_filename, n_layers=2):
+        result = self.generate_gerber_files(input_file, output_folder, n_layers)
+        result += "\n" + self.generate_drill_files(input_file, output_folder)
+        result += "\n" + self.create_zip_file(output_folder, zip_filename)
         return result
 
     def generate_position_file(self, input_file, output_file):
         cmd = ["pcb", "export", "pos"]
-        cmd.extend(["--output", output_file])
         cmd.extend(["--side", "both"])
         cmd.extend(["--format", "csv"])
         cmd.extend(["--units", "mm"])
         cmd.append("--use-drill-file-origin")
         cmd.append("--exclude-dnp")
-        cmd.append(input_file)
-        return self._run_command(cmd)
+        return self._run_export(cmd, input_file, output_file, layers=self._POSITION_LAYERS)
 
     def generate_pcb_pdf(self, input_file, output_file, bottom=False):
-        common = ["--include-border-title", "--crossout-DNP-footprints-on-fab-layers",
-                  "--drill-shape-opt", "0", "--mode-single"]
         # Generate top placement
         output_file = output_file.replace(".pdf", "_top.pdf")
         cmd = ["pcb", "export", "pdf"]
-        cmd.extend(["--output", output_file])
         cmd.extend(["--layers", "Edge.Cuts,F.Fab,F.Silkscreen"])
-        cmd.extend(common)
-        cmd.append(input_file)
-        result = self._run_command(cmd)
+        cmd.extend(self._PCB_PDF_OPTIONS)
+        result = self._run_export(cmd, input_file, output_file, layers=["Edge.Cuts", "F.Fab", "F.Silkscreen"])
         if bottom:
             # Generate bottom
             output_file = output_file.replace("_top.pdf", "_bot.pdf")
             cmd = ["pcb", "export", "pdf"]
-            cmd.extend(["--output", output_file])
             cmd.extend(["--layers", "Edge.Cuts,B.Fab,B.Silkscreen"])
-            cmd.extend(common)
+            cmd.extend(self._PCB_PDF_OPTIONS)
             cmd.append("--mirror")
-            cmd.append(input_file)
-            result += "\n" + self._run_command(cmd)
+            result += "\n" + self._run_export(cmd, input_file, output_file,
+                                              layers=["Edge.Cuts", "B.Fab", "B.Silkscreen"])
         return result
 
     def generate_odb(self, input_file, output_file):
         cmd = ["pcb", "export", "odb"]
-        cmd.extend(["--output", output_file])
         cmd.extend(["--compression", "zip"])
-        cmd.append(input_file)
-        return self._run_command(cmd)
+        return self._run_export(cmd, input_file, output_file, layers=self._ODB_LAYERS)
 
     def generate_step(self, input_file, output_file):
         cmd = ["pcb", "export", "step"]
-        cmd.extend(["--output", output_file])
         cmd.append("--no-unspecified")
         cmd.append("--no-dnp")
         cmd.append("--drill-origin")
         cmd.append("--include-pads")
-        cmd.append(input_file)
-        return self._run_command(cmd)
+        return self._run_export(cmd, input_file, output_file, with_models=True, layers=self._STEP_LAYERS)
+
+    # Jobs for a jobset, these have the same settings as the generate methods
+
+    def get_schematics_pdf_job(self, output_file):
+        return self._create_job("sch_export_plot_pdf", "Schematics to PDF", output_file, {})
+
+    def get_gerber_files_job(self, output_folder, n_layers=2):
+        layers = self._get_gerber_layers(n_layers).split(",")
+        return self._create_job("pcb_export_gerbers", "Gerbers", output_folder, {
+            "layers": layers,
+            "use_drill_origin": True,
+            "use_protel_file_extension": False
+        }, True, layers)
+
+    def get_drill_files_job(self, output_folder):
+        return self._create_job("pcb_export_drill", "Drill data", output_folder, {
+            "drill_origin": "plot",
+            "excellon.combine_pth_npth": False
+        }, True, self._DRILL_LAYERS)
+
+    def get_pcb_pdf_jobs(self, output_file, bottom=False):
+        settings = {
+            "plot_drawing_sheet": True,
+            "crossout_dnp_footprints_on_fab_layers": True,
+            "drill_shape": "none",
+            "pdf_gen_mode": "all-layers-one-file"
+        }
+        jobs = [self._create_job("pcb_export_pdf", "PCB top placement", output_file.replace(".pdf", "_top.pdf"), {
+            "layers": ["Edge.Cuts", "F.Fab", "F.Silkscreen"],
+            "mirror": False,
+            **settings
+        }, layers=["Edge.Cuts", "F.Fab", "F.Silkscreen"])]
+        if bottom:
+            jobs.append(self._create_job("pcb_export_pdf", "PCB bottom placement",
+                                         output_file.replace(".pdf", "_bot.pdf"), {
+                "layers": ["Edge.Cuts", "B.Fab", "B.Silkscreen"],
+                "mirror": True,
+                **settings
+            }, layers=["Edge.Cuts", "B.Fab", "B.Silkscreen"]))
+        return jobs
+
+    def get_odb_job(self, output_file):
+        return self._create_job("pcb_export_odb", "ODB++", output_file, {"compression": "zip"}, layers=self._ODB_LAYERS)
+
+    def get_step_job(self, output_file):
+        return self._create_job("pcb_export_3d", "3D model", output_file, {
+            "format": "step",
+            "include_unspecified": False,
+            "include_dnp": False,
+            "use_drill_origin": True,
+            "export_pads": True
+        }, layers=self._STEP_LAYERS)
+
+    def run_jobset(self, project_file, jobs, output_folder):
+        """
+        Runs the jobs with one kicad-cli call. The outputs of the jobs must be in the output folder.
+        The outputs of jobs that are in the artifact cache are restored, these jobs are not run.
+        Returns True and the output of kicad-cli when all jobs are done, else False and the output.
+        """
+        base_name = os.path.splitext(project_file)[0]
+        results = []
+        jobs_to_run = []
+        for job in jobs:
+            settings = dict(job["settings"])
+            output = settings.pop("output_filename")
+            input_file = f"{base_name}.kicad_sch" if job["type"].startswith("sch_") else f"{base_name}.kicad_pcb"
+            key, warning = self._get_key([self.get_version(), "jobset", job["type"],
+                                          json.dumps(settings, sort_keys=True), os.path.basename(input_file)],
+                                         input_file, job["type"] == "pcb_export_3d", job["layers"])
+            if warning != "":
+                results.append(warning)
+            if key is not None and self._artifact_cache.restore(key, output):
+                results.append(f"Restored from cache: {output}")
+            else:
+                jobs_to_run.append((job, key, output))
+        if len(jobs_to_run) == 0:
+            return True, "\n".join(results)
+
+        with tempfile.TemporaryDirectory() as folder:
+            # Each job has its own output in a temporary folder, so the output of each job is known
+            jobset = {"jobs": [], "meta": {"version": 1}, "outputs": []}
+            job_outputs = []
+            for i, (job, key, output) in enumerate(jobs_to_run):
+                settings = dict(job["settings"])
+                settings["output_filename"] = f"job_{i}" if job["is_folder"] else f"job_{i}_{os.path.basename(output)}"
+                job_outputs.append(os.path.join(folder, "output", settings["output_filename"]))
+                jobset["jobs"].append({
+                    "description": job["description"],
+                    "id": str(uuid.uuid4()),
+                    "settings": settings,
+                    "type": job["type"]
+                })
+            jobset["outputs"].append({
+                "description": "Output folder",
+                "id": str(uuid.uuid4()),
+                "only": [job["id"] for job in jobset["jobs"]],
+                "settings": {"output_path": os.path.join(folder, "output")},
+                "type": "folder"
+            })
+            jobset_filename = os.path.join(folder, "outputs.kicad_jobset")
+            with open(jobset_filename, "w") as fp:
+                json.dump(jobset, fp, indent=2)
+            return_code, result = self._run(["jobset", "run", "--stop-on-error", "--file", jobset_filename,
+                                             project_file])
+            results.append(result)
+            if return_code == 0:
+                for (_, key, output), job_output in zip(jobs_to_run, job_outputs):
+                    if self._has_output(job_output):
+                        if key is not None:
+                            self._artifact_cache.store(key, job_output)
+                        self._artifact_cache.copy_output(job_output, output)
+        return return_code == 0, "\n".join(results).strip()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,495 @@
+"""
+Model of a KiCad design, the schematics and the layout are each read only once.
+
+The schematics are read the first time schematics data is requested, the layout the first time layout data is
+requested. The models are shared per project folder and read again when a design file is changed: a file in the
+project folder or a sheet file that is read by the model (also in other folders).
+The data returned from the model is shared, do not modify it.
+
+The schematics properties, the layers and the PCB properties are read from the file headers (HeaderReader), until
+the complete schematics or layout is read. This is fast, also for large designs.
+
+The schematics are read from the root schematic, following the sheet references. Each schematic file is read once,
+also when it is used by multiple sheets. Schematic files that are not used by the design are not read.
+The files are read serially: reading in worker processes was slower, even for the largest test design (13 files,
+0.6 MB, about 60 ms), starting the processes takes longer than reading the files.
+"""
+
+import glob
+import os
+import threading
+
+from toolbox.models.parsers.header_reader import HeaderReader
+from toolbox.models.parsers.sexpr_parser import SExprParser
+
+
+class DesignModel:
+
+    stdout = print
+
+    _models = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, project_folder):
+        self._project_folder = project_folder
+        self._lock = threading.Lock()
+        self._schematics = None
+        self._schematics_header = None
+        self._pcb = None
+        self._pcb_header = None
+        # Signature of the schematic files read by the model and the sheet files that were not found
+        self._files_signature = []
+
+    ###########
+    # Private #
+    ###########
+
+    @staticmethod
+    def _get_schematics_files(project_folder):
+        return glob.glob(os.path.join(project_folder, "*.kicad_sch"))
+
+    @classmethod
+    def _get_root_schematics_file(cls, project_folder):
+        items = glob.glob(os.path.join(project_folder, "*.kicad_pro"))
+        if len(items) == 1:
+            filename = f"{os.path.splitext(items[0])[0]}.kicad_sch"
+            if os.path.isfile(filename):
+                return filename
+        items = cls._get_schematics_files(project_folder)
+        if len(items) == 1:
+            return items[0]
+        return ""
+
+    @staticmethod
+    def _get_pcb_file(project_folder):
+        items = glob.glob(os.path.join(project_folder, "*.kicad_pcb"))
+        if len(items) == 1:
+            return items[0]
+        return ""
+
+    @staticmethod
+    def _get_files_signature(filenames):
+        signature = []
+        for filename in filenames:
+            if os.path.isfile(filename):
+                stat = os.stat(filename)
+                signature.append((filename, stat.st_mtime_ns, stat.st_size))
+            else:
+                signature.append((filename, None, None))
+        return signature
+
+    @classmethod
+    def _get_signature(cls, project_folder):
+        pcb_file = cls._get_pcb_file(project_folder)
+        return cls._get_files_signature([*cls._get_schematics_files(project_folder), *filter(None, [pcb_file])])
+
+    def _is_changed(self):
+        # True if a schematic file that the model read is changed, or a sheet file that was not found exists
+        # Not locked, so get_model does not wait while the schematics are read, the signature is set at once
+        files_signature = self._files_signature
+        return self._get_files_signature([item[0] for item in files_signature]) != files_signature
+
+    @staticmethod
+    def _new_schematics_properties():
+        return {
+            "design_name": "",
+            "date": "",
+            "revision": "",
+            "pca_id": "",
+            "pcb_id": ""
+        }
+
+    @classmethod
+    def _new_pcb_properties(cls):
+        return {
+            **cls._new_schematics_properties(),
+            "n_layers": 0,
+            "has_comp_bot": False
+        }
+
+    @staticmethod
+    def _parse_layers(element, properties):
+        layers = [layer[1] for layer in element[1:] if isinstance(layer, list) and len(layer) > 1]
+        properties["n_layers"] = len(list(filter(lambda x: x.endswith(".Cu"), layers)))
+        return layers
+
+    @staticmethod
+    def _parse_property(element):
+        atoms = SExprParser.get_atoms(element)
+        if len(atoms) == 2:
+            return atoms[0], atoms[1]
+        return "", ""
+
+    @staticmethod
+    def _parse_title_block(element, properties):
+        for child in element[1:]:
+            if not isinstance(child, list) or len(child) < 2:
+                continue
+            if child[0] == "title":
+                properties["design_name"] = child[1]
+            elif child[0] == "date":
+                properties["date"] = child[1]
+            elif child[0] == "rev":
+                properties["revision"] = child[1]
+            elif child[0] == "comment" and len(child) == 3:
+                if child[1] == "1":
+                    properties["pca_id"] = child[2]
+                elif child[1] == "2":
+                    properties["pcb_id"] = child[2]
+
+    @classmethod
+    def _parse_sheet(cls, element):
+        sheet = {"uuid": "", "name": "", "file": ""}
+        for child in element[1:]:
+            if isinstance(child, list):
+                if child[0] == "uuid":
+                    sheet["uuid"] = child[1]
+                elif child[0] == "property":
+                    key, value = cls._parse_property(child)
+                    if key == "Sheetname":
+                        sheet["name"] = value
+                    elif key == "Sheetfile":
+                        sheet["file"] = value
+        return sheet
+
+    @classmethod
+    def _parse_symbol(cls, element):
+        symbol = {}
+        instances = []
+        attributes = {"unit": 1, "in_bom": True, "on_board": True, "dnp": False}
+        for child in element[1:]:
+            if not isinstance(child, list):
+                continue
+            if child[0] == "lib_id":
+                symbol["lib_id"] = child[1]
+            elif child[0] == "unit" and len(child) == 2:
+                attributes["unit"] = int(child[1])
+            elif child[0] in ("in_bom", "on_board", "dnp") and len(child) == 2:
+                attributes[child[0]] = child[1] == "yes"
+            elif child[0] == "property":
+                key, value = cls._parse_property(child)
+                if key != "":
+                    symbol[key] = value
+            elif child[0] == "instances":
+                for project in SExprParser.find_all(child, "project"):
+                    for path in SExprParser.find_all(project, "path"):
+                        reference = SExprParser.find(path, "reference")
+                        if reference is not None:
+                            instances.append((project[1], path[1], reference[1]))
+        return symbol, instances, attributes
+
+    @classmethod
+    def _parse_schematics_file(cls, filename):
+        # Runs in a worker process, so only the parsed data is returned
+        data = {"uuid": "", "sheets": [], "symbols": [], "title_block": {}}
+        for element in SExprParser.iter_elements(filename):
+            if element[0] == "uuid":
+                data["uuid"] = element[1]
+            elif element[0] == "sheet":
+                sheet = cls._parse_sheet(element)
+                if sheet["uuid"] != "" and sheet["file"] != "":
+                    sheet["filename"] = os.path.normpath(os.path.join(os.path.dirname(filename), sheet["file"]))
+                    data["sheets"].append(sheet)
+            elif element[0] == "symbol":
+                data["symbols"].append(cls._parse_symbol(element))
+            elif element[0] == "title_block":
+                cls._parse_title_block(element, data["title_block"])
+        return data
+
+    @classmethod
+    def _parse_footprint(cls, element):
+        footprint = {
+            "Footprint": element[1]
+        }
+        for child in element[2:]:
+            if not isinstance(child, list):
+                continue
+            if child[0] == "property":
+                key, value = cls._parse_property(child)
+                if key != "":
+                    footprint[key] = SExprParser.get_text_properties(child, value)
+            elif child[0] == "fp_text" and child[1:3] == ["user", "${REFERENCE}"]:
+                footprint["Reference_F.Fab"] = SExprParser.get_text_properties(child, child[2])
+            elif child[0] == "attr":
+                footprint["Attributes"] = SExprParser.get_atoms(child)
+            elif child[0] == "model":
+                footprint["Model"] = child[1]
+        return footprint
+
+    @staticmethod
+    def _to_nm(value):
+        # Positions are kept in nanometres (the KiCad internal unit), so checks on them are exact
+        return round(float(value) * 1000000)
+
+    @classmethod
+    def _parse_placement(cls, element, footprint):
+        at = SExprParser.find(element, "at")
+        layer = SExprParser.find(element, "layer")
+        return {
+            "Reference": footprint.get("Reference", {}).get("Value", ""),
+            "Value": footprint.get("Value", {}).get("Value", ""),
+            "Footprint": footprint["Footprint"],
+            "X": cls._to_nm(at[1]) if at is not None else 0,
+            "Y": cls._to_nm(at[2]) if at is not None else 0,
+            "Rotation": float(at[3]) if at is not None and len(at) > 3 else 0.0,
+            "Side": "bottom" if layer is not None and layer[1] == "B.Cu" else "top",
+            "Attributes": footprint.get("Attributes", [])
+        }
+
+    def _read_schematics_files(self, filenames):
+        # Reads the files and the files of the sheets in the files, each file only once
+        files = {}
+        pending = list(filenames)
+        while len(pending) > 0:
+            filename = pending.pop(0)
+            if filename not in files and os.path.isfile(filename):
+                type(self).stdout(f"Read: {os.path.basename(filename)}")
+                files[filename] = self._parse_schematics_file(filename)
+                pending.extend(sheet["filename"] for sheet in files[filename]["sheets"])
+        return files
+
+    @staticmethod
+    def _get_reference(symbol, instances, path, project_name):
+        references = {}
+        # References of other projects using the same sheet file are only used if there is none of this project
+        for project, instance_path, reference in sorted(instances, key=lambda x: x[0] == project_name):
+            references[instance_path] = reference
+        return references.get(path, symbol.get("Reference", ""))
+
+    def _add_sheet(self, files, sheet, project_name, sheets):
+        # Adds the sheet and its child sheets, the symbols get the references of this sheet instance
+        data = files[sheet["filename"]]
+        sheet["symbols"] = []
+        sheet["components"] = []
+        for symbol, instances, attributes in data["symbols"]:
+            reference = self._get_reference(symbol, instances, sheet["path"], project_name)
+            if reference != symbol.get("Reference", ""):
+                symbol = symbol.copy()
+                symbol["Reference"] = reference
+            sheet["symbols"].append(symbol)
+            sheet["components"].append({"Reference": reference, "fields": symbol, **attributes})
+        sheets.append(sheet)
+        parent_files = [item["filename"] for item in sheets if f"{sheet["path"]}/".startswith(f"{item["path"]}/")]
+        for child in data["sheets"]:
+            if child["filename"] not in files:
+                type(self).stdout(f"Sheet file not found: {child["file"]}")
+            elif child["filename"] in parent_files:
+                type(self).stdout(f"Sheet file used recursively: {child["file"]}")
+            else:
+                self._add_sheet(files, {
+                    "path": f"{sheet["path"]}/{child["uuid"]}",
+                    "name": child["name"],
+                    "filename": child["filename"],
+                    "parent": sheet["path"]
+                }, project_name, sheets)
+
+    def _read_schematics(self):
+        properties = self._new_schematics_properties()
+        type(self).stdout(f"Read schematics from: {self._project_folder}")
+        root_file = self._get_root_schematics_file(self._project_folder)
+        if root_file != "":
+            files = self._read_schematics_files([root_file])
+            root_files = [root_file]
+        else:
+            # No root schematic, read all files, the files that are not used as sheet are the root files
+            files = self._read_schematics_files(sorted(self._get_schematics_files(self._project_folder)))
+            sheet_files = set(sheet["filename"] for data in files.values() for sheet in data["sheets"])
+            root_files = [filename for filename in files if filename not in sheet_files]
+        sheet_files = set(sheet["filename"] for data in files.values() for sheet in data["sheets"])
+        self._files_signature = self._get_files_signature(sorted(set(files) | sheet_files))
+        project_name = os.path.splitext(os.path.basename(root_files[0]))[0] if len(root_files) > 0 else ""
+        sheets = []
+        for filename in root_files:
+            # The title block of the root schematic is used
+            properties.update(files[filename]["title_block"])
+            self._add_sheet(files, {
+                "path": f"/{files[filename]["uuid"]}",
+                "name": "",
+                "filename": filename,
+                "parent": ""
+            }, project_name, sheets)
+        type(self).stdout("Sheets:")
+        for sheet in sheets:
+            type(self).stdout(f"* {sheet["path"]} {sheet["name"]} ({os.path.basename(sheet["filename"])})")
+        return {
+            "symbols": [symbol for sheet in sheets for symbol in sheet["symbols"]],
+            "components": [component for sheet in sheets for component in sheet["components"]],
+            "sheets": {sheet["path"].split("/")[-1]: sheet["name"] for sheet in sheets if sheet["parent"] != ""},
+            "sheet_instances": sheets,
+            "properties": properties
+        }
+
+    def _read_pcb(self):
+        properties = self._new_pcb_properties()
+        layers = []
+        footprints = []
+        placements = []
+        drill_origin = (0, 0)
+        pcb_file = self._get_pcb_file(self._project_folder)
+        if pcb_file != "":
+            type(self).stdout(f"Read layout from: {pcb_file}")
+            for element in SExprParser.iter_elements(pcb_file):
+                if element[0] == "title_block":
+                    self._parse_title_block(element, properties)
+                elif element[0] == "layers":
+                    layers = self._parse_layers(element, properties)
+                elif element[0] == "setup":
+                    origin = SExprParser.find(element, "aux_axis_origin")
+                    if origin is not None:
+                        drill_origin = (self._to_nm(origin[1]), self._to_nm(origin[2]))
+                elif element[0] == "footprint":
+                    footprints.append(self._parse_footprint(element))
+                    placements.append(self._parse_placement(element, footprints[-1]))
+                    if ["layer", "B.Cu"] in element:
+                        properties["has_comp_bot"] = True
+        # Relative to the drill origin, with the Y axis up like in the position files
+        for placement in placements:
+            placement["X"] = placement["X"] - drill_origin[0]
+            placement["Y"] = drill_origin[1] - placement["Y"]
+        return {"footprints": footprints, "layers": layers, "placements": placements, "drill_origin": drill_origin,
+                "properties": properties}
+
+    def _read_schematics_header(self):
+        # Only the title block of the root schematic is needed for the properties
+        properties = self._new_schematics_properties()
+        root_file = self._get_root_schematics_file(self._project_folder)
+        if root_file != "":
+            elements = HeaderReader.read_elements(root_file, ["title_block"])
+            if "title_block" in elements:
+                self._parse_title_block(elements["title_block"], properties)
+        return {"properties": properties}
+
+    def _read_pcb_header(self):
+        properties = self._new_pcb_properties()
+        layers = []
+        pcb_file = self._get_pcb_file(self._project_folder)
+        if pcb_file != "":
+            elements = HeaderReader.read_elements(pcb_file, ["title_block", "layers"])
+            if "title_block" in elements:
+                self._parse_title_block(elements["title_block"], properties)
+            if "layers" in elements:
+                layers = self._parse_layers(elements["layers"], properties)
+            properties["has_comp_bot"] = HeaderReader.has_bottom_footprints(pcb_file)
+        return {"layers": layers, "properties": properties}
+
+    def _get_schematics_header(self):
+        if self._get_root_schematics_file(self._project_folder) == "":
+            # Without a root schematic all files are needed to find the root files
+            return self._get_schematics()
+        with self._lock:
+            if self._schematics is not None:
+                return self._schematics
+            if self._schematics_header is None:
+                self._schematics_header = self._read_schematics_header()
+            return self._schematics_header
+
+    def _get_pcb_header(self):
+        with self._lock:
+            if self._pcb is not None:
+                return self._pcb
+            if self._pcb_header is None:
+                self._pcb_header = self._read_pcb_header()
+            return self._pcb_header
+
+    def _get_schematics(self):
+        with self._lock:
+            if self._schematics is None:
+                self._schematics = self._read_schematics()
+            return self._schematics
+
+    def _get_pcb(self):
+        with self._lock:
+            if self._pcb is None:
+                self._pcb = self._read_pcb()
+            return self._pcb
+
+    ##########
+    # Public #
+    ##########
+
+    @classmethod
+    def get_model(cls, project_folder):
+        """
+        Returns the shared model for the project folder. A new model is created when a design file is changed.
+        """
+        project_folder = os.path.abspath(project_folder)
+        signature = cls._get_signature(project_folder)
+        with cls._models_lock:
+            model = cls._models.get(project_folder, None)
+            if model is None or model[0] != signature or model[1]._is_changed():
+                model = (signature, cls(project_folder))
+                cls._models[project_folder] = model
+            return model[1]
+
+    def get_symbols(self):
+        return self._get_schematics()["symbols"]
+
+    def get_components(self):
+        """
+        Returns the placed symbols with their attributes: the reference, the fields (the symbol), the unit and
+        if the symbol is in the BOM, on the board or not populated (DNP). A symbol with multiple units has a component
+        for each placed unit.
+        """
+        return self._get_schematics()["components"]
+
+    def get_sheets(self):
+        """
+        Returns a dictionary with the sheet names by sheet UUID.
+        """
+        return self._get_schematics()["sheets"]
+
+    def get_sheet_instances(self):
+        """
+        Returns the sheets of the hierarchy, starting with the root sheet, parents before their child sheets.
+        A sheet is a dictionary with the instance path, name, filename, the path of the parent sheet, the symbols and
+        the components with the references of this instance. A file used by multiple sheets has a sheet for each use.
+        """
+        return self._get_schematics()["sheet_instances"]
+
+    def get_schematics_properties(self):
+        return self._get_schematics_header()["properties"]
+
+    def get_footprints(self):
+        return self._get_pcb()["footprints"]
+
+    def get_placements(self):
+        """
+        Returns the placement of each footprint: reference, value, footprint, X, Y, rotation, side and attributes.
+        X and Y are in nanometres (the KiCad internal unit), relative to the drill origin with the Y axis up.
+        The rotation is in degrees as in the layout, the side is top or bottom.
+        """
+        return self._get_pcb()["placements"]
+
+    def get_drill_origin(self):
+        """
+        Returns the drill (auxiliary axis) origin of the layout in nanometres, in layout coordinates.
+        """
+        return self._get_pcb()["drill_origin"]
+
+    def get_layers(self):
+        """
+        Returns the names of the layers of the layout.
+        """
+        return self._get_pcb_header()["layers"]
+
+    def get_pcb_properties(self):
+        return self._get_pcb_header()["properties"]
+
+
+if __name__ == "__main__":
+
+    import time
+
+    _test_project_folder = os.path.join(os.path.dirname(__file__), "..", "..", "..", "projects", "lib_test",
+                                        "multi_channel")
+    for _ in range(2):
+        _start = time.perf_counter()
+        _model = DesignModel.get_model(_test_project_folder)
+        print(f"Symbols: {len(_model.get_symbols())}, footprints: {len(_model.get_footprints())}, "
+              f"sheets: {len(_model.get_sheets())}, layers: {len(_model.get_layers())}, "
+              f"{time.perf_counter() - _start:.3f} s")
+        print(_model.get_schematics_properties())
+        print(_model.get_pcb_properties())
+    for _sheet in _model.get_sheet_instances():
+        print(f"{_sheet["path"]:<80} {os.path.basename(_sheet["filename"]):<20} "
+              f"{", ".join(_symbol["Reference"] for _symbol in _sheet["symbols"])[:60]}")
@@ -1,239 +1,54 @@
 """
 Parses a KiCad design.
+
+The design is read by the shared design model, so the design files are only read once for all calls.
 """
 
-import glob
 import os
 
+from toolbox.models.parsers.design_model import DesignModel
+
 
 class DesignParser:
 
     stdout = print
 
-    @classmethod
-    def _read_schematics(cls, project_folder):
-        cls.stdout(f"Read schematics from: {project_folder}")
-        lines = []
-        for item in glob.glob(os.path.join(project_folder, "*.kicad_sch")):
-            cls.stdout(f"Read: {os.path.basename(item)}")
-            with open(item, "r") as fp:
-                lines.extend(fp.readlines())
-        return lines
+    ###########
+    # Private #
+    ###########
 
     @classmethod
-    def _read_pcb(cls, project_folder):
-        lines = []
-        items = glob.glob(os.path.join(project_folder, "*.kicad_pcb"))
-        if len(items) == 1:
-            cls.stdout(f"Read layout from: {items[0]}")
-            with open(items[0], "r") as fp:
-                lines = fp.readlines()
-        return lines
+    def _get_model(cls, project_folder):
+        DesignModel.stdout = cls.stdout
+        return DesignModel.get_model(project_folder)
 
-    @classmethod
-    def _get_sheets(cls, lines):
-        sheets = {}
-        i = 0
-        while i < len(lines):
-            if lines[i].startswith("\t(sheet") and not lines[i].startswith("\t(sheet_instances"):
-                sheet_id = ""
-                name = ""
-                while i < len(lines):
-                    i += 1
-                    if lines[i].startswith("\t\t(uuid "):
-                        sheet_id = lines[i].strip()[6:].strip(")").strip('"')
-                    if lines[i].startswith("\t\t(property \"Sheetname\" "):
-                        name = lines[i].strip()[22:].strip('"')
-                    if lines[i].startswith("\t)"):
-                        break
-                if name != "" and sheet_id != "":
-                    sheets[sheet_id] = name
-            i += 1
-        return sheets
+    ##########
+    # Public #
+    ##########
 
     @classmethod
     def get_symbols(cls, project_folder):
-        lines = cls._read_schematics(project_folder)
-        sheets = cls._get_sheets(lines)
-        cls.stdout("Sheets:")
-        for key, value in sheets.items():
-            cls.stdout(f"* {key} {value}")
-        symbols = []
-        i = 0
-        while i < len(lines):
-            if lines[i].startswith("\t(symbol"):
-                symbol = {}
-                references = []
-                while i < len(lines):
-                    i += 1
-                    if lines[i].startswith("\t)"):
-                        break
-                    if lines[i].startswith("\t\t(lib_id "):
-                        symbol["lib_id"] = lines[i].strip()[8:].strip(")").strip('"')
-                    if lines[i].startswith("\t\t(property "):
-                        parts = lines[i].strip()[10:].split('" "')
-                        if len(parts) == 2:
-                            symbol[parts[0].strip('"')] = parts[1].strip().strip('"')
-                    if lines[i] == "\t\t(instances\n":
-                        # Symbol is used multiple times.
-                        while i < len(lines):
-                            i += 1
-                            path = ""
-                            ref = ""
-                            if lines[i].startswith("\t\t\t\t(path "):
-                                # We only need the last part of the path (sheet UUID)
-                                path = lines[i].strip()[6:].strip('"').split("/")[-1]
-                                while i < len(lines):
-                                    i += 1
-                                    if lines[i].startswith("\t\t\t\t\t(reference "):
-                                        ref = lines[i].strip()[11:].strip(")").strip('"')
-                                    if lines[i] == "\t\t\t\t)\n":
-                                        break
-                            if path != "" and ref != "":
-                                if path in sheets and symbol["Reference"] != ref:
-                                    references.append(ref)
-                            if lines[i] == "\t\t)\n":
-                                break
+        return cls._get_model(project_folder).get_symbols()
 
-                symbols.append(symbol)
-                if len(references) > 0:
-                    # Add extra symbols
-                    for reference in references:
-                        extra_symbol = symbol.copy()
-                        extra_symbol["Reference"] = reference
-                        symbols.append(extra_symbol)
-
-            i += 1
-        return symbols
+    @classmethod
+    def get_components(cls, project_folder):
+        return cls._get_model(project_folder).get_components()
 
     @classmethod
     def get_schematics_properties(cls, project_folder):
-        properties = {
-            "design_name": "",
-            "date": "",
-            "revision": "",
-            "pca_id": "",
-            "pcb_id": ""
-        }
-        lines = cls._read_schematics(project_folder)
-        i = 0
-        while i < len(lines):
-            if lines[i] == "\t(title_block\n":
-                while i < len(lines):
-                    if lines[i].startswith("\t\t(title \""):
-                        properties["design_name"] = lines[i].strip()[7:].strip(")").strip("\"")
-                    if lines[i].startswith("\t\t(date \""):
-                        properties["date"] = lines[i].strip()[6:].strip(")").strip("\"")
-                    if lines[i].startswith("\t\t(rev \""):
-                        properties["revision"] = lines[i].strip()[5:].strip(")").strip("\"")
-                    if lines[i].startswith("\t\t(comment 1 \""):
-                        properties["pca_id"] = lines[i].strip()[11:].strip(")").strip("\"")
-                    if lines[i].startswith("\t\t(comment 2 \""):
-                        properties["pcb_id"] = lines[i].strip()[11:].strip(")").strip("\"")
-                    if lines[i] == "\t)\n":
-                        break
-                    i += 1
-            i += 1
-        return properties
+        return cls._get_model(project_folder).get_schematics_properties().copy()
 
     @classmethod
     def get_footprints(cls, project_folder):
-        lines = cls._read_pcb(project_folder)
-        i = 0
-        footprints = []
-        while i < len(lines):
-            if lines[i].startswith("\t(footprint "):
-                footprint = {
-                    "Footprint": lines[i].strip()[11:].strip(")").strip('"')
-                }
-                while i < len(lines):
-                    i += 1
-                    if lines[i].startswith("\t)"):
-                        break
-                    if lines[i].startswith("\t\t(property ") or lines[i].startswith('\t\t(fp_text user "${REFERENCE}"'):
-                        key = ""
-                        value = ""
-                        if "(property " in lines[i]:
-                            parts = lines[i].strip()[10:].split('" "')
-                            if len(parts) == 2:
-                                key = parts[0].strip('"')
-                                value = parts[1].strip().strip('"')
-                        else:
-                            key = "Reference_F.Fab"
-                            value = lines[i].strip()[14:].strip('"')
-                        if key != "":
-                            footprint[key] = {
-                                "Value" : value,
-                                "Layer": "",
-                                "Size": "",
-                                "Thickness": "",
-                                "Visible": True
-                            }
-                            while i < len(lines):
-                                i += 1
-                                if lines[i].startswith("\t\t\t(layer "):
-                                    footprint[key]["Layer"] = lines[i].strip()[7:].strip(")").strip('"')
-                                if lines[i].startswith("\t\t\t(hide yes)"):
-                                    footprint[key]["Visible"] = False
-                                if lines[i].startswith("\t\t\t\t\t(size "):
-                                    footprint[key]["Size"] = lines[i].strip()[6:].strip(")").strip('"')
-                                if lines[i].startswith("\t\t\t\t\t(thickness "):
-                                    footprint[key]["Thickness"] = lines[i].strip()[11:].strip(")").strip('"')
-                                if lines[i].startswith("\t\t)"):
-                                    break
-                    if lines[i].startswith("\t\t(attr "):
-                        footprint["Attributes"] = lines[i].strip()[6:].strip(")").split(" ")
-                    if lines[i].startswith("\t\t(model "):
-                        footprint["Model"] = lines[i].strip()[7:].strip(")").strip('"')
-                footprints.append(footprint)
-            i += 1
-        return footprints
+        return cls._get_model(project_folder).get_footprints()
+
+    @classmethod
+    def get_placements(cls, project_folder):
+        return cls._get_model(project_folder).get_placements()
 
     @classmethod
     def get_pcb_properties(cls, project_folder):
-        properties = {
-            "design_name": "",
-            "date": "",
-            "revision": "",
-            "pca_id": "",
-            "pcb_id": "",
-            "n_layers": 0,
-            "has_comp_bot": False
-        }
-        lines = cls._read_pcb(project_folder)
-        i = 0
-        while i < len(lines):
-            if lines[i] == "\t(title_block\n":
-                while i < len(lines):
-                    if lines[i].startswith("\t\t(title \""):
-                        properties["design_name"] = lines[i].strip()[7:].strip(")").strip("\"")
-                    if lines[i].startswith("\t\t(date \""):
-                        properties["date"] = lines[i].strip()[6:].strip(")").strip("\"")
-                    if lines[i].startswith("\t\t(rev \""):
-                        properties["revision"] = lines[i].strip()[5:].strip(")").strip("\"")
-                    if lines[i].startswith("\t\t(comment 1 \""):
-                        properties["pca_id"] = lines[i].strip()[11:].strip(")").strip("\"")
-                    if lines[i].startswith("\t\t(comment 2 \""):
-                        properties["pcb_id"] = lines[i].strip()[11:].strip(")").strip("\"")
-                    if lines[i] == "\t)\n":
-                        break
-                    i += 1
-            if lines[i] == "\t(layers\n":
-                while i < len(lines):
-                    if ".Cu\"" in lines[i]:
-                        properties["n_layers"] += 1
-                    if lines[i] == "\t)\n":
-                        break
-                    i += 1
-            if lines[i].startswith("\t(footprint \""):
-                while i < len(lines):
-                    if lines[i] == "\t\t(layer \"B.Cu\")\n":
-                        properties["has_comp_bot"] = True
-                    if lines[i] == "\t)\n":
-                        break
-                    i += 1
-            i += 1
-        return properties
+        return cls._get_model(project_folder).get_pcb_properties().copy()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+"""
+Reads elements from the header of a KiCad file without parsing the complete file.
+
+The file is memory mapped and scanned on byte level, counting the parentheses outside the strings, so it does not
+depend on the indentation and line breaks. The scan stops when all requested top level elements are found, these are
+in the header at the start of the file. Only these elements are parsed.
+"""
+
+import mmap
+import os
+import re
+
+from toolbox.models.parsers.sexpr_parser import SExprParser
+
+
+class HeaderReader:
+
+    # Parentheses and strings, parentheses in strings are not counted
+    _TOKEN = re.compile(rb'[()]|"(?:[^"\\]|\\.)*"')
+    # Name of an element, follows the parenthesis
+    _NAME = re.compile(rb'\s*([^\s()"]+)')
+    # Footprint on the bottom side, the layer is the first child of a footprint
+    # The pattern starts with a fixed text, so the search skips to the footprints and is fast for large files
+    _BOTTOM_FOOTPRINT = re.compile(rb'\(footprint\s+"[^"\n]*"\s+(?:\(locked(?: yes)?\)\s+)?'
+                                   rb'(?:\(placed(?: yes)?\)\s+)?\(layer\s+"B\.Cu"\)')
+
+    ###########
+    # Private #
+    ###########
+
+    @staticmethod
+    def _open(filename):
+        # Returns None for an empty file, an empty file cannot be memory mapped
+        if os.path.getsize(filename) == 0:
+            return None
+        with open(filename, "rb") as fp:
+            return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def _find_elements(cls, data, names):
+        # Returns a dictionary with the text of the first top level element for each name that is found
+        # The root element is depth 1, the top level elements are depth 2
+        texts = {}
+        pending = set(name.encode("utf-8") for name in names)
+        depth = 0
+        element = None
+        for match in cls._TOKEN.finditer(data):
+            token = match.group()
+            if token == b"(":
+                depth += 1
+                if depth == 2:
+                    name = cls._NAME.match(data, match.end())
+                    if name is not None and name.group(1) in pending:
+                        element = (name.group(1), match.start())
+            elif token == b")":
+                if depth == 2 and element is not None:
+                    texts[element[0].decode("utf-8")] = data[element[1]:match.end()].decode("utf-8")
+                    pending.discard(element[0])
+                    element = None
+                    if len(pending) == 0:
+                        break
+                depth -= 1
+        return texts
+
+    ##########
+    # Public #
+    ##########
+
+    @classmethod
+    def read_elements(cls, filename, names):
+        """
+        Returns a dictionary with the first top level element for each name that is in the file, as nested lists.
+        """
+        elements = {}
+        data = cls._open(filename)
+        if data is None:
+            return elements
+        with data:
+            for name, text in cls._find_elements(data, names).items():
+                for element in SExprParser.iter_text_elements(text, 0):
+                    elements[name] = element
+        return elements
+
+    @classmethod
+    def has_bottom_footprints(cls, filename):
+        """
+        Returns True if the layout has footprints on the bottom side.
+        """
+        data = cls._open(filename)
+        if data is None:
+            return False
+        with data:
+            return cls._BOTTOM_FOOTPRINT.search(data) is not None
+
+
+if __name__ == "__main__":
+
+    import time
+
+    _filename = os.path.join(os.path.dirname(__file__), "..", "..", "..", "projects", "lib_test", "multi_channel",
+                             "multi_channel.kicad_pcb")
+    _start = time.perf_counter()
+    _elements = HeaderReader.read_elements(_filename, ["title_block", "layers"])
+    _has_comp_bot = HeaderReader.has_bottom_footprints(_filename)
+    print(f"Read in {(time.perf_counter() - _start) * 1000:.1f} ms")
+    print(_elements["title_block"])
+    print(_elements["layers"][:4])
+    print("Bottom footprints:", _has_comp_bot)
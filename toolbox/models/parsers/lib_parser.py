@@ -4,8 +4,16 @@ Parsing the library and returns the symbols/footprints.
 
 import glob
 import os
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor
 
 from toolbox.app_data import AppData
+from toolbox.models.parsers.parser_cache import ParserCache
+from toolbox.models.parsers.sexpr_parser import SExprParser
+from toolbox.models.parsers.symbol_graph import SymbolGraph
+from toolbox.models.parsers.symbol_index import SymbolIndex
 
 
 class LibParser:
@@ -13,104 +21,128 @@ class LibParser:
     stdout = print
 
     LIB_SYMBOLS_FILENAME = os.path.join(AppData.APP_PATH, "symbols", "lily_symbols.kicad_sym")
+    LIB_ARCHIVE_FILENAME = os.path.join(AppData.APP_PATH, "symbols", "lily_archive.kicad_sym")
     LIB_FOOTPRINT_PATH = os.path.join(AppData.APP_PATH, "lily_footprints.pretty")
 
     SYMBOL_IGNORE_FIELDS = [
         "ki_locked"
     ]
 
+    # Number of processes for parsing footprint files, None is the number of CPUs
+    PARSE_WORKERS = None
+    # Below this total file size, the files are parsed serially: starting the processes takes longer than parsing.
+    # Parsing is about 8 MB/s, the footprints library (0.75 MB) takes about 90 ms, starting a process on Windows
+    # (spawn, importing the toolbox) takes more than that.
+    PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+    # Inheritance graph of the last read symbols
+    _symbol_graph = None
+    _symbol_graph_lock = threading.Lock()
+
+    ###########
+    # Private #
+    ###########
+
+    @classmethod
+    def _parse_symbol(cls, element):
+        symbol = {"Name": element[1]}
+        for child in element[2:]:
+            if not isinstance(child, list):
+                continue
+            if child[0] == "extends":
+                symbol["Extends"] = child[1]
+            elif child[0] == "property":
+                atoms = SExprParser.get_atoms(child)
+                if len(atoms) == 2 and atoms[0] not in cls.SYMBOL_IGNORE_FIELDS:
+                    symbol[atoms[0]] = atoms[1]
+        return symbol
+
+    @classmethod
+    def _parse_footprint(cls, filename):
+        root = SExprParser.read_root(filename)
+        footprint = {}
+        if root[:1] == ["footprint"]:
+            footprint["Name"] = root[1]
+        for child in root[1:]:
+            if not isinstance(child, list):
+                continue
+            if child[0] == "attr":
+                footprint["Attributes"] = SExprParser.get_atoms(child)
+            elif child[0] == "model":
+                footprint["Model"] = child[1]
+            elif child[0] == "property":
+                atoms = SExprParser.get_atoms(child)
+                if len(atoms) == 2:
+                    footprint[atoms[0]] = SExprParser.get_text_properties(child, atoms[1])
+            elif child[0] == "fp_text" and child[1:3] == ["user", "${REFERENCE}"]:
+                footprint["Reference_F.Fab"] = SExprParser.get_text_properties(child, child[2])
+        return footprint
+
+    @classmethod
+    def _parse_symbols(cls, filename):
+        symbols = []
+        # Only the symbol fields are needed, skip the graphical items
+        for element in SExprParser.iter_elements(filename, 1, 2):
+            if element[0] == "symbol":
+                symbols.append(cls._parse_symbol(element))
+        return symbols
+
+    @classmethod
+    def _map_files(cls, parse_function, filenames):
+        n_workers = min(cls.PARSE_WORKERS or os.cpu_count() or 1, len(filenames))
+        if n_workers < 2 or sum(map(os.path.getsize, filenames)) < cls.PARALLEL_MIN_BYTES:
+            return [parse_function(filename) for filename in filenames]
+        # Map keeps the order of the files, so the result does not depend on which process finishes first
+        with ProcessPoolExecutor(n_workers) as executor:
+            return list(executor.map(parse_function, filenames, chunksize=-(-len(filenames) // (n_workers * 4))))
+
+    ##########
+    # Public #
+    ##########
+
     @classmethod
     def get_symbols(cls):
         cls.stdout(f"Read symbols library: {cls.LIB_SYMBOLS_FILENAME}")
-        with open(cls.LIB_SYMBOLS_FILENAME, "r") as fp:
-            lines = fp.readlines()
-        symbols = []
-        i = 0
-        fields = []
-        while i < len(lines):
-            symbol = {}
-            if lines[i].startswith("\t(symbol "):
-                symbol["Name"] = lines[i].strip()[8:].strip('"')
-                while i < len(lines):
-                    i += 1
-                    property_name = ""
-                    if lines[i].startswith("\t\t(extends "):
-                        symbol["Extends"] = lines[i].strip().strip(")")[9:].strip('"')
-                        property_name = "Extends"
-                    elif lines[i].startswith("\t\t(property "):
-                        parts = lines[i].strip()[10:].split('" "')
-                        if len(parts) == 2:
-                            property_name = parts[0].strip('"')
-                            if property_name not in cls.SYMBOL_IGNORE_FIELDS:
-                                symbol[property_name] = parts[1].strip().strip('"')
-                    elif lines[i].startswith("\t)"):
-                        break
-                    if (property_name != "" and property_name not in fields and
-                            property_name not in cls.SYMBOL_IGNORE_FIELDS):
-                        fields.append(property_name)
-                symbols.append(symbol)
-            i += 1
+        start = time.perf_counter()
+        cache = ParserCache.get_cache("lib_symbols")
+        symbols, stats = cache.read_files([cls.LIB_SYMBOLS_FILENAME], cls._parse_symbols)
+        symbols = symbols[0]
+        cls.stdout(f"Read {len(symbols)} symbols in {time.perf_counter() - start:.3f} s "
+                   f"(cache: {ParserCache.format_stats(stats)})")
         return symbols
 
+    @classmethod
+    def get_symbol_graph(cls):
+        """
+        Returns the inheritance graph of the symbols. The graph is only created again when the library is read again.
+        """
+        symbols = cls.get_symbols()
+        with cls._symbol_graph_lock:
+            if cls._symbol_graph is None or cls._symbol_graph.get_symbols() is not symbols:
+                cls._symbol_graph = SymbolGraph(symbols)
+            return cls._symbol_graph
+
+    @classmethod
+    def get_symbols_by_name(cls, names, filename=None):
+        """
+        Returns the symbols with the names, in the order of the names, without reading the complete library.
+        Names that are not in the library are skipped. The default library is the symbols library.
+        """
+        if filename is None:
+            filename = cls.LIB_SYMBOLS_FILENAME
+        elements = SymbolIndex.read_symbols(filename, names)
+        return [cls._parse_symbol(elements[name]) for name in names if name in elements]
+
     @classmethod
     def get_footprints(cls):
         cls.stdout(f"Read footprints library: {cls.LIB_FOOTPRINT_PATH}")
-        footprints = []
-        fields = []
-        for item in glob.glob(os.path.join(cls.LIB_FOOTPRINT_PATH, "*.kicad_mod")):
-            with open(item, "r") as fp:
-                lines = fp.readlines()
-            i = 0
-            footprint = {}
-            while i < len(lines):
-                property_name = ""
-                value = ""
-                property_data = {
-                    "Value": "",
-                    "Layer": "",
-                    "Size": "",
-                    "Thickness": "",
-                    "Visible": True
-                }
-                if lines[i].startswith("(footprint "):
-                    property_name = "Name"
-                    value = lines[i].strip()[11:].strip('"')
-                elif lines[i].startswith("\t(attr "):
-                    property_name = "Attributes"
-                    value = lines[i].strip().strip(")")[6:].split(" ")
-                elif lines[i].startswith("\t(model "):
-                    property_name = "Model"
-                    value = lines[i].strip()[8:].strip('"')
-                elif lines[i].startswith("\t(property "):
-                    parts = lines[i].strip()[10:].split('" "')
-                    if len(parts) == 2:
-                        property_name = parts[0].strip('"')
-                        property_data["Value"] = parts[1].strip().strip('"')
-                elif lines[i].startswith('\t(fp_text user "${REFERENCE}"'):
-                    property_name = "Reference_F.Fab"
-                    property_data["Value"] = lines[i].strip()[14:].strip('"')
-                # Get extra properties
-                if property_name != "" and value == "":
-                    while i < len(lines):
-                        if lines[i].startswith("\t)"):
-                            break
-                        if lines[i].startswith("\t\t(hide yes)"):
-                            property_data["Visible"] = False
-                        elif lines[i].startswith("\t\t(layer "):
-                            property_data["Layer"] = lines[i].strip().strip(")")[7:].strip('"')
-                        elif lines[i].startswith("\t\t\t\t(size "):
-                            property_data["Size"] = lines[i].strip().strip(")")[6:].strip('"')
-                        elif lines[i].startswith("\t\t\t\t(thickness "):
-                            property_data["Thickness"] = lines[i].strip().strip(")")[11:].strip('"')
-                        i += 1
-                    value = property_data
-                # Add property if we found any
-                if property_name != "":
-                    footprint[property_name] = value
-                    if property_name not in fields:
-                        fields.append(property_name)
-                i += 1
-            footprints.append(footprint)
+        start = time.perf_counter()
+        filenames = glob.glob(os.path.join(cls.LIB_FOOTPRINT_PATH, "*.kicad_mod"))
+        # Only the added and changed files are parsed, the others come from the cache
+        cache = ParserCache.get_cache("lib_footprints")
+        footprints, stats = cache.read_files(filenames, cls._parse_footprint, cls._map_files)
+        cls.stdout(f"Read {len(footprints)} footprints in {time.perf_counter() - start:.3f} s "
+                   f"(cache: {ParserCache.format_stats(stats)})")
         return footprints
 
 
@@ -122,6 +154,8 @@ if __name__ == "__main__":
         print("Showing max 10 symbols:")
         for _symbol in _symbols[:10]:
             print(_symbol)
+        print("Read only the last symbol:")
+        print(LibParser.get_symbols_by_name([_symbols[-1]["Name"]])[0])
 
     _footprints = LibParser.get_footprints()
     print("\nFootprints:", len(_footprints))
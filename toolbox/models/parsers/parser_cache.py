@@ -0,0 +1,148 @@
+"""
+Cache for parsed files, kept in memory and stored on disk.
+
+The parsed data is stored per file, together with the signature (modification time, size) and hash of the file.
+A file is only parsed again when it is changed. When only the signature changed (e.g. after a checkout),
+the hash is used to check if the content is still the same.
+The caches are kept in memory for the lifetime of the process, so the cache file is only read once and only the
+files that are added or changed are parsed. The data returned from the cache is shared, do not modify it.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+
+from toolbox.app_data import AppData
+
+
+class ParserCache:
+
+    ENABLED = True
+    CACHE_PATH = AppData.CACHE_PATH
+    # Increase when the output of the parsers changes, this invalidates all existing caches
+    VERSION = 1
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, name):
+        self._filename = os.path.join(self.CACHE_PATH, f"{name}.pickle")
+        self._entries = {}
+        self._lock = threading.Lock()
+        if self.ENABLED:
+            self._load()
+
+    ###########
+    # Private #
+    ###########
+
+    def _load(self):
+        if os.path.isfile(self._filename):
+            try:
+                with open(self._filename, "rb") as fp:
+                    data = pickle.load(fp)
+                if data["version"] == self.VERSION:
+                    self._entries = data["entries"]
+            except (Exception,):
+                # Unreadable cache file, start with an empty cache
+                self._entries = {}
+
+    def _save(self):
+        os.makedirs(self.CACHE_PATH, exist_ok=True)
+        # Write to a temporary file first, so other processes never read a partial file
+        temp_filename = f"{self._filename}.{os.getpid()}.tmp"
+        with open(temp_filename, "wb") as fp:
+            pickle.dump({"version": self.VERSION, "entries": self._entries}, fp, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_filename, self._filename)
+
+    @staticmethod
+    def _get_hash(filename):
+        with open(filename, "rb") as fp:
+            return hashlib.sha1(fp.read()).hexdigest()
+
+    ##########
+    # Public #
+    ##########
+
+    @classmethod
+    def get_cache(cls, name):
+        """
+        Returns the cache with the given name. The cache is created (and read from disk) on first use.
+        """
+        with cls._instances_lock:
+            if name not in cls._instances:
+                cls._instances[name] = cls(name)
+            return cls._instances[name]
+
+    def read_files(self, filenames, parse_function, map_function=map):
+        """
+        Returns a list with the parsed data for the files and the cache statistics.
+        Only files that are not in the cache or changed are parsed by calling parse_function(filename).
+        The files to parse are passed at once to map_function(parse_function, filenames), which must return the
+        results in the same order. This can be used for parsing the files in parallel.
+        Entries of files that are not in the list are removed (e.g. deleted files).
+        """
+        stats = {"hits": 0, "misses": 0, "removed": 0}
+        if not self.ENABLED:
+            stats["misses"] = len(filenames)
+            return list(map_function(parse_function, filenames)), stats
+
+        with self._lock:
+            is_changed = False
+            changed_files = {}
+            for filename in filenames:
+                stat = os.stat(filename)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                file_hash = None
+                entry = self._entries.get(filename, None)
+                if entry is not None and entry["signature"] != signature:
+                    file_hash = self._get_hash(filename)
+                    if entry["hash"] == file_hash:
+                        # Only the signature changed
+                        entry["signature"] = signature
+                        is_changed = True
+                    else:
+                        entry = None
+                if entry is None:
+                    stats["misses"] += 1
+                    changed_files[filename] = {
+                        "signature": signature,
+                        "hash": file_hash if file_hash is not None else self._get_hash(filename),
+                        "data": None
+                    }
+                else:
+                    stats["hits"] += 1
+
+            if len(changed_files) > 0:
+                for filename, data in zip(changed_files, map_function(parse_function, list(changed_files))):
+                    changed_files[filename]["data"] = data
+                self._entries.update(changed_files)
+                is_changed = True
+
+            for filename in set(self._entries.keys()) - set(filenames):
+                self._entries.pop(filename)
+                stats["removed"] += 1
+                is_changed = True
+
+            if is_changed:
+                self._save()
+            return [self._entries[filename]["data"] for filename in filenames], stats
+
+    @staticmethod
+    def format_stats(stats):
+        return ", ".join(f"{value} {key}" for key, value in stats.items())
+
+
+if __name__ == "__main__":
+
+    import time
+
+    _filename = os.path.join(AppData.APP_PATH, "toolbox", "models", "product_categories.json")
+    for _ in range(2):
+        _start = time.perf_counter()
+        _cache = ParserCache.get_cache("test")
+        _data, _stats = _cache.read_files([_filename], lambda x: open(x, "r").read())
+        print(f"Cache: {ParserCache.format_stats(_stats)}, {len(_data[0])} characters, "
+              f"{time.perf_counter() - _start:.6f} s")
+    os.remove(os.path.join(ParserCache.CACHE_PATH, "test.pickle"))
@@ -0,0 +1,217 @@
+"""
+Streaming parser for KiCad S-expression files.
+
+The file is read in chunks and converted to a stream of events, so memory use does not depend on the file size.
+This is a trade-off, see scripts/benchmark_parsers.py: the tokenizer is 2-14x slower than walking the lines of the
+file, the peak memory is only lower for files of several 100 kB, for small files it is higher (a fixed chunk buffer).
+Elements are returned as nested lists: [name, child, child, ...], where a child is a string or another element.
+Quoted strings are returned without the quotes, escape sequences are kept as is.
+"""
+
+import re
+
+
+class SExprParser:
+
+    OPEN = 1
+    CLOSE = 2
+    STRING = 3
+    ATOM = 4
+
+    CHUNK_SIZE = 1 << 16
+
+    # Parentheses, quoted strings, atoms and a quote that starts a string that is not terminated in the buffer
+    _TOKEN = re.compile(r'[()]|"[^"\\]*(?:\\.[^"\\]*)*"|[^\s()"]+|"', re.DOTALL)
+
+    ###########
+    # Private #
+    ###########
+
+    @classmethod
+    def _iter_tokens(cls, filename):
+        # Generates lists of tokens, one list per chunk
+        # Chunks are extended to the end of the line, so only a string containing a new line can span chunks
+        with open(filename, "r") as fp:
+            rest = ""
+            while True:
+                chunk = fp.read(cls.CHUNK_SIZE)
+                if chunk == "":
+                    if rest.strip() != "":
+                        raise Exception(f"Unterminated string in '{filename}'")
+                    return
+                buffer = rest + chunk + fp.readline()
+                tokens = cls._TOKEN.findall(buffer)
+                if '"' in tokens:
+                    rest = buffer
+                    continue
+                rest = ""
+                yield tokens
+
+    @classmethod
+    def _iter_token_elements(cls, token_lists, source, depth, max_depth):
+        if max_depth is None:
+            max_depth = float("inf")
+        level = 0
+        stack = []
+        is_open = False
+        collect = False
+        # Works on the tokens directly instead of the events, this is the most time critical part
+        for tokens in token_lists:
+            for token in tokens:
+                if is_open:
+                    is_open = False
+                    # An element without a name gets an empty name
+                    has_name = token != "(" and token != ")"
+                    if collect:
+                        element = [(token[1:-1] if token[0] == '"' else token) if has_name else ""]
+                        if len(stack) > 0:
+                            stack[-1].append(element)
+                        stack.append(element)
+                    if has_name:
+                        continue
+                if token == "(":
+                    collect = depth <= level <= max_depth
+                    level += 1
+                    is_open = True
+                elif token == ")":
+                    level -= 1
+                    if level < 0:
+                        raise Exception(f"Unbalanced S-expression data in '{source}'")
+                    if depth <= level <= max_depth:
+                        element = stack.pop()
+                        if level == depth:
+                            yield element
+                elif depth < level <= max_depth + 1:
+                    stack[-1].append(token[1:-1] if token[0] == '"' else token)
+        if level != 0:
+            raise Exception(f"Unbalanced S-expression data in '{source}'")
+
+    ##########
+    # Public #
+    ##########
+
+    @classmethod
+    def iter_events(cls, filename):
+        """
+        Generates (event, value) tuples for the file.
+        OPEN events have the element name as value, CLOSE events have None.
+        Atoms are reported as STRING (quoted) or ATOM (unquoted) events.
+        """
+        is_open = False
+        for tokens in cls._iter_tokens(filename):
+            for token in tokens:
+                if token == "(":
+                    if is_open:
+                        # Element without a name
+                        yield cls.OPEN, ""
+                    is_open = True
+                elif token == ")":
+                    if is_open:
+                        yield cls.OPEN, ""
+                        is_open = False
+                    yield cls.CLOSE, None
+                elif is_open:
+                    is_open = False
+                    yield cls.OPEN, token[1:-1] if token[0] == '"' else token
+                elif token[0] == '"':
+                    yield cls.STRING, token[1:-1]
+                else:
+                    yield cls.ATOM, token
+        if is_open:
+            yield cls.OPEN, ""
+
+    @classmethod
+    def iter_elements(cls, filename, depth=1, max_depth=None):
+        """
+        Generates the elements at the given depth as nested lists.
+        Depth 0 is the root element, depth 1 are the children of the root element, etc.
+        Child elements deeper than max_depth are skipped, which saves time when only the top of an element is needed.
+        Only one element is in memory at a time.
+        """
+        yield from cls._iter_token_elements(cls._iter_tokens(filename), filename, depth, max_depth)
+
+    @classmethod
+    def iter_text_elements(cls, text, depth=1, max_depth=None):
+        """
+        Generates the elements at the given depth of S-expression data in a string, like iter_elements.
+        """
+        tokens = cls._TOKEN.findall(text)
+        if '"' in tokens:
+            raise Exception("Unterminated string in S-expression data")
+        yield from cls._iter_token_elements([tokens], "text", depth, max_depth)
+
+    @classmethod
+    def read_root(cls, filename):
+        """
+        Returns the complete root element of the file.
+        Use this only for small files, like footprint files.
+        """
+        for element in cls.iter_elements(filename, 0):
+            return element
+        return []
+
+    @staticmethod
+    def find(element, name):
+        """
+        Returns the first child element with the given name, None if not found.
+        """
+        for child in element[1:]:
+            if isinstance(child, list) and child[0] == name:
+                return child
+        return None
+
+    @staticmethod
+    def find_all(element, name):
+        """
+        Returns all child elements with the given name.
+        """
+        return [child for child in element[1:] if isinstance(child, list) and child[0] == name]
+
+    @staticmethod
+    def get_atoms(element):
+        """
+        Returns the atoms of the element, that are the children that are not elements.
+        """
+        return [child for child in element[1:] if not isinstance(child, list)]
+
+    @classmethod
+    def get_text_properties(cls, element, value):
+        """
+        Returns the properties of a text element (property, fp_text) as used in footprints.
+        """
+        properties = {
+            "Value": value,
+            "Layer": "",
+            "Size": "",
+            "Thickness": "",
+            "Visible": True
+        }
+        layer = cls.find(element, "layer")
+        if layer is not None:
+            properties["Layer"] = layer[1]
+        if ["hide", "yes"] in element:
+            properties["Visible"] = False
+        font = cls.find(element, "effects")
+        if font is not None:
+            font = cls.find(font, "font")
+        if font is not None:
+            size = cls.find(font, "size")
+            if size is not None:
+                properties["Size"] = " ".join(cls.get_atoms(size))
+            thickness = cls.find(font, "thickness")
+            if thickness is not None:
+                properties["Thickness"] = " ".join(cls.get_atoms(thickness))
+        return properties
+
+
+if __name__ == "__main__":
+
+    import os
+
+    from toolbox.app_data import AppData
+
+    _filename = os.path.join(AppData.APP_PATH, "lily_footprints.pretty", "res_0805.kicad_mod")
+    _root = SExprParser.read_root(_filename)
+    print("Root:", _root[0], _root[1])
+    for _element in SExprParser.find_all(_root, "property"):
+        print(_element[:3], SExprParser.find(_element, "layer"))
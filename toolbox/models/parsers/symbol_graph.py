@@ -0,0 +1,95 @@
+"""
+Inheritance graph of the library symbols.
+
+A derived symbol (part) extends a parent symbol. The graph has the parent and the children of each symbol, and
+resolves the effective fields of a symbol: the fields of the parent, overruled by the fields of the symbol itself.
+The effective fields are resolved once per symbol and kept. The data returned from the graph is shared,
+do not modify it.
+"""
+
+import threading
+
+
+class SymbolGraph:
+
+    def __init__(self, symbols):
+        self._symbols = symbols
+        self._by_name = {}
+        self._children = {}
+        self._effective = {}
+        self._lock = threading.Lock()
+        for symbol in symbols:
+            self._by_name[symbol["Name"]] = symbol
+            self._children.setdefault(symbol["Name"], [])
+        for symbol in symbols:
+            if symbol.get("Extends", None) is not None:
+                self._children.setdefault(symbol["Extends"], []).append(symbol)
+
+    ###########
+    # Private #
+    ###########
+
+    def _resolve(self, name, visited):
+        effective = self._effective.get(name, None)
+        if effective is not None:
+            return effective
+        symbol = self._by_name[name]
+        parent = symbol.get("Extends", None)
+        if parent in self._by_name and parent not in visited:
+            effective = {**self._resolve(parent, visited | {name}), **symbol}
+        else:
+            effective = symbol
+        self._effective[name] = effective
+        return effective
+
+    ##########
+    # Public #
+    ##########
+
+    def get_symbols(self):
+        return self._symbols
+
+    def get_symbol(self, name):
+        return self._by_name.get(name, None)
+
+    def get_parent(self, name):
+        """
+        Returns the symbol that the symbol extends, None for a symbol that does not extend a symbol from the library.
+        """
+        symbol = self._by_name.get(name, None)
+        if symbol is None:
+            return None
+        return self._by_name.get(symbol.get("Extends", None), None)
+
+    def get_children(self, name):
+        """
+        Returns the symbols that extend the symbol.
+        """
+        return self._children.get(name, [])
+
+    def get_effective(self, name):
+        """
+        Returns the effective fields of the symbol, including the fields inherited from its parents.
+        """
+        if name not in self._by_name:
+            return None
+        with self._lock:
+            return self._resolve(name, frozenset())
+
+    def get_effective_symbols(self):
+        """
+        Returns the effective fields of all symbols, in the order of the library.
+        """
+        return [self.get_effective(symbol["Name"]) for symbol in self._symbols]
+
+
+if __name__ == "__main__":
+
+    from toolbox.models.parsers.lib_parser import LibParser
+
+    _graph = SymbolGraph(LibParser.get_symbols())
+    for _name in ("res", "res_10k_1%_125mW_0805"):
+        print(_name)
+        print("  Parent  :", (_graph.get_parent(_name) or {}).get("Name", None))
+        print("  Children:", len(_graph.get_children(_name)))
+        print("  Fields  :", _graph.get_effective(_name))
@@ -0,0 +1,122 @@
+"""
+Index of the symbols in a symbol library file, for reading single symbols without parsing the complete library.
+
+The index has the start and end position (bytes) of each symbol in the file and the name of the symbol it extends.
+It is made in one scan of the file on byte level, counting the parentheses outside the strings, so it does not depend
+on the indentation and line breaks. It is stored in the parser cache, so it is only made again when the library file
+is changed. Symbols are read by seeking to their position and parsing only that part of the file.
+"""
+
+import mmap
+import os
+import re
+
+from toolbox.models.parsers.parser_cache import ParserCache
+from toolbox.models.parsers.sexpr_parser import SExprParser
+
+
+class SymbolIndex:
+
+    # Parentheses and strings, parentheses in strings are not counted
+    _TOKEN = re.compile(rb'[()]|"(?:[^"\\]|\\.)*"')
+    # Symbols are the top level elements of the library, the name and the extended symbol follow the parenthesis
+    _SYMBOL = re.compile(rb'\s*symbol\s+"((?:[^"\\]|\\.)*)"')
+    _EXTENDS = re.compile(rb'\s*extends\s+"((?:[^"\\]|\\.)*)"\s*\)')
+
+    ###########
+    # Private #
+    ###########
+
+    @classmethod
+    def _build_index(cls, filename):
+        index = {}
+        if os.path.getsize(filename) == 0:
+            return index
+        with open(filename, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # The library is depth 1, the symbols are depth 2
+            depth = 0
+            symbol = None
+            for match in cls._TOKEN.finditer(data):
+                token = match.group()
+                if token == b"(":
+                    depth += 1
+                    if depth == 2:
+                        name = cls._SYMBOL.match(data, match.end())
+                        if name is not None:
+                            symbol = {"name": name.group(1).decode("utf-8"), "start": match.start(), "extends": None}
+                    elif depth == 3 and symbol is not None and symbol["extends"] is None:
+                        extends = cls._EXTENDS.match(data, match.end())
+                        if extends is not None:
+                            symbol["extends"] = extends.group(1).decode("utf-8")
+                elif token == b")":
+                    if depth == 2 and symbol is not None:
+                        index[symbol["name"]] = {
+                            "start": symbol["start"],
+                            "end": match.end(),
+                            "extends": symbol["extends"]
+                        }
+                        symbol = None
+                    depth -= 1
+            if symbol is not None:
+                raise Exception(f"Symbol '{symbol["name"]}' in '{filename}' is not closed")
+        return index
+
+    ##########
+    # Public #
+    ##########
+
+    @classmethod
+    def get_index(cls, filename):
+        """
+        Returns the index of the library: a dictionary with the start, end and extended symbol by symbol name.
+        """
+        cache = ParserCache.get_cache(f"symbol_index_{os.path.splitext(os.path.basename(filename))[0]}")
+        return cache.read_files([filename], cls._build_index)[0][0]
+
+    @classmethod
+    def get_parents(cls, filename, name):
+        """
+        Returns the names of the symbols that the symbol extends, the direct parent first.
+        """
+        index = cls.get_index(filename)
+        parents = []
+        parent = index[name]["extends"]
+        while parent is not None and parent in index and parent not in parents:
+            parents.append(parent)
+            parent = index[parent]["extends"]
+        return parents
+
+    @classmethod
+    def read_symbols(cls, filename, names):
+        """
+        Returns the symbol elements (nested lists) by name, read from their position in the file.
+        Names that are not in the library are not in the result.
+        """
+        index = cls.get_index(filename)
+        symbols = {}
+        with open(filename, "rb") as fp:
+            for name in filter(lambda x: x in index, names):
+                fp.seek(index[name]["start"])
+                data = fp.read(index[name]["end"] - index[name]["start"])
+                if not data.startswith(b"(symbol "):
+                    raise Exception(f"The symbol index of '{filename}' is not up to date")
+                for element in SExprParser.iter_text_elements(data.decode("utf-8"), 0):
+                    symbols[name] = element
+        return symbols
+
+
+if __name__ == "__main__":
+
+    import time
+
+    from toolbox.app_data import AppData
+
+    for _filename in ("lily_symbols.kicad_sym", "lily_archive.kicad_sym"):
+        _filename = os.path.join(AppData.APP_PATH, "symbols", _filename)
+        _start = time.perf_counter()
+        _index = SymbolIndex.get_index(_filename)
+        print(f"{os.path.basename(_filename)}: {len(_index)} symbols, index in {time.perf_counter() - _start:.3f} s")
+        _name = list(_index)[-1]
+        _start = time.perf_counter()
+        _symbols = SymbolIndex.read_symbols(_filename, [_name, *SymbolIndex.get_parents(_filename, _name)])
+        print(f"Read {", ".join(_symbols)} in {(time.perf_counter() - _start) * 1000:.1f} ms")
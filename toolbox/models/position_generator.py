@@ -0,0 +1,139 @@
+"""
+Generates the position data (pick and place) from the placements of the layout, without kicad-cli.
+
+The rows have the columns of the CSV position file of kicad-cli with the options used by KiCadCli: both sides, in mm,
+relative to the drill origin, sorted by reference. Footprints that are excluded from the position files or are not
+populated (DNP) are left out.
+The values are not verified against a position file of kicad-cli: the positions have 4 decimals, the rotation is
+0 to 360 degrees and is the rotation in the layout, also for the bottom side (no mirroring).
+Therefore the position file of the design is still exported by kicad-cli, the generated rows are compared with it
+(compare_rows) to verify the generator before it replaces kicad-cli.
+The positions are checked on the raster with the positions in nanometres, so the check is exact.
+"""
+
+import csv
+
+from decimal import Decimal
+
+from toolbox.models.bom_generator import BomGenerator
+
+
+class PositionGenerator:
+
+    # Raster for the components in nanometres (0.1 mm)
+    RASTER = 100000
+
+    ###########
+    # Private #
+    ###########
+
+    @staticmethod
+    def _format_position(value):
+        return f"{value / 1000000:.4f}"
+
+    @staticmethod
+    def _format_rotation(value):
+        return f"{value % 360:.4f}"
+
+    ##########
+    # Public #
+    ##########
+
+    @staticmethod
+    def get_placements(placements, exclude_dnp=True):
+        """
+        Returns the placements for the position data, sorted by reference.
+        The placements are from DesignParser.get_placements.
+        """
+        placements = filter(lambda x: "exclude_from_pos_files" not in x["Attributes"] and
+                            not (exclude_dnp and "dnp" in x["Attributes"]), placements)
+        return sorted(placements, key=lambda x: BomGenerator.get_reference_key(x["Reference"]))
+
+    @classmethod
+    def get_rows(cls, placements):
+        """
+        Returns the rows of the position data, with the columns of the kicad-cli position file.
+        """
+        return [{
+            "Ref": placement["Reference"],
+            "Val": placement["Value"],
+            "Package": placement["Footprint"].split(":")[-1],
+            "PosX": cls._format_position(placement["X"]),
+            "PosY": cls._format_position(placement["Y"]),
+            "Rot": cls._format_rotation(placement["Rotation"]),
+            "Side": placement["Side"]
+        } for placement in cls.get_placements(placements)]
+
+    @classmethod
+    def is_on_raster(cls, placement):
+        return placement["X"] % cls.RASTER == 0 and placement["Y"] % cls.RASTER == 0
+
+    @staticmethod
+    def parse_position(text):
+        """
+        Returns the position in nanometres of a position in mm from a position file.
+        """
+        return int(Decimal(text) * 1000000)
+
+    @classmethod
+    def compare_rows(cls, rows, cli_filename):
+        """
+        Compares the rows with a position file exported by kicad-cli. Returns a list with the differences.
+        The positions and rotations are compared by value (the rotations modulo 360), the other columns as text.
+        """
+        with open(cli_filename, mode="r", newline="", encoding="utf-8") as file:
+            cli_rows = {row["Ref"]: row for row in csv.DictReader(file)}
+        differences = []
+        if len(rows) != len(cli_rows):
+            differences.append(f"Number of rows: {len(rows)}, kicad-cli: {len(cli_rows)}")
+        for row in rows:
+            cli_row = cli_rows.get(row["Ref"], None)
+            if cli_row is None:
+                differences.append(f"{row["Ref"]}: not in the kicad-cli position file")
+                continue
+            for label in sorted(set(row) | set(cli_row)):
+                value = row.get(label, "")
+                cli_value = cli_row.get(label, "")
+                if label in ("PosX", "PosY"):
+                    is_equal = cls.parse_position(value) == cls.parse_position(cli_value)
+                elif label == "Rot":
+                    is_equal = (Decimal(value) - Decimal(cli_value)) % 360 == 0
+                else:
+                    is_equal = value == cli_value
+                if not is_equal:
+                    differences.append(f"{row["Ref"]}, {label}: '{value}', kicad-cli: '{cli_value}'")
+        for reference in sorted(set(cli_rows) - set(row["Ref"] for row in rows)):
+            differences.append(f"{reference}: only in the kicad-cli position file")
+        return differences
+
+
+if __name__ == "__main__":
+
+    import os
+    import random
+    import time
+
+    from toolbox.models.parsers.design_parser import DesignParser
+
+    DesignParser.stdout = lambda x: None
+    _test_project_folder = os.path.join(os.path.dirname(__file__), "..", "..", "projects", "lib_test", "multi_channel")
+    _rows = PositionGenerator.get_rows(DesignParser.get_placements(_test_project_folder))
+    print(f"Position data: {len(_rows)} rows")
+    for _row in _rows[:5]:
+        print(_row)
+
+    # A large board
+    _placements = [{
+        "Reference": f"R{_i}",
+        "Value": "10k",
+        "Footprint": "lily_footprints:res_0603",
+        "X": random.randrange(0, 300000000, 50000),
+        "Y": random.randrange(-200000000, 0, 50000),
+        "Rotation": random.choice([0.0, 90.0, -90.0, 180.0]),
+        "Side": random.choice(["top", "bottom"]),
+        "Attributes": ["smd"]
+    } for _i in range(1, 20001)]
+    _start = time.perf_counter()
+    _rows = PositionGenerator.get_rows(_placements)
+    _n_off_raster = len([_placement for _placement in _placements if not PositionGenerator.is_on_raster(_placement)])
+    print(f"{len(_rows)} placements, {_n_off_raster} not on the raster, {time.perf_counter() - _start:.3f} s")
@@ -1,26 +1,55 @@
 """
 Model for processing a design using the KiCad cli
+
+The kicad-cli exports of the outputs can be run at once in a jobset before the outputs are created (run_batch).
+The methods that create the outputs skip the exports that are done by the jobset.
+The BOM is generated from the parsed design, kicad-cli is only used for verifying the BOM (verify_bom).
+The position data is exported by kicad-cli. The position data generated from the parsed layout can be compared with
+it (verify_position_file), it is not used for the output until it is verified against kicad-cli.
 """
 
 import csv
+import glob
 import os
-import re
+import tempfile
+import time
 
+from toolbox.models.bom_generator import BomGenerator
 from toolbox.models.kicad_cli import KiCadCli
+from toolbox.models.parsers.design_parser import DesignParser
+from toolbox.models.position_generator import PositionGenerator
 
 
 class ProcessDesign:
 
+    # BOM option: output file name, kicad-cli BOM option
+    _BOM_OPTIONS = {
+        "General": ("bom_general.tsv", ""),
+        "LilyTronics ERP": ("bom_lily_erp.csv", "lily_erp"),
+        "JLCPCB": ("bom_jlcpcb.csv", "jlcpcb")
+    }
+
     def __init__(self, timestamp, design_name, output_folder):
         self._timestamp = timestamp
         self._design_name = design_name
         self._output_folder = output_folder
         self._cli = KiCadCli()
+        self._batch_outputs = set()
 
     ###########
     # Private #
     ###########
 
+    def _get_output_filename(self, name):
+        return os.path.join(self._output_folder, f"{self._timestamp}_{self._design_name}_{name}")
+
+    def _get_gerbers_filenames(self):
+        gerber_output_folder = os.path.join(self._output_folder, f"{self._timestamp}_gerbers")
+        zip_filename = self._get_output_filename("gerbers.zip")
+        # The gerbers and drill data can be generated at the same time, make sure the folder exists for both
+        os.makedirs(gerber_output_folder, exist_ok=True)
+        return gerber_output_folder, zip_filename
+
     @staticmethod
     def _read_csv(filename):
         with open(filename, mode="r", newline="", encoding="utf-8") as file:
@@ -33,6 +62,40 @@ class ProcessDesign:
             writer.writeheader()
             writer.writerows(data)
 
+    def _get_jobs(self, function_name, args):
+        # Returns the jobset jobs for a method that creates an output, with the output file of each job
+        # For folders the output is a pattern for the files in the folder
+        if function_name == "schematics_to_pdf":
+            output_filename = self._get_output_filename("schematics.pdf")
+            return [(output_filename, self._cli.get_schematics_pdf_job(output_filename))]
+        if function_name in ("create_gerbers", "create_gerbers_and_drill"):
+            gerber_output_folder = self._get_gerbers_filenames()[0]
+            jobs = [(os.path.join(gerber_output_folder, "*.gbr"),
+                     self._cli.get_gerber_files_job(gerber_output_folder, args[1]))]
+            if function_name == "create_gerbers_and_drill":
+                jobs.extend(self._get_jobs("create_drill", args))
+            return jobs
+        if function_name == "create_drill":
+            gerber_output_folder = self._get_gerbers_filenames()[0]
+            return [(os.path.join(gerber_output_folder, "*.drl"), self._cli.get_drill_files_job(gerber_output_folder))]
+        if function_name == "pcb_to_pdf":
+            jobs = self._cli.get_pcb_pdf_jobs(self._get_output_filename("pcb_placement.pdf"), args[1])
+            return [(job["settings"]["output_filename"], job) for job in jobs]
+        if function_name == "create_odb":
+            output_filename = self._get_output_filename("odb.zip")
+            return [(output_filename, self._cli.get_odb_job(output_filename))]
+        if function_name == "create_3d_model":
+            output_filename = self._get_output_filename("pcb.step")
+            return [(output_filename, self._cli.get_step_job(output_filename))]
+        # Not a kicad-cli export
+        return []
+
+    def _export(self, outputs, function, *args):
+        # Runs the export, unless the outputs are already created by the jobset
+        if all(output in self._batch_outputs for output in outputs):
+            return f"Exported by the jobset: {", ".join(os.path.relpath(x, self._output_folder) for x in outputs)}"
+        return function(*args)
+
     ##########
     # Public #
     ##########
@@ -40,144 +103,181 @@ class ProcessDesign:
     def get_kicad_version(self):
         return self._cli.get_version()
 
+    def run_batch(self, project_filename, calls):
+        """
+        Runs the kicad-cli exports for the calls (list of (method, arguments)) at once in a jobset.
+        When the KiCad version does not support jobsets or the jobset fails, the methods run the exports one by one.
+        """
+        if not self._cli.supports_jobsets():
+            return "This KiCad version does not support jobsets, run the exports one by one"
+        jobs = []
+        for function, args in calls:
+            jobs.extend(self._get_jobs(function.__name__, args))
+        if len(jobs) == 0:
+            return "No exports for the jobset"
+        start = time.perf_counter()
+        is_ok, message = self._cli.run_jobset(project_filename, [job for _, job in jobs], self._output_folder)
+        if is_ok:
+            for output, _ in jobs:
+                if os.path.isfile(output) or len(glob.glob(output)) > 0:
+                    self._batch_outputs.add(output)
+        result = f"Jobset {"done" if is_ok else "failed"} in {time.perf_counter() - start:.1f} s, "
+        result += f"{len(self._batch_outputs)} of {len(jobs)} exports done"
+        if len(self._batch_outputs) < len(jobs):
+            result += ", the other exports run one by one"
+        return f"{result}\n{message}".strip()
+
     def schematics_to_pdf(self, sch_filename):
-        output_filename = f"{self._timestamp}_{self._design_name}_schematics.pdf"
-        output_filename = os.path.join(self._output_folder, output_filename)
-        return self._cli.generate_schematics_pdf(sch_filename, output_filename)
+        output_filename = self._get_output_filename("schematics.pdf")
+        return self._export([output_filename], self._cli.generate_schematics_pdf, sch_filename, output_filename)
 
     def create_bom(self, sch_filename, options, pca_id):
+        # The BOM is generated from the components of the schematics, all options use the same parsed schematics
+        components = DesignParser.get_components(os.path.dirname(sch_filename))
         report = ""
         for option in options:
             report += f"Generate BOM: {option}\n"
+            if option not in self._BOM_OPTIONS:
+                raise Exception(f"BOM option '{option}' is not defined")
+            name, cli_option = self._BOM_OPTIONS[option]
+            output_filename = self._get_output_filename(name)
             if option == "General":
-                output_filename = f"{self._timestamp}_{self._design_name}_bom_general.tsv"
-                output_filename = os.path.join(self._output_folder, output_filename)
-                message = self._cli.generate_bill_of_materials(sch_filename, output_filename)
-                report += f"{message}\n"
+                rows = BomGenerator.get_rows(components, cli_option)
+                BomGenerator.write_rows(output_filename, rows, cli_option)
 
             elif option == "LilyTronics ERP":
-                output_filename = f"{self._timestamp}_{self._design_name}_bom_lily_erp.csv"
-                output_filename = os.path.join(self._output_folder, output_filename)
-                message = self._cli.generate_bill_of_materials(sch_filename, output_filename, "lily_erp")
+                rows = sorted(BomGenerator.get_rows(components, cli_option), key=lambda x: x["Lily_ID"])
                 if pca_id == "":
-                    message += "\nWARNING: PCA ID is empty"
-                convert_message = ""
-                if os.path.isfile(output_filename):
-                    data_in = self._read_csv(output_filename)
-                    data_in = sorted(data_in, key=lambda x: x["Lily_ID"])
-                    data_out = []
-                    quantity = 1
-                    bom_type = "Kit"
-                    for record in data_in:
-                        data_out.append({
-                            "External ID": pca_id,
-                            "Product": pca_id,
-                            "Quantity": quantity,
-                            "BoM Type": bom_type,
-                            "BoM Lines/Component": record["Lily_ID"],
-                            "BoM Lines/Quantity": int(record["QUANTITY"])
-                        })
-                        if pca_id is not None:
-                            pca_id = None
-                            quantity = None
-                            bom_type = None
-                        if record["Lily_ID"] == "NO_ID":
-                            convert_message = "WARNING: Component with 'NO_ID' in BOM"
-                    field_names = ["External ID", "Product", "Quantity", "BoM Type",
-                                   "BoM Lines/Component", "BoM Lines/Quantity"]
-                    self._write_csv(output_filename, field_names, data_out)
-
-                report += f"{message}\n"
-                if convert_message != "":
-                    report += f"{convert_message}\n"
+                    report += "WARNING: PCA ID is empty\n"
+                data_out = []
+                quantity = 1
+                bom_type = "Kit"
+                for record in rows:
+                    data_out.append({
+                        "External ID": pca_id,
+                        "Product": pca_id,
+                        "Quantity": quantity,
+                        "BoM Type": bom_type,
+                        "BoM Lines/Component": record["Lily_ID"],
+                        "BoM Lines/Quantity": int(record["QUANTITY"])
+                    })
+                    if pca_id is not None:
+                        pca_id = None
+                        quantity = None
+                        bom_type = None
+                if "NO_ID" in map(lambda x: x["Lily_ID"], rows):
+                    report += "WARNING: Component with 'NO_ID' in BOM\n"
+                field_names = ["External ID", "Product", "Quantity", "BoM Type",
+                               "BoM Lines/Component", "BoM Lines/Quantity"]
+                self._write_csv(output_filename, field_names, data_out)
 
             elif option == "JLCPCB":
-                output_filename = f"{self._timestamp}_{self._design_name}_bom_jlcpcb.csv"
-                output_filename = os.path.join(self._output_folder, output_filename)
-                message = self._cli.generate_bill_of_materials(sch_filename, output_filename, "jlcpcb")
                 # JLCPCB cannot handle ranges of designators like R1-R3 must be R1, R2, R3
-                # We need to convert that
-                if os.path.isfile(output_filename):
-                    data_in = self._read_csv(output_filename)
-                    for record in data_in:
-                        if "-" in record["Reference"]:
-                            new_range = []
-                            parts = record["Reference"].split(",")
-                            for i in range(len(parts)):
-                                if "-" in parts[i]:
-                                    start, end = parts[i].split("-")
-                                    match = re.match(r"([A-Za-z]+)(\d+)", start)
-                                    i = int(match.group(2))
-                                    ref = f"{match.group(1)}{i}"
-                                    while ref != end:
-                                        new_range.append(ref)
-                                        i += 1
-                                        ref = f"{match.group(1)}{i}"
-                                    new_range.append(end)
-                                else:
-                                    new_range.append(parts[i])
-                            record["Reference"] = ",".join(new_range)
-                    self._write_csv(output_filename, data_in[0].keys(), data_in)
-                report += f"{message}\n"
-
-            else:
-                raise Exception(f"BOM option '{option}' is not defined")
+                rows = BomGenerator.get_rows(components, cli_option, use_ranges=False)
+                field_names = [BomGenerator.get_label(field) for field in
+                               KiCadCli.get_bom_settings(cli_option)[0].split(",")]
+                self._write_csv(output_filename, field_names, rows)
+
+            report += f"BOM written to: {output_filename} ({len(rows)} lines)\n"
+        return report.strip()
+
+    def verify_bom(self, sch_filename, options):
+        """
+        Compares the generated BOM with the BOM exported by kicad-cli, for each option.
+        """
+        components = DesignParser.get_components(os.path.dirname(sch_filename))
+        report = ""
+        with tempfile.TemporaryDirectory() as temp_folder:
+            for option in options:
+                name, cli_option = self._BOM_OPTIONS[option]
+                cli_filename = os.path.join(temp_folder, name)
+                message = self._cli.generate_bill_of_materials(sch_filename, cli_filename, cli_option)
+                if not os.path.isfile(cli_filename):
+                    report += f"Verify BOM {option}: kicad-cli export failed\n{message}\n"
+                    continue
+                differences = BomGenerator.compare_rows(BomGenerator.get_rows(components, cli_option), cli_filename,
+                                                        cli_option)
+                if len(differences) == 0:
+                    report += f"Verify BOM {option}: the same as kicad-cli\n"
+                else:
+                    report += f"WARNING: Verify BOM {option}: {len(differences)} differences with kicad-cli\n"
+                    report += "".join(f"{difference}\n" for difference in differences)
         return report.strip()
 
     def create_gerbers_and_drill(self, pcb_filename, n_layers):
-        gerber_output_folder = os.path.join(self._output_folder, f"{self._timestamp}_gerbers")
-        zip_filename = os.path.join(self._output_folder, f"{self._timestamp}_{self._design_name}_gerbers.zip")
+        message = self.create_gerbers(pcb_filename, n_layers)
+        message += f"\n{self.create_drill(pcb_filename)}"
+        message += f"\n{self.create_gerbers_zip()}"
+        return message
+
+    def create_gerbers(self, pcb_filename, n_layers):
+        gerber_output_folder = self._get_gerbers_filenames()[0]
         message = f"Number of copper layers: {n_layers}\n"
-        message += self._cli.generate_gerbers(pcb_filename, gerber_output_folder, zip_filename, n_layers)
+        message += self._export([os.path.join(gerber_output_folder, "*.gbr")], self._cli.generate_gerber_files,
+                                pcb_filename, gerber_output_folder, n_layers)
         return message
 
+    def create_drill(self, pcb_filename):
+        gerber_output_folder = self._get_gerbers_filenames()[0]
+        return self._export([os.path.join(gerber_output_folder, "*.drl")], self._cli.generate_drill_files,
+                            pcb_filename, gerber_output_folder)
+
+    def create_gerbers_zip(self):
+        return self._cli.create_zip_file(*self._get_gerbers_filenames())
+
     def create_position_file(self, pcb_filename):
-        output_filename = f"{self._timestamp}_{self._design_name}_position.csv"
-        output_filename = os.path.join(self._output_folder, output_filename)
+        # The position file of kicad-cli is converted to the format for the assembly
+        output_filename = self._get_output_filename("position.csv")
         message = self._cli.generate_position_file(pcb_filename, output_filename)
-        if os.path.isfile(output_filename):
-            warnings = ""
-            data_in = self._read_csv(output_filename)
-            data_out = []
-            for record in data_in:
-                data_out.append({
-                    "Designator": record["Ref"],
-                    "Mid X": record["PosX"],
-                    "Mid Y": record["PosY"],
-                    "Layer": record["Side"],
-                    "Rotation": record["Rot"]
-                })
-                not_on_raster = False
-                i = record["PosX"].find(".")
-                if i > -1:
-                    not_on_raster = int(record["PosX"][i + 2:]) > 0
-                i = record["PosY"].find(".")
-                if i > -1:
-                    not_on_raster = not_on_raster or int(record["PosY"][i + 2:]) > 0
-                if not_on_raster:
-                    warnings += (f"\nWARNING: Component {record["Ref"]} is not on a 0.1mm raster "
-                                 f"({record["PosX"]}, {record["PosY"]})")
-
-            if warnings != "":
-                message += warnings
-
-            self._write_csv(output_filename, ["Designator", "Mid X", "Mid Y", "Layer", "Rotation"], data_out)
+        if not os.path.isfile(output_filename):
+            return message
+        rows = self._read_csv(output_filename)
+        message += f"\nPosition file written to: {output_filename} ({len(rows)} components)"
+        for record in rows:
+            placement = {"X": PositionGenerator.parse_position(record["PosX"]),
+                         "Y": PositionGenerator.parse_position(record["PosY"])}
+            if not PositionGenerator.is_on_raster(placement):
+                message += (f"\nWARNING: Component {record["Ref"]} is not on a 0.1mm raster "
+                            f"({record["PosX"]}, {record["PosY"]})")
+        data_out = [{
+            "Designator": record["Ref"],
+            "Mid X": record["PosX"],
+            "Mid Y": record["PosY"],
+            "Layer": record["Side"],
+            "Rotation": record["Rot"]
+        } for record in rows]
+        self._write_csv(output_filename, ["Designator", "Mid X", "Mid Y", "Layer", "Rotation"], data_out)
         return message
 
+    def verify_position_file(self, pcb_filename):
+        """
+        Compares the position data generated from the parsed layout with the position file exported by kicad-cli.
+        """
+        placements = DesignParser.get_placements(os.path.dirname(pcb_filename))
+        with tempfile.TemporaryDirectory() as temp_folder:
+            cli_filename = os.path.join(temp_folder, "position.csv")
+            message = self._cli.generate_position_file(pcb_filename, cli_filename)
+            if not os.path.isfile(cli_filename):
+                return f"Verify position data: kicad-cli export failed\n{message}"
+            differences = PositionGenerator.compare_rows(PositionGenerator.get_rows(placements), cli_filename)
+        if len(differences) == 0:
+            return "Verify position data: the same as kicad-cli"
+        report = f"WARNING: Verify position data: {len(differences)} differences with kicad-cli\n"
+        report += "".join(f"{difference}\n" for difference in differences)
+        return report.strip()
+
     def pcb_to_pdf(self, pcb_filename, has_comp_bot):
-        output_filename = f"{self._timestamp}_{self._design_name}_pcb_placement.pdf"
-        output_filename = os.path.join(self._output_folder, output_filename)
-        return self._cli.generate_pcb_pdf(pcb_filename, output_filename, has_comp_bot)
+        output_filename = self._get_output_filename("pcb_placement.pdf")
+        outputs = [output for output, _ in self._get_jobs("pcb_to_pdf", (pcb_filename, has_comp_bot))]
+        return self._export(outputs, self._cli.generate_pcb_pdf, pcb_filename, output_filename, has_comp_bot)
 
     def create_odb(self, pcb_filename):
-        output_filename = f"{self._timestamp}_{self._design_name}_odb.zip"
-        output_filename = os.path.join(self._output_folder, output_filename)
-        return self._cli.generate_odb(pcb_filename, output_filename)
+        output_filename = self._get_output_filename("odb.zip")
+        return self._export([output_filename], self._cli.generate_odb, pcb_filename, output_filename)
 
     def create_3d_model(self, pcb_filename):
-        output_filename = f"{self._timestamp}_{self._design_name}_pcb.step"
-        output_filename = os.path.join(self._output_folder, output_filename)
-        return self._cli.generate_step(pcb_filename, output_filename)
+        output_filename = self._get_output_filename("pcb.step")
+        return self._export([output_filename], self._cli.generate_step, pcb_filename, output_filename)
 
 
 if __name__ == "__main__":
@@ -203,8 +303,10 @@ if __name__ == "__main__":
     print("Version:", p.get_kicad_version())
     print(p.schematics_to_pdf(_sch_filename))
     print(p.create_bom(_sch_filename, _bom_options, "1234-12345"))
+    print(p.verify_bom(_sch_filename, _bom_options))
     print(p.create_gerbers_and_drill(_pcb_filename, 2))
     print(p.create_position_file(_pcb_filename))
+    print(p.verify_position_file(_pcb_filename))
     print(p.pcb_to_pdf(_pcb_filename, False))
     print(p.create_odb(_pcb_filename))
     print(p.create_3d_model(_pcb_filename))
@@ -6,6 +6,7 @@ import json
 import os
 
 from toolbox.app_data import AppData
+from toolbox.models.product_id_allocator import ProductIdAllocator
 
 
 class ProductCategories:
@@ -25,20 +26,9 @@ class ProductCategories:
         next_code = ""
         properties = self.get_properties(category)
         dash_index = properties["product_id"].index("-") + 1
-        if properties["product_id"].endswith("1xxxx"):
-            # Simple sequence
-            for i in range(10001, 100000):
-                next_id = f"{properties["product_id"][:dash_index]}{i:05d}"
-                if next_id not in existing_codes:
-                    next_code = next_id
-                    break
-        if properties["product_id"].endswith("1xxyy"):
-            # Sequence with version number
-            for i in range(101, 1000):
-                next_id = f"{properties["product_id"][:dash_index]}{i:03d}01"
-                if next_id not in existing_codes:
-                    next_code = next_id
-                    break
+        if properties["product_id"].endswith(("1xxxx", "1xxyy")):
+            # Sequence, or sequence with version number
+            next_code = ProductIdAllocator(properties["product_id"], existing_codes).get_next_code()
         if "value" in properties["product_id"]:
             # Generate product code based on series and value
             if "," in series:
@@ -85,6 +75,13 @@ class ProductCategories:
             next_code = f"{properties["product_id"][:dash_index]}{series}{value}"
         return next_code if next_code not in existing_codes else "already exist"
 
+    def generate_next_codes(self, category, existing_codes, count):
+        """
+        Returns a list with the product IDs for a number of new products, with consecutive numbers.
+        Only for the categories with a sequence number in the product ID.
+        """
+        return ProductIdAllocator(self.get_properties(category)["product_id"], existing_codes).allocate(count)
+
 
 if __name__ == "__main__":
 
@@ -106,3 +103,7 @@ if __name__ == "__main__":
     }
     for _key in _test_codes:
         print(f"{_key}:", pc.generate_next_code(_categories[_key], _test_codes[_key], _series, _value))
+
+    print("\nNext 3 product codes")
+    for _key in (1, 23):
+        print(f"{_key}:", pc.generate_next_codes(_categories[_key], _test_codes[_key], 3))
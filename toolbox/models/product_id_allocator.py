@@ -0,0 +1,118 @@
+"""
+Allocates product IDs for the categories with a sequence number in the product ID.
+
+Product ID schemes (the part after the dash):
+- 1xxxx: sequence number 10001 to 99999
+- 1xxyy: base number 101 to 999 with a version number, a new product gets version 01
+  A base number is used if a product ID with the base number exists, whatever the version.
+
+The used numbers are kept in a sorted list. The used numbers from the first number up to the first free number are
+consecutive, so the first free number is found with a binary search. Allocated numbers are added to the list, so the
+allocator can be used for a number of allocations.
+"""
+
+import bisect
+
+
+class ProductIdAllocator:
+
+    # First and last sequence number per scheme
+    _SCHEMES = {
+        "1xxxx": (10001, 99999),
+        "1xxyy": (101, 999)
+    }
+
+    def __init__(self, product_id, existing_codes):
+        """
+        The product ID is the format from the product categories, for example: 1910-1xxxx.
+        """
+        if "-" not in product_id or product_id[product_id.index("-") + 1:] not in self._SCHEMES:
+            raise Exception(f"Product ID '{product_id}' has no sequence number")
+        self._prefix = product_id[:product_id.index("-") + 1]
+        self._scheme = product_id[len(self._prefix):]
+        self._first, self._last = self._SCHEMES[self._scheme]
+        numbers = set(map(self._get_number, existing_codes))
+        self._used = sorted(filter(lambda x: x is not None and self._first <= x <= self._last, numbers))
+
+    ###########
+    # Private #
+    ###########
+
+    def _get_number(self, code):
+        # Returns the sequence number of the code, None if the code does not match the scheme
+        if not isinstance(code, str) or not code.startswith(self._prefix):
+            return None
+        digits = code[len(self._prefix):]
+        if len(digits) != 5 or not digits.isdigit():
+            return None
+        return int(digits[:3]) if self._scheme == "1xxyy" else int(digits)
+
+    def _format(self, number):
+        if self._scheme == "1xxyy":
+            return f"{self._prefix}{number:03d}01"
+        return f"{self._prefix}{number:05d}"
+
+    def _get_first_free_index(self):
+        # Index of the first used number after the first free number
+        # used[i] - i is the first number for all consecutive numbers and larger after the first free number
+        low = 0
+        high = len(self._used)
+        while low < high:
+            middle = (low + high) // 2
+            if self._used[middle] - middle == self._first:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find_free(self, count):
+        # Returns the first number of the first range of free numbers, None if there is no such range
+        index = self._get_first_free_index()
+        number = self._first + index
+        while index < len(self._used):
+            if self._used[index] - number >= count:
+                return number
+            number = self._used[index] + 1
+            index += 1
+        return number if number + count - 1 <= self._last else None
+
+    ##########
+    # Public #
+    ##########
+
+    def get_next_code(self):
+        """
+        Returns the product ID with the lowest free number, an empty string if all numbers are used.
+        """
+        number = self._find_free(1)
+        return self._format(number) if number is not None else ""
+
+    def allocate(self, count=1):
+        """
+        Returns a list with product IDs for consecutive free numbers, the lowest numbers that are free.
+        The numbers are marked as used.
+        """
+        number = self._find_free(count)
+        if number is None:
+            raise Exception(f"No {count} consecutive product IDs free for '{self._prefix}{self._scheme}'")
+        index = bisect.bisect_left(self._used, number)
+        self._used[index:index] = range(number, number + count)
+        return [self._format(number + i) for i in range(count)]
+
+    def is_used(self, code):
+        number = self._get_number(code)
+        index = bisect.bisect_left(self._used, number) if number is not None else len(self._used)
+        return index < len(self._used) and self._used[index] == number
+
+
+if __name__ == "__main__":
+
+    _allocator = ProductIdAllocator("1910-1xxxx", ["1910-10001", "1910-10002", "1910-10004", "1910-10007"])
+    print("Next 1xxxx   :", _allocator.get_next_code())
+    print("Allocate 2   :", _allocator.allocate(2))
+    print("Allocate 1   :", _allocator.allocate())
+
+    _allocator = ProductIdAllocator("2910-1xxyy", ["2910-10101", "2910-10102", "2910-10201", "2910-10401"])
+    print("Next 1xxyy   :", _allocator.get_next_code())
+    print("Allocate 3   :", _allocator.allocate(3))
+    print("Is used      :", _allocator.is_used("2910-10502"), _allocator.is_used("2910-10801"))
@@ -0,0 +1,197 @@
+"""
+Generates derived symbols for a series of values (resistors, capacitors) and merges them into a symbol library.
+
+A specification has the template, the E-series, the range of values, the units and the fields for the template:
+
+    {
+        "template": "resistor_template.kicad_sym",
+        "series": "E24",
+        "minimum": "1R0",
+        "maximum": "9M1",
+        "units": "RkM",
+        "multipliers": "KJ01234",
+        "fields": {"power": "125mW", "package": "0805", "footprint": "res_0805", "package_id": "1"}
+    }
+
+The values are in the notation of the symbol names, the unit is the decimal point (1R0, 4k7, 100n). The units are
+the letters for each factor 1000, starting with the base unit (ohm, pF). The template gets these fields, next to
+the fields of the specification:
+- value: the value in the notation of the symbol names
+- lily_id: the package ID, the three significant digits of the value and the power of ten of the value
+- manufacturer_id: the three significant digits of the value and the multiplier for the power of ten of the value,
+  only if the specification has multipliers
+
+The symbols are merged into the library in one pass: the existing symbols are copied as they are and the new symbols
+are inserted at their sorted position between the derived symbols, the order in which KiCad writes the library.
+Existing symbols are skipped, or replaced if they are changed and replacing is enabled. The library is written to a
+temporary file that replaces the library at the end, so the library is never written half.
+"""
+
+import mmap
+import os
+import re
+
+from decimal import Decimal
+
+from toolbox.models.parsers.symbol_index import SymbolIndex
+
+
+class SymbolGenerator:
+
+    TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "..", "scripts")
+
+    # Significant digits of the values per decade
+    E_SERIES = {
+        "E6": [10, 15, 22, 33, 47, 68],
+        "E12": [10, 12, 15, 18, 22, 27, 33, 39, 47, 56, 68, 82],
+        "E24": [10, 11, 12, 13, 15, 16, 18, 20, 22, 24, 27, 30, 33, 36, 39, 43, 47, 51, 56, 62, 68, 75, 82, 91],
+        "E96": [100, 102, 105, 107, 110, 113, 115, 118, 121, 124, 127, 130, 133, 137, 140, 143, 147, 150, 154, 158,
+                162, 165, 169, 174, 178, 182, 187, 191, 196, 200, 205, 210, 215, 221, 226, 232, 237, 243, 249, 255,
+                261, 267, 274, 280, 287, 294, 301, 309, 316, 324, 332, 340, 348, 357, 365, 374, 383, 392, 402, 412,
+                422, 432, 442, 453, 464, 475, 487, 499, 511, 523, 536, 549, 562, 576, 590, 604, 619, 634, 649, 665,
+                681, 698, 715, 732, 750, 768, 787, 806, 825, 845, 866, 887, 909, 931, 953, 976]
+    }
+
+    _NAME = re.compile(r'\(symbol "((?:[^"\\]|\\.)*)"')
+    _EXTENDS = re.compile(r'\(extends "((?:[^"\\]|\\.)*)"\)')
+
+    ###########
+    # Private #
+    ###########
+
+    @staticmethod
+    def _parse_value(text, units):
+        # Returns the value in the base unit
+        for i, unit in enumerate(units):
+            if unit in text:
+                return Decimal(text.replace(unit, ".").rstrip(".")).scaleb(3 * i)
+        raise Exception(f"Value '{text}' has no unit of '{units}'")
+
+    @staticmethod
+    def _format_value(value, units):
+        # Returns the value in the notation of the symbol names, at least two digits: 1R0, 4k7, 10k, 100n
+        index = value.adjusted() // 3
+        if not 0 <= index < len(units):
+            raise Exception(f"Value {value} is out of the range of units '{units}'")
+        text = format(value.scaleb(-3 * index).normalize(), "f")
+        if len(text) == 1:
+            text = f"{text}.0"
+        return text.replace(".", units[index]) if "." in text else f"{text}{units[index]}"
+
+    @classmethod
+    def _get_values(cls, spec):
+        # Returns the values of the series in the range of the specification
+        minimum = cls._parse_value(spec["minimum"], spec["units"])
+        maximum = cls._parse_value(spec["maximum"], spec["units"])
+        values = []
+        for decade in range(len(spec["units"]) * 3):
+            for digits in cls.E_SERIES[spec["series"]]:
+                value = Decimal(digits).scaleb(decade - len(str(digits)) + 1)
+                if minimum <= value <= maximum:
+                    values.append((digits, decade, value))
+        return values
+
+    @classmethod
+    def _read_template(cls, filename):
+        with open(os.path.join(cls.TEMPLATE_PATH, filename), "r", newline="") as fp:
+            return fp.read().replace("\r\n", "\n").strip()
+
+    @staticmethod
+    def _get_eol(data):
+        return b"\r\n" if b"\r\n" in data[:1000] else b"\n"
+
+    ##########
+    # Public #
+    ##########
+
+    @classmethod
+    def generate_symbols(cls, specs):
+        """
+        Returns a dictionary with the symbol texts (without indentation of the first line) by name, sorted by name.
+        """
+        symbols = {}
+        for spec in specs:
+            template = cls._read_template(spec["template"])
+            for digits, decade, value in cls._get_values(spec):
+                code = str(digits).ljust(3, "0")
+                fields = {
+                    **spec["fields"],
+                    "value": cls._format_value(value, spec["units"]),
+                    "lily_id": f"{spec["fields"].get("package_id", "")}{code}{decade}"
+                }
+                if "multipliers" in spec:
+                    fields["manufacturer_id"] = f"{code}{spec["multipliers"][decade]}"
+                text = template.format(**fields)
+                name = cls._NAME.match(text).group(1)
+                if symbols.get(name, text) != text:
+                    raise Exception(f"Symbol '{name}' is generated twice with different content")
+                symbols[name] = text
+        return dict(sorted(symbols.items()))
+
+    @classmethod
+    def merge_symbols(cls, filename, symbols, replace=False):
+        """
+        Merges the symbols from generate_symbols into the library, in one pass over the library.
+        Existing symbols are skipped, or replaced if replace is True and the symbol is changed.
+        Returns a dictionary with the number of added, replaced and skipped symbols.
+        """
+        index = SymbolIndex.get_index(filename)
+        if len(index) == 0:
+            raise Exception(f"Library '{filename}' has no symbols")
+        for name, text in symbols.items():
+            parent = cls._EXTENDS.search(text)
+            if parent is None or (parent.group(1) not in index and parent.group(1) not in symbols):
+                raise Exception(f"The parent symbol of '{name}' is not in the library")
+        stats = {"added": 0, "replaced": 0, "skipped": 0}
+        new_symbols = [name for name in symbols if name not in index]
+        temp_filename = f"{filename}.tmp"
+        with open(filename, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            eol = cls._get_eol(data)
+            with open(temp_filename, "wb") as out:
+                position = 0
+                i = 0
+                for name, item in index.items():
+                    if data[item["start"]:item["start"] + 8] != b"(symbol ":
+                        raise Exception(f"The symbol index of '{filename}' is not up to date")
+                    out.write(data[position:item["start"]])
+                    if item["extends"] is not None:
+                        # New symbols before this symbol, the separator is the same as before this symbol
+                        while i < len(new_symbols) and new_symbols[i] < name:
+                            out.write(symbols[new_symbols[i]].replace("\n", eol.decode()).encode("utf-8"))
+                            out.write(eol + b"\t")
+                            stats["added"] += 1
+                            i += 1
+                    text = data[item["start"]:item["end"]]
+                    if name in symbols:
+                        new_text = symbols[name].replace("\n", eol.decode()).encode("utf-8")
+                        if replace and new_text != text:
+                            text = new_text
+                            stats["replaced"] += 1
+                        else:
+                            stats["skipped"] += 1
+                    out.write(text)
+                    position = item["end"]
+                # Remaining new symbols after the last symbol
+                for name in new_symbols[i:]:
+                    out.write(eol + b"\t")
+                    out.write(symbols[name].replace("\n", eol.decode()).encode("utf-8"))
+                    stats["added"] += 1
+                out.write(data[position:])
+        os.replace(temp_filename, filename)
+        return stats
+
+
+if __name__ == "__main__":
+
+    _specs = [{
+        "template": "resistor_template.kicad_sym",
+        "series": "E96",
+        "minimum": "10k",
+        "maximum": "12k",
+        "units": "RkM",
+        "multipliers": "KJ01234",
+        "fields": {"power": "125mW", "package": "0805", "footprint": "res_0805", "package_id": "1"}
+    }]
+    _symbols = SymbolGenerator.generate_symbols(_specs)
+    print(f"Generated {len(_symbols)} symbols: {", ".join(_symbols)}")
+    print(_symbols["res_10k2_1%_125mW_0805"][:600])
@@ -0,0 +1,255 @@
+"""
+Checks if URIs are available.
+
+The URIs are checked by a limited number of worker threads. Each worker keeps one connection per host open, so
+URIs on the same host reuse the connection. A HEAD request is done first, with a fallback to a GET request for
+servers that do not support HEAD. Available URIs are stored in a cache file and are not checked again until
+the cache entry is expired.
+The proxy settings of the system are used (environment variables, or the registry on Windows), like urllib does.
+HTTPS requests go through a tunnel in the proxy.
+"""
+
+import base64
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from concurrent.futures import ThreadPoolExecutor
+
+from toolbox.app_data import AppData
+
+
+class UriChecker:
+
+    stdout = print
+
+    MAX_WORKERS = 8
+    TIMEOUT = 10
+    MAX_REDIRECTS = 5
+    CACHE_ENABLED = True
+    # Time in seconds an available URI is not checked again
+    CACHE_TTL = 24 * 60 * 60
+    CACHE_FILENAME = os.path.join(AppData.CACHE_PATH, "uri_cache.json")
+
+    _REDIRECT_CODES = (301, 302, 303, 307, 308)
+    _CONNECTION_CLASSES = {"http": http.client.HTTPConnection, "https": http.client.HTTPSConnection}
+    _HEADERS = {"User-Agent": f"{AppData.EXE_NAME}/{AppData.VERSION}"}
+
+    def __init__(self, stdout=None):
+        """
+        The messages are written to stdout, the stdout of the class if not given.
+        """
+        self._stdout = stdout if stdout is not None else type(self).stdout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._proxies = urllib.request.getproxies()
+        self._host_proxies = {}
+
+    ###########
+    # Private #
+    ###########
+
+    def _get_proxy(self, scheme, host):
+        # Returns the parts of the proxy URI for the host, None for a direct connection
+        key = (scheme, host)
+        if key not in self._host_proxies:
+            proxy = self._proxies.get(scheme, None)
+            if proxy is not None and not urllib.request.proxy_bypass(host):
+                self._host_proxies[key] = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+            else:
+                self._host_proxies[key] = None
+        return self._host_proxies[key]
+
+    @staticmethod
+    def _get_proxy_headers(proxy):
+        if proxy.username is None:
+            return {}
+        credentials = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or "")}"
+        return {"Proxy-Authorization": f"Basic {base64.b64encode(credentials.encode("utf-8")).decode("ascii")}"}
+
+    def _get_connection(self, scheme, host, renew=False):
+        # Connections are per worker thread, a connection can only handle one request at a time
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        key = (scheme, host)
+        connection = self._local.connections.get(key, None)
+        if connection is not None and renew:
+            connection.close()
+            connection = None
+        if connection is None:
+            proxy = self._get_proxy(scheme, host)
+            if proxy is None:
+                connection = self._CONNECTION_CLASSES[scheme](host, timeout=self.TIMEOUT)
+            else:
+                connection = self._CONNECTION_CLASSES[proxy.scheme](proxy.hostname, proxy.port, timeout=self.TIMEOUT)
+                if scheme == "https":
+                    # The proxy connects to the host, the TLS connection is made through it
+                    target = urllib.parse.urlsplit(f"https://{host}")
+                    connection.set_tunnel(target.hostname, target.port or http.client.HTTPS_PORT,
+                                          self._get_proxy_headers(proxy))
+            self._local.connections[key] = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _request(self, method, uri):
+        parts = urllib.parse.urlsplit(uri)
+        if parts.scheme not in ("http", "https"):
+            raise Exception(f"Unsupported URI scheme '{parts.scheme}'")
+        path = parts.path if parts.path != "" else "/"
+        if parts.query != "":
+            path += f"?{parts.query}"
+        headers = dict(self._HEADERS)
+        proxy = self._get_proxy(parts.scheme, parts.netloc)
+        if proxy is not None and parts.scheme == "http":
+            # Without a tunnel, the proxy gets the complete URI
+            path = urllib.parse.urlunsplit((parts.scheme, parts.netloc, path, "", ""))
+            headers.update(self._get_proxy_headers(proxy))
+        if method == "GET":
+            # Only the first byte, the content itself is not needed
+            headers["Range"] = "bytes=0-0"
+        # The server can close a kept alive connection at any time, in that case retry once with a new connection
+        for renew in (False, True):
+            connection = self._get_connection(parts.scheme, parts.netloc, renew)
+            try:
+                connection.request(method, path, headers=headers)
+                response = connection.getresponse()
+                # The response must be read completely before the connection can be used again
+                response.read()
+                if response.will_close:
+                    connection.close()
+                return response.status, response.getheader("Location", None)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if renew:
+                    raise
+        return None, None
+
+    def _check_uri(self, uri):
+        try:
+            for _ in range(self.MAX_REDIRECTS + 1):
+                status, location = self._request("HEAD", uri)
+                if status >= 400:
+                    status, location = self._request("GET", uri)
+                if status in self._REDIRECT_CODES and location is not None:
+                    uri = urllib.parse.urljoin(uri, location)
+                    continue
+                return status in (200, 206)
+        except (Exception,):
+            pass
+        return False
+
+    def _load_cache(self):
+        if self.CACHE_ENABLED and os.path.isfile(self.CACHE_FILENAME):
+            try:
+                with open(self.CACHE_FILENAME, "r") as fp:
+                    return json.load(fp)
+            except (Exception,):
+                # Unreadable cache file, start with an empty cache
+                pass
+        return {}
+
+    def _save_cache(self, cache):
+        if self.CACHE_ENABLED:
+            os.makedirs(os.path.dirname(self.CACHE_FILENAME), exist_ok=True)
+            temp_filename = f"{self.CACHE_FILENAME}.{os.getpid()}.tmp"
+            with open(temp_filename, "w") as fp:
+                json.dump(cache, fp, indent=2)
+            os.replace(temp_filename, self.CACHE_FILENAME)
+
+    def _close_connections(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+
+    ##########
+    # Public #
+    ##########
+
+    def check_uris(self, uris):
+        """
+        Returns a dictionary with for each URI True when available, else False.
+        Each URI is only checked once, also when it is multiple times in the list.
+        """
+        now = time.time()
+        cache = {uri: timestamp for uri, timestamp in self._load_cache().items() if now - timestamp < self.CACHE_TTL}
+        results = {}
+        uris_to_check = []
+        for uri in dict.fromkeys(uris):
+            if uri in cache:
+                results[uri] = True
+            else:
+                uris_to_check.append(uri)
+        self._stdout(f"Checking {len(uris_to_check)} URIs ({len(results)} from cache)")
+
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+                for uri, is_available in zip(uris_to_check, executor.map(self._check_uri, uris_to_check)):
+                    results[uri] = is_available
+                    if is_available:
+                        cache[uri] = now
+        finally:
+            self._close_connections()
+        self._save_cache(cache)
+        self._stdout(f"Checking URIs done in {time.perf_counter() - start:.1f} s")
+        return results
+
+
+if __name__ == "__main__":
+
+    import http.server
+    import tempfile
+
+    class _StandInHandler(http.server.BaseHTTPRequestHandler):
+        # Simulates a server: /ok supports HEAD, /get_only does not, /moved redirects and all else is not found
+        protocol_version = "HTTP/1.1"
+        requests = []
+
+        def _respond(self, has_body):
+            self.requests.append((self.command, self.path, self.client_address[1]))
+            if self.path == "/get_only" and self.command == "HEAD":
+                status = 405
+            elif self.path in ("/ok", "/get_only"):
+                status = 200
+            elif self.path == "/moved":
+                status = 301
+            else:
+                status = 404
+            body = b"%PDF" if has_body and status == 200 else b""
+            self.send_response(status)
+            if status == 301:
+                self.send_header("Location", "/ok")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_HEAD(self):
+            self._respond(False)
+
+        def do_GET(self):
+            self._respond(True)
+
+        def log_message(self, *args):
+            pass
+
+    _server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    _base_uri = f"http://127.0.0.1:{_server.server_address[1]}"
+    _uris = [f"{_base_uri}/{_path}" for _path in ("ok", "get_only", "moved", "missing", "ok", "ok")]
+
+    UriChecker.CACHE_FILENAME = os.path.join(tempfile.mkdtemp(), "uri_cache.json")
+    UriChecker.MAX_WORKERS = 2
+    for _ in range(2):
+        _StandInHandler.requests = []
+        for _uri, _result in UriChecker().check_uris(_uris).items():
+            print(f"{_uri:<40} {_result}")
+        print(f"Requests: {len(_StandInHandler.requests)}, "
+              f"connections: {len(set(map(lambda x: x[2], _StandInHandler.requests)))}")
+    _server.shutdown()
+    os.remove(UriChecker.CACHE_FILENAME)
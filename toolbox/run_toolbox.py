@@ -2,6 +2,7 @@
 Run the toolbox
 """
 
+import multiprocessing
 import wx
 
 from toolbox.controllers.controller_main import ControllerMain
@@ -15,4 +16,6 @@ def run_toolbox(active_tab=0):
 
 if __name__ == "__main__":
 
+    # Required for the worker processes in the executable
+    multiprocessing.freeze_support()
     run_toolbox()
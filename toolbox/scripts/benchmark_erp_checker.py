@@ -0,0 +1,74 @@
+"""
+Benchmark the ERP checker with synthetic ERP and library data.
+The time per component should stay the same when the number of components increases (linear scaling).
+The complete checker is run with the stand-in ERP server with a delay per call. The ERP components are read at the
+same time as the library is parsed, so the time for reading should be the slowest of the two, not the sum.
+"""
+
+import os
+import tempfile
+import time
+
+from toolbox.models.checkers.erp_checker import ErpChecker
+from toolbox.models.erp_mirror import ErpMirror
+from toolbox.models.parsers.lib_parser import LibParser
+from toolbox.models.parsers.parser_cache import ParserCache
+from toolbox.scripts.fake_erp_server import FakeErpServer
+
+
+def _create_data(n_records):
+    erp_components = []
+    lib_components = []
+    for i in range(n_records):
+        code = f"1914-{10000 + i}"
+        name = f"ic test component {i}"
+        erp_components.append({"id": i, "name": name, "default_code": code, "categ_id": [1, "Electronic components"]})
+        # Every 10th component is missing in the library, every 7th has another name, every 13th has another ID
+        if i % 10 == 0:
+            continue
+        if i % 7 == 0:
+            name = f"{name} other"
+        if i % 13 == 0:
+            code = f"1914-{90000 + i}"
+        lib_components.append({"Name": name, "Lily_ID": code, "Reference": "U", "Extends": "ic"})
+    # Some duplicates
+    erp_components.extend(erp_components[1:n_records:1000])
+    return lib_components, erp_components
+
+
+def _run_checker_benchmark():
+    print(f"{"run":>20} | {"ERP":>8} | {"library":>8} | {"sum":>8} | {"read":>8} | {"check":>8} | {"total":>8}")
+    server = FakeErpServer(20000, delay=0.3)
+    server.start()
+    with tempfile.TemporaryDirectory() as temp_folder:
+        # Start without cache and local ERP copy
+        ParserCache.CACHE_PATH = temp_folder
+        ErpMirror.DATABASE_FILENAME = os.path.join(temp_folder, "erp_products.sqlite")
+        ErpChecker.erp_config = server.get_config()
+        ErpChecker.stdout = lambda x: None
+        LibParser.stdout = lambda x: None
+        for label in ("no cache", "cached"):
+            ErpChecker.run()
+            timings = ErpChecker.timings
+            print(f"{label:>20} | {timings["erp"]:>6.3f} s | {timings["library"]:>6.3f} s | "
+                  f"{timings["erp"] + timings["library"]:>6.3f} s | {timings["read"]:>6.3f} s | "
+                  f"{timings["check"]:>6.3f} s | {timings["total"]:>6.3f} s")
+    server.stop()
+
+
+def run_benchmark():
+    print(f"{"ERP records":>12} | {"lib components":>14} | {"messages":>8} | {"time":>10} | {"per record":>10}")
+    for n_records in (1000, 5000, 10000, 50000):
+        lib_components, erp_components = _create_data(n_records)
+        start = time.perf_counter()
+        messages = ErpChecker.check_components(lib_components, erp_components)
+        duration = time.perf_counter() - start
+        print(f"{len(erp_components):>12} | {len(lib_components):>14} | {len(messages):>8} | "
+              f"{duration * 1000:>7.1f} ms | {duration * 1e6 / len(erp_components):>7.2f} us")
+    print()
+    _run_checker_benchmark()
+
+
+if __name__ == "__main__":
+
+    run_benchmark()
@@ -0,0 +1,70 @@
+"""
+Benchmark reading the records from the ERP system, with the stand-in server with synthetic records.
+The stand-in has a delay per call to simulate the network latency.
+Compares reading all records in one call (new connection and authentication each time) with the ERP client
+(cached user ID, connections kept open, pages read in parallel), for several page sizes and numbers of workers.
+"""
+
+import time
+import xmlrpc.client
+
+from toolbox.models.erp_connect import ErpClient
+from toolbox.scripts.fake_erp_server import FakeErpServer
+
+
+_N_RECORDS = 100000
+_DELAY = 0.05
+_DOMAIN = ["|", ["categ_id", "=", "Electronic components"], ["categ_id", "=", "Draft"]]
+_FIELDS = ["id", "name", "default_code", "categ_id"]
+
+
+def _read_single_call(config):
+    common = xmlrpc.client.ServerProxy(f"{config["url"]}/xmlrpc/2/common")
+    uid = common.authenticate(config["database"], config["username"], config["password"], {})
+    models = xmlrpc.client.ServerProxy(f"{config["url"]}/xmlrpc/2/object")
+    return models.execute_kw(config["database"], uid, config["password"], "product.template", "search_read",
+                             [_DOMAIN], {"fields": _FIELDS})
+
+
+def _read_client(client, page_size, workers):
+    # Returns the number of records and the time of the first record
+    start = time.perf_counter()
+    first = None
+    n_records = 0
+    for _record in client.iter_records("product.template", _DOMAIN, _FIELDS, page_size, workers):
+        if first is None:
+            first = time.perf_counter() - start
+        n_records += 1
+    return n_records, first
+
+
+def run_benchmark():
+    server = FakeErpServer(_N_RECORDS, _DELAY)
+    server.start()
+    config = server.get_config()
+    print(f"{_N_RECORDS} records, {_DELAY * 1000:.0f} ms latency per call")
+    print(f"{"method":>24} | {"records":>8} | {"first record":>12} | {"total":>8} | {"calls":>5}")
+    try:
+        calls = server.get_calls()
+        start = time.perf_counter()
+        records = _read_single_call(config)
+        duration = time.perf_counter() - start
+        print(f"{"single call":>24} | {len(records):>8} | {duration:>10.3f} s | {duration:>6.3f} s | "
+              f"{server.get_calls() - calls:>5}")
+        client = ErpClient(config)
+        for page_size, workers in ((2000, 1), (2000, 1), (2000, 4), (5000, 1), (5000, 4), (10000, 4), (10000, 8)):
+            label = f"client, {page_size} x {workers}{", cold" if server.get_calls() == 2 else ""}"
+            calls = server.get_calls()
+            start = time.perf_counter()
+            n_records, first = _read_client(client, page_size, workers)
+            duration = time.perf_counter() - start
+            assert n_records == len(records)
+            print(f"{label:>24} | {n_records:>8} | {first:>10.3f} s | {duration:>6.3f} s | "
+                  f"{server.get_calls() - calls:>5}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+
+    run_benchmark()
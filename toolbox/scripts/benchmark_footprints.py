@@ -0,0 +1,48 @@
+"""
+Benchmark parsing the footprints library with different numbers of worker processes.
+The cache is disabled, so all footprint files are parsed. The size threshold for parsing in parallel is disabled, the
+result shows if the threshold (LibParser.PARALLEL_MIN_BYTES) fits this computer.
+"""
+
+import glob
+import os
+import time
+
+from toolbox.models.parsers.lib_parser import LibParser
+from toolbox.models.parsers.parser_cache import ParserCache
+
+
+def run_benchmark(repeat=3):
+    ParserCache.ENABLED = False
+    LibParser.stdout = lambda x: None
+    threshold = LibParser.PARALLEL_MIN_BYTES
+    LibParser.PARALLEL_MIN_BYTES = 0
+    n_cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, n_cpus})
+    n_bytes = sum(map(os.path.getsize, glob.glob(os.path.join(LibParser.LIB_FOOTPRINT_PATH, "*.kicad_mod"))))
+
+    print(f"Footprints library: {LibParser.LIB_FOOTPRINT_PATH}")
+    print(f"Size: {n_bytes / 1024:.0f} kB, parsed in parallel from {threshold / 1024:.0f} kB")
+    print(f"CPUs: {n_cpus}")
+    print(f"{"workers":>7} | {"time":>10} | {"speedup":>7}")
+    reference = None
+    serial_time = None
+    for n_workers in worker_counts:
+        LibParser.PARSE_WORKERS = n_workers
+        duration = float("inf")
+        footprints = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            footprints = LibParser.get_footprints()
+            duration = min(duration, time.perf_counter() - start)
+        if reference is None:
+            reference = footprints
+            serial_time = duration
+        assert footprints == reference, "Parallel result is not the same as the serial result"
+        print(f"{n_workers:>7} | {duration * 1000:>7.1f} ms | {serial_time / duration:>6.2f}x")
+    LibParser.PARALLEL_MIN_BYTES = threshold
+
+
+if __name__ == "__main__":
+
+    run_benchmark()
@@ -0,0 +1,63 @@
+"""
+Benchmark reading the PCB properties from the header against reading the complete layout.
+A large layout is made by copying the footprints of a test project, the last footprint is put on the bottom side.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from toolbox.app_data import AppData
+from toolbox.models.parsers.design_model import DesignModel
+
+
+def _create_layout(source_folder, target_folder, min_size):
+    source = os.path.join(source_folder, f"{os.path.basename(source_folder)}.kicad_pcb")
+    with open(source, "r", newline="") as fp:
+        content = fp.read()
+    start = content.index("\n\t(footprint ")
+    end = content.index("\n\t)", content.rindex("\n\t(footprint ")) + 3
+    footprints = content[start:end]
+    n_copies = min_size // len(footprints) + 1
+    bottom = footprints[footprints.rindex("\n\t(footprint "):].replace('(layer "F.Cu")', '(layer "B.Cu")', 1)
+    with open(os.path.join(target_folder, "large.kicad_pcb"), "w", newline="") as fp:
+        fp.write(content[:start])
+        for _ in range(n_copies):
+            fp.write(footprints)
+        fp.write(bottom)
+        fp.write(content[end:])
+    return os.path.join(target_folder, "large.kicad_pcb")
+
+
+def _measure(function, *args, repeat=3):
+    duration = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        duration = min(duration, time.perf_counter() - start)
+    return result, duration
+
+
+def run_benchmark(min_size=20 * 1024 * 1024):
+    DesignModel.stdout = lambda x: None
+    folder = tempfile.mkdtemp()
+    try:
+        filename = _create_layout(os.path.join(AppData.APP_PATH, "projects", "lib_test", "multi_channel"), folder,
+                                  min_size)
+        print(f"Layout: {os.path.getsize(filename) / 1024 / 1024:.1f} MB")
+        # A new model for each run, the shared model would not read the layout again
+        header, header_time = _measure(lambda x: DesignModel(x).get_pcb_properties(), folder)
+        full, full_time = _measure(lambda x: DesignModel(x)._read_pcb()["properties"], folder, repeat=1)
+        assert header == full, f"Different properties: {header}, {full}"
+        assert header["has_comp_bot"], "The bottom footprint is not found"
+        print(f"{"complete layout":<20} {full_time * 1000:>9.1f} ms")
+        print(f"{"header":<20} {header_time * 1000:>9.1f} ms")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+
+    run_benchmark()
@@ -0,0 +1,123 @@
+"""
+Benchmark the design processing with separate kicad-cli commands against one jobset, and with the artifact cache.
+Uses the kicad-cli stand-in (fake_kicad_cli.py), so KiCad does not have to be installed.
+The KiCad version of the stand-in is set to 8 for the separate commands, so the fallback is used.
+With the cache, the layout is saved again without changes and then changed on the silkscreen only: only the exports
+that use the silkscreen (gerbers, top placement PDF and ODB++) must be done again.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from toolbox.app_data import AppData
+from toolbox.models.artifact_cache import ArtifactCache
+from toolbox.models.job_scheduler import JobScheduler
+from toolbox.models.kicad_cli import KiCadCli
+from toolbox.models.parsers.design_parser import DesignParser
+from toolbox.models.process_design import ProcessDesign
+
+
+def _process_design(design_filename, output_folder, max_workers):
+    sch_filename = design_filename.replace(".kicad_pro", ".kicad_sch")
+    pcb_filename = design_filename.replace(".kicad_pro", ".kicad_pcb")
+    process = ProcessDesign("20250101", "benchmark", output_folder)
+    scheduler = JobScheduler(max_workers)
+    scheduler.stdout = lambda x: None
+    scheduler.add_job("Schematics", process.schematics_to_pdf, sch_filename)
+    scheduler.add_job("BOM", process.create_bom, sch_filename, ["General", "LilyTronics ERP", "JLCPCB"], "1234")
+    gerbers = scheduler.add_job("Gerbers", process.create_gerbers, pcb_filename, 2)
+    drill = scheduler.add_job("Drill", process.create_drill, pcb_filename)
+    scheduler.add_job("ZIP", process.create_gerbers_zip, depends_on=[gerbers, drill])
+    scheduler.add_job("Position", process.create_position_file, pcb_filename)
+    scheduler.add_job("PCB PDF", process.pcb_to_pdf, pcb_filename, True)
+    scheduler.add_job("ODB", process.create_odb, pcb_filename)
+    scheduler.add_job("STEP", process.create_3d_model, pcb_filename)
+    batch_message = process.run_batch(design_filename, [(function, args) for _, function, args in scheduler.get_jobs()])
+    scheduler.run()
+    reports = [scheduler.get_result(job_id) for job_id in range(len(scheduler.get_jobs()))]
+    return batch_message, reports
+
+
+# Text on the top silkscreen, added to the layout
+_SILKSCREEN_TEXT = '\t(gr_text "benchmark"\n\t\t(at 10 10 0)\n\t\t(layer "F.SilkS")\n\t\t(effects\n\t\t\t(font\n' \
+                   '\t\t\t\t(size 1 1)\n\t\t\t)\n\t\t)\n\t)\n'
+
+
+def _get_files(folder):
+    files = []
+    for current_folder, _, filenames in os.walk(folder):
+        files.extend(os.path.relpath(os.path.join(current_folder, filename), folder) for filename in filenames)
+    return sorted(files)
+
+
+def _run_cached(design_filename, reference_files):
+    # A copy of the design is used, so the layout can be changed
+    folder = tempfile.mkdtemp()
+    ArtifactCache.ENABLED = True
+    ArtifactCache.CACHE_PATH = os.path.join(folder, "cache")
+    design_folder = os.path.join(folder, "design")
+    shutil.copytree(os.path.dirname(design_filename), design_folder)
+    design_filename = os.path.join(design_folder, os.path.basename(design_filename))
+    try:
+        pcb_filename = design_filename.replace(".kicad_pro", ".kicad_pcb")
+        expected_exports = {"warm cache": [], "layout saved again": [],
+                            "silkscreen changed": ["pcb_export_gerbers", "pcb_export_odb", "pcb_export_pdf"]}
+        for name in ("cold cache", "warm cache", "layout saved again", "silkscreen changed"):
+            if name == "layout saved again":
+                with open(pcb_filename, "a") as fp:
+                    fp.write("\n")
+            elif name == "silkscreen changed":
+                with open(pcb_filename, "r", newline="") as fp:
+                    layout = fp.read().rstrip()
+                with open(pcb_filename, "w", newline="") as fp:
+                    fp.write(f"{layout[:-1]}{_SILKSCREEN_TEXT})\n")
+            output_folder = os.path.join(folder, name)
+            start = time.perf_counter()
+            batch_message, reports = _process_design(design_filename, output_folder, 4)
+            duration = time.perf_counter() - start
+            assert _get_files(output_folder) == reference_files
+            messages = "\n".join([batch_message, *reports])
+            exports = sorted(set(re.findall(r"Exported (\w+):", messages)))
+            if name in expected_exports:
+                assert exports == expected_exports[name], exports
+            print(f"{name:<20} {4:>7} {duration:>6.2f} s  {messages.count("Restored from cache")} outputs restored "
+                  f"from the cache, exported: {", ".join(exports) or "none"}")
+    finally:
+        shutil.rmtree(folder)
+
+
+def run_benchmark():
+    KiCadCli.CLI_EXE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_kicad_cli.py")
+    # The version of the stand-in is changed, so do not keep the found version
+    KiCadCli.CACHE_ENABLED = False
+    ArtifactCache.ENABLED = False
+    DesignParser.stdout = lambda x: None
+    design_filename = os.path.join(AppData.APP_PATH, "projects", "lib_test", "resistors", "resistors.kicad_pro")
+    reference_files = None
+    print(f"{"mode":<20} {"workers":>7} {"time":>8}  batch")
+    for version, mode in (("8.0.5", "separate commands"), ("9.0.1", "jobset")):
+        os.environ["FAKE_KICAD_CLI_VERSION"] = version
+        for max_workers in (1, 4):
+            output_folder = tempfile.mkdtemp()
+            try:
+                start = time.perf_counter()
+                batch_message, reports = _process_design(design_filename, output_folder, max_workers)
+                duration = time.perf_counter() - start
+                files = _get_files(output_folder)
+            finally:
+                shutil.rmtree(output_folder)
+            if reference_files is None:
+                reference_files = files
+            assert files == reference_files, f"Different output files: {files}"
+            assert "Position file written to" in reports[5], reports[5]
+            print(f"{mode:<20} {max_workers:>7} {duration:>6.2f} s  {batch_message.splitlines()[0]}")
+    print(f"Output files: {len(reference_files)}")
+    _run_cached(design_filename, reference_files)
+
+
+if __name__ == "__main__":
+
+    run_benchmark()
@@ -0,0 +1,121 @@
+"""
+Benchmark the S-expression parser against the line walker that was used before.
+Compares the time and peak memory for reading the symbols library and the layouts of the test projects.
+The parser cache is disabled and cleared before each run, so the files are parsed every time.
+"""
+
+import glob
+import os
+import time
+import tracemalloc
+
+from toolbox.app_data import AppData
+from toolbox.models.parsers.design_model import DesignModel
+from toolbox.models.parsers.lib_parser import LibParser
+from toolbox.models.parsers.parser_cache import ParserCache
+
+
+def _line_walker_symbols(filename):
+    with open(filename, "r") as fp:
+        lines = fp.readlines()
+    symbols = []
+    i = 0
+    while i < len(lines):
+        if lines[i].startswith("\t(symbol "):
+            symbol = {"Name": lines[i].strip()[8:].strip('"')}
+            while i < len(lines):
+                i += 1
+                if lines[i].startswith("\t\t(extends "):
+                    symbol["Extends"] = lines[i].strip().strip(")")[9:].strip('"')
+                elif lines[i].startswith("\t\t(property "):
+                    parts = lines[i].strip()[10:].split('" "')
+                    if len(parts) == 2:
+                        symbol[parts[0].strip('"')] = parts[1].strip().strip('"')
+                elif lines[i].startswith("\t)"):
+                    break
+            symbols.append(symbol)
+        i += 1
+    return symbols
+
+
+def _line_walker_footprints(filename):
+    with open(filename, "r") as fp:
+        lines = fp.readlines()
+    footprints = []
+    i = 0
+    while i < len(lines):
+        if lines[i].startswith("\t(footprint "):
+            footprint = {"Footprint": lines[i].strip()[11:].strip(")").strip('"')}
+            while i < len(lines):
+                i += 1
+                if lines[i].startswith("\t)"):
+                    break
+                if lines[i].startswith("\t\t(property "):
+                    parts = lines[i].strip()[10:].split('" "')
+                    if len(parts) == 2:
+                        footprint[parts[0].strip('"')] = {"Value": parts[1].strip().strip('"')}
+                        while i < len(lines):
+                            i += 1
+                            if lines[i].startswith("\t\t\t(layer "):
+                                footprint[parts[0].strip('"')]["Layer"] = lines[i].strip()[7:].strip(")").strip('"')
+                            if lines[i].startswith("\t\t)"):
+                                break
+                if lines[i].startswith("\t\t(attr "):
+                    footprint["Attributes"] = lines[i].strip()[6:].strip(")").split(" ")
+            footprints.append(footprint)
+        i += 1
+    return footprints
+
+
+def _reset_cache():
+    # No cached data from a previous run, in memory or on disk
+    ParserCache.ENABLED = False
+    ParserCache._instances.clear()
+
+
+def _measure(function, *args, repeat=3):
+    # Time without memory tracing, tracing slows down the functions a lot
+    duration = float("inf")
+    result = []
+    for _ in range(repeat):
+        _reset_cache()
+        start = time.perf_counter()
+        result = function(*args)
+        duration = min(duration, time.perf_counter() - start)
+    _reset_cache()
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(result), duration, peak
+
+
+def _print_result(name, size, walker, parser):
+    print(f"{name:<40} {size / 1024:>8.0f} kB | "
+          f"{walker[1] * 1000:>8.1f} ms {walker[2] / 1024:>8.0f} kB | "
+          f"{parser[1] * 1000:>8.1f} ms {parser[2] / 1024:>8.0f} kB | "
+          f"{walker[0]:>5} {parser[0]:>5}")
+
+
+def run_benchmark():
+    LibParser.stdout = lambda x: None
+    DesignModel.stdout = lambda x: None
+    print(f"{"file":<40} {"size":>11} | {"line walker (time, peak memory)":<29} | "
+          f"{"S-expression parser":<29} | items")
+
+    filename = LibParser.LIB_SYMBOLS_FILENAME
+    walker = _measure(_line_walker_symbols, filename)
+    parser = _measure(LibParser.get_symbols)
+    _print_result(os.path.basename(filename), os.path.getsize(filename), walker, parser)
+
+    project_path = os.path.join(AppData.APP_PATH, "projects", "lib_test")
+    for filename in sorted(glob.glob(os.path.join(project_path, "*", "*.kicad_pcb"))):
+        walker = _measure(_line_walker_footprints, filename)
+        # A new model for each run, the shared models would not read the layout again
+        parser = _measure(lambda x: DesignModel(x).get_footprints(), os.path.dirname(filename))
+        _print_result(os.path.basename(filename), os.path.getsize(filename), walker, parser)
+
+
+if __name__ == "__main__":
+
+    run_benchmark()
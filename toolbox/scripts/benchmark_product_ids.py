@@ -0,0 +1,66 @@
+"""
+Benchmark generating product IDs with the allocator against the search loops that were used before.
+Runs the sequence schemes of the product categories with synthetic existing product IDs and checks that the results
+are the same as with the search loops. The tests for all schemes are in tests/test_product_ids.py.
+"""
+
+import random
+import time
+
+from toolbox.models.product_categories import ProductCategories
+
+
+def _search_next_code(product_id, existing_codes):
+    # The search loops that were used before
+    prefix = product_id[:product_id.index("-") + 1]
+    if product_id.endswith("1xxxx"):
+        for i in range(10001, 100000):
+            if f"{prefix}{i:05d}" not in existing_codes:
+                return f"{prefix}{i:05d}"
+    if product_id.endswith("1xxyy"):
+        for i in range(101, 1000):
+            if f"{prefix}{i:03d}01" not in existing_codes:
+                return f"{prefix}{i:03d}01"
+    return ""
+
+
+def _create_codes(product_id, n_codes, n_gaps):
+    # Consecutive product IDs from the first number with some gaps, the versions of 1xxyy start with 01
+    prefix = product_id[:product_id.index("-") + 1]
+    if product_id.endswith("1xxyy"):
+        bases = list(range(101, 101 + n_codes))
+        for base in random.sample(bases, n_gaps):
+            bases.remove(base)
+        return [f"{prefix}{base:03d}{version:02d}" for base in bases for version in range(1, 2 + base % 3)]
+    numbers = list(range(10001, 10001 + n_codes))
+    for number in random.sample(numbers, n_gaps):
+        numbers.remove(number)
+    return [f"{prefix}{number:05d}" for number in numbers]
+
+
+def run_benchmark():
+    categories = ProductCategories()
+    print(f"{"scheme":>10} | {"codes":>6} | {"search loop":>12} | {"allocator":>10} | {"next code":>11} | "
+          f"{"next 5 codes":>27}")
+    for category, product_id, n_codes in (("connectors", "1910-1xxxx", 1000), ("connectors", "1910-1xxxx", 10000),
+                                          ("connectors", "1910-1xxxx", 50000), ("fabricated PCB", None, 800)):
+        if product_id is None:
+            product_id = categories.get_properties(category)["product_id"]
+        assert categories.get_properties(category)["product_id"] == product_id
+        for n_gaps in (0, 3):
+            codes = _create_codes(product_id, n_codes, n_gaps)
+            start = time.perf_counter()
+            expected = _search_next_code(product_id, codes)
+            search_duration = time.perf_counter() - start
+            start = time.perf_counter()
+            code = categories.generate_next_code(category, codes, "", "")
+            duration = time.perf_counter() - start
+            assert code == expected, (code, expected)
+            next_codes = categories.generate_next_codes(category, codes, 5)
+            print(f"{product_id[5:]:>10} | {len(codes):>6} | {search_duration * 1000:>9.1f} ms | "
+                  f"{duration * 1000:>7.1f} ms | {code:>11} | {f"{next_codes[0]} - {next_codes[-1]}":>27}")
+
+
+if __name__ == "__main__":
+
+    run_benchmark()
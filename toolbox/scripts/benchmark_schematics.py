@@ -0,0 +1,45 @@
+"""
+Benchmark reading the schematics of a hierarchical design.
+Compares reading all schematic files in the project folder against following the sheets from the root schematic.
+"""
+
+import glob
+import os
+import time
+
+from toolbox.app_data import AppData
+from toolbox.models.parsers.design_model import DesignModel
+
+
+def _read_all_files(project_folder):
+    # How the schematics were read before: every schematic file in the folder
+    return [DesignModel._parse_schematics_file(filename)
+            for filename in glob.glob(os.path.join(project_folder, "*.kicad_sch"))]
+
+
+def _measure(function, *args, repeat=3):
+    duration = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        duration = min(duration, time.perf_counter() - start)
+    return duration
+
+
+def run_benchmark(project_name="integrated_circuits"):
+    DesignModel.stdout = lambda x: None
+    project_folder = os.path.join(AppData.APP_PATH, "projects", "lib_test", project_name)
+    model = DesignModel(project_folder)
+    print(f"Project: {project_folder}")
+    print(f"Files: {len(glob.glob(os.path.join(project_folder, "*.kicad_sch")))}, "
+          f"sheets: {len(model.get_sheet_instances())}, symbols: {len(model.get_symbols())}")
+    print(f"{"mode":<20} | {"time":>10}")
+    print(f"{"all files":<20} | {_measure(_read_all_files, project_folder) * 1000:>7.1f} ms")
+    # A new model for each run, the shared model would not read the schematics again
+    duration = _measure(lambda x: DesignModel(x).get_symbols(), project_folder)
+    print(f"{"hierarchy":<20} | {duration * 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+
+    run_benchmark()
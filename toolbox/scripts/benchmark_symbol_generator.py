@@ -0,0 +1,89 @@
+"""
+Benchmark generating a full E96 range of resistors for several packages and merging them into a copy of the
+symbols library.
+Checks that the symbols that were in the library are not changed (byte for byte), that merging the same symbols
+again does not change the library, and that the library can be parsed with all symbols.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from toolbox.models.parsers.lib_parser import LibParser
+from toolbox.models.parsers.parser_cache import ParserCache
+from toolbox.models.parsers.symbol_index import SymbolIndex
+from toolbox.models.symbol_generator import SymbolGenerator
+
+
+# Package and power
+_PACKAGES = [("0402", "63mW"), ("0603", "100mW"), ("0805", "125mW"), ("1206", "250mW"), ("2512", "1W")]
+
+
+def _get_specs():
+    return [{
+        "template": "resistor_template.kicad_sym",
+        "series": "E96",
+        "minimum": "1R0",
+        "maximum": "9M76",
+        "units": "RkM",
+        "multipliers": "KJ01234",
+        "fields": {"power": power, "package": package, "footprint": f"res_{package}", "package_id": str(i + 1)}
+    } for i, (package, power) in enumerate(_PACKAGES)]
+
+
+def _read_symbols(filename):
+    index = SymbolIndex.get_index(filename)
+    with open(filename, "rb") as fp:
+        data = fp.read()
+    return {name: data[item["start"]:item["end"]] for name, item in index.items()}
+
+
+def _get_hash(filename):
+    with open(filename, "rb") as fp:
+        return hashlib.sha1(fp.read()).hexdigest()
+
+
+def run_benchmark():
+    with tempfile.TemporaryDirectory() as temp_folder:
+        ParserCache.CACHE_PATH = temp_folder
+        filename = os.path.join(temp_folder, "lily_symbols.kicad_sym")
+        shutil.copyfile(LibParser.LIB_SYMBOLS_FILENAME, filename)
+        original = _read_symbols(filename)
+
+        start = time.perf_counter()
+        symbols = SymbolGenerator.generate_symbols(_get_specs())
+        print(f"Generated {len(symbols)} symbols in {time.perf_counter() - start:.3f} s")
+
+        start = time.perf_counter()
+        stats = SymbolGenerator.merge_symbols(filename, symbols)
+        n_added = stats["added"]
+        print(f"Merged in {time.perf_counter() - start:.3f} s: {stats}, "
+              f"library {os.path.getsize(LibParser.LIB_SYMBOLS_FILENAME) / 1e6:.1f} MB -> "
+              f"{os.path.getsize(filename) / 1e6:.1f} MB")
+
+        merged = _read_symbols(filename)
+        assert all(merged[name] == text for name, text in original.items()), "Existing symbols are changed"
+        index = SymbolIndex.get_index(filename)
+        derived = [name for name in merged if index[name]["extends"] is not None]
+        assert derived == sorted(derived), "Derived symbols are not sorted"
+        print("Existing symbols unchanged, derived symbols sorted")
+
+        file_hash = _get_hash(filename)
+        start = time.perf_counter()
+        stats = SymbolGenerator.merge_symbols(filename, symbols)
+        assert _get_hash(filename) == file_hash, "Merging again changed the library"
+        print(f"Merged again in {time.perf_counter() - start:.3f} s: {stats}, library unchanged")
+
+        LibParser.stdout = lambda x: None
+        LibParser.LIB_SYMBOLS_FILENAME = filename
+        start = time.perf_counter()
+        n_symbols = len(LibParser.get_symbols())
+        assert n_symbols == len(original) + n_added
+        print(f"Parsed {n_symbols} symbols in {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+
+    run_benchmark()
@@ -0,0 +1,255 @@
+"""
+Stand-in for the ERP (Odoo) XML-RPC server, for testing the ERP models without the ERP system.
+
+Emulates the endpoints used by the toolbox: /xmlrpc/2/common (version, authenticate) and /xmlrpc/2/object
+(execute_kw with search, search_count, search_read and read on product.template). The records are synthetic
+electronic components. Domains with the operators used by the toolbox are supported.
+The server handles requests in threads and keeps connections alive, like Odoo. A delay can be set to simulate the
+network latency of each call.
+
+Run it as a script for a server on a fixed port, or start it from a test or benchmark:
+
+    server = FakeErpServer(n_records=1000)
+    server.start()
+    config = server.get_config()
+    ...
+    server.stop()
+"""
+
+import operator
+import re
+import socketserver
+import sys
+import threading
+import time
+
+from datetime import datetime, timedelta
+from xmlrpc.server import MultiPathXMLRPCServer, SimpleXMLRPCDispatcher, SimpleXMLRPCRequestHandler
+
+
+DATABASE = "fake_erp"
+USERNAME = "toolbox"
+PASSWORD = "secret"
+UID = 2
+
+CATEGORIES = [(1, "Electronic components"), (2, "Draft"), (3, "Office supplies")]
+START_DATE = datetime(2025, 1, 1)
+
+_OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b
+}
+
+
+class _RequestHandler(SimpleXMLRPCRequestHandler):
+
+    # Keep the connection open for the next request
+    protocol_version = "HTTP/1.1"
+    # The paths are checked by the dispatchers of the server
+    rpc_paths = ()
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(socketserver.ThreadingMixIn, MultiPathXMLRPCServer):
+
+    daemon_threads = True
+
+
+class FakeErpServer:
+
+    def __init__(self, n_records=1000, delay=0.0, port=0):
+        self._delay = delay
+        self._port = port
+        self._lock = threading.Lock()
+        self._records = {}
+        # The result of the last search, for reading the pages of a search without searching again
+        self._last_search = (None, None)
+        self._write_date = START_DATE
+        self._server = None
+        self._thread = None
+        self._calls = 0
+        for i in range(1, n_records + 1):
+            category = CATEGORIES[0] if i % 20 != 0 else CATEGORIES[1 + i % 40 // 20]
+            self._add_record(i, f"test component {i}", f"19{10 + i % 5}-{10000 + i}", category)
+
+    ###########
+    # Private #
+    ###########
+
+    def _next_write_date(self):
+        self._write_date += timedelta(seconds=1)
+        return self._write_date.strftime("%Y-%m-%d %H:%M:%S")
+
+    def _add_record(self, record_id, name, default_code, category):
+        self._last_search = (None, None)
+        self._records[record_id] = {
+            "id": record_id,
+            "name": name,
+            "default_code": default_code,
+            "categ_id": list(category),
+            "write_date": self._next_write_date()
+        }
+
+    @staticmethod
+    def _match_leaf(record, leaf):
+        field, op, value = leaf
+        record_value = record.get(field, False)
+        if isinstance(record_value, list):
+            # Many2one field, compare with the name or the ID
+            record_value = record_value[1] if isinstance(value, str) else record_value[0]
+        if op in ("like", "ilike", "not like", "not ilike"):
+            # Odoo puts wildcards around the value, a % in the value is also a wildcard
+            pattern = ".*".join(re.escape(part) for part in str(value).split("%"))
+            flags = re.IGNORECASE if "ilike" in op else 0
+            is_match = re.search(pattern, str(record_value), flags) is not None
+            return is_match if not op.startswith("not") else not is_match
+        return _OPERATORS[op](record_value, value)
+
+    @classmethod
+    def _match(cls, record, domain):
+        # Domains are in prefix notation, the items without operator are combined with AND
+        def evaluate(index):
+            item = domain[index]
+            if item == "!":
+                result, index = evaluate(index + 1)
+                return not result, index
+            if item in ("|", "&"):
+                left, index = evaluate(index + 1)
+                right, index = evaluate(index)
+                return (left or right) if item == "|" else (left and right), index
+            return cls._match_leaf(record, item), index + 1
+
+        position = 0
+        while position < len(domain):
+            result, position = evaluate(position)
+            if not result:
+                return False
+        return True
+
+    def _search(self, domain, offset=0, limit=None, order=None):
+        key = repr((domain, order))
+        with self._lock:
+            if self._last_search[0] == key:
+                records = self._last_search[1]
+            else:
+                records = [record for record in self._records.values() if self._match(record, domain)]
+                if order is not None:
+                    field, _, direction = order.partition(" ")
+                    records.sort(key=lambda x: x[field], reverse=direction.strip().lower() == "desc")
+                else:
+                    records.sort(key=lambda x: x["id"])
+                self._last_search = (key, records)
+        return records[offset:offset + limit if limit else None]
+
+    @staticmethod
+    def _get_fields(record, fields):
+        if not fields:
+            return dict(record)
+        return {field: record.get(field, False) for field in ["id", *fields]}
+
+    def _authenticate(self, database, username, password, _user_agent_env):
+        self._sleep()
+        if database == DATABASE and username == USERNAME and password == PASSWORD:
+            return UID
+        return False
+
+    def _execute_kw(self, database, uid, password, model, method, args, kwargs=None):
+        self._sleep()
+        kwargs = kwargs or {}
+        if database != DATABASE or uid != UID or password != PASSWORD:
+            raise Exception("Access denied")
+        if model != "product.template":
+            raise Exception(f"Unknown model '{model}'")
+        if method == "search":
+            return [record["id"] for record in self._search(args[0], kwargs.get("offset", 0), kwargs.get("limit"),
+                                                             kwargs.get("order"))]
+        if method == "search_count":
+            return len(self._search(args[0]))
+        if method == "search_read":
+            records = self._search(args[0], kwargs.get("offset", 0), kwargs.get("limit"), kwargs.get("order"))
+            return [self._get_fields(record, kwargs.get("fields")) for record in records]
+        if method == "read":
+            with self._lock:
+                records = [self._records[record_id] for record_id in args[0] if record_id in self._records]
+            return [self._get_fields(record, kwargs.get("fields")) for record in records]
+        raise Exception(f"Unknown method '{method}'")
+
+    def _sleep(self):
+        with self._lock:
+            self._calls += 1
+        if self._delay > 0:
+            time.sleep(self._delay)
+
+    ##########
+    # Public #
+    ##########
+
+    def start(self):
+        common = SimpleXMLRPCDispatcher(allow_none=True)
+        common.register_function(lambda: {"server_version": "17.0"}, "version")
+        common.register_function(self._authenticate, "authenticate")
+        models = SimpleXMLRPCDispatcher(allow_none=True)
+        models.register_function(self._execute_kw, "execute_kw")
+        self._server = _Server(("127.0.0.1", self._port), _RequestHandler, logRequests=False)
+        self._server.add_dispatcher("/xmlrpc/2/common", common)
+        self._server.add_dispatcher("/xmlrpc/2/object", models)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def get_config(self):
+        """
+        Returns the configuration for connecting to the server, the same as the content of erp_connect.json.
+        """
+        return {
+            "url": f"http://127.0.0.1:{self._server.server_address[1]}",
+            "database": DATABASE,
+            "username": USERNAME,
+            "password": PASSWORD
+        }
+
+    def get_calls(self):
+        """
+        Returns the number of calls to the server.
+        """
+        return self._calls
+
+    def add_record(self, name, default_code, category=CATEGORIES[0]):
+        with self._lock:
+            record_id = max(self._records, default=0) + 1
+            self._add_record(record_id, name, default_code, category)
+        return record_id
+
+    def update_record(self, record_id, **values):
+        with self._lock:
+            self._last_search = (None, None)
+            self._records[record_id].update(values)
+            self._records[record_id]["write_date"] = self._next_write_date()
+
+    def delete_record(self, record_id):
+        with self._lock:
+            self._last_search = (None, None)
+            self._records.pop(record_id)
+
+
+if __name__ == "__main__":
+
+    _server = FakeErpServer(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, port=8069)
+    _server.start()
+    print("ERP stand-in running, configuration:", _server.get_config())
+    try:
+        _server._thread.join()
+    except KeyboardInterrupt:
+        _server.stop()
@@ -0,0 +1,224 @@
+"""
+Stand-in for kicad-cli, for testing the design processing without KiCad installed.
+
+Supports the commands used by KiCadCli and writes small dummy output files. The time KiCad needs for starting and
+loading a design is simulated, so the difference between separate commands and a jobset can be measured.
+Use it by setting KiCadCli.CLI_EXE to the path of this script.
+kicad-cli silently ignores unknown settings in a jobset, so a jobset fails if it does not have the structure of the
+reference jobset (REFERENCE_JOBSET): the settings keys of each job type, the type of each settings value and the keys
+of the outputs. The reference jobset is written after the KiCad 9 job definitions, replace it with a jobset that is
+saved by KiCad (with all job types) to check the jobsets against KiCad itself.
+
+Environment variables:
+FAKE_KICAD_CLI_VERSION: the reported KiCad version, default 9.0.1, jobsets are not supported before version 9
+FAKE_KICAD_CLI_DELAY:   multiplier for the simulated times, default 1.0
+FAKE_KICAD_CLI_FAIL:    job types that fail (comma separated), a failed export creates an empty output folder
+"""
+
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+
+VERSION = os.environ.get("FAKE_KICAD_CLI_VERSION", "9.0.1")
+DELAY = float(os.environ.get("FAKE_KICAD_CLI_DELAY", "1.0"))
+FAIL = os.environ.get("FAKE_KICAD_CLI_FAIL", "").split(",")
+
+# Simulated times in seconds
+STARTUP_TIME = 0.3
+LOAD_TIME = 0.4
+EXPORT_TIME = {"pcb_export_3d": 1.0, "pcb_export_odb": 0.3}
+DEFAULT_EXPORT_TIME = 0.1
+
+# kicad-cli command: jobset job type
+COMMANDS = {
+    "sch export pdf": "sch_export_plot_pdf",
+    "sch export bom": "sch_export_bom",
+    "pcb export gerbers": "pcb_export_gerbers",
+    "pcb export drill": "pcb_export_drill",
+    "pcb export pos": "pcb_export_pos",
+    "pcb export pdf": "pcb_export_pdf",
+    "pcb export odb": "pcb_export_odb",
+    "pcb export step": "pcb_export_3d"
+}
+# Jobset with all settings of each job type and the settings of an output, the jobsets to run are checked with it
+REFERENCE_JOBSET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference.kicad_jobset")
+VALUE_OPTIONS = ["--output", "--fields", "--group-by", "--field-delimiter", "--layers", "--drill-origin", "--side",
+                 "--format", "--units", "--drill-shape-opt", "--compression", "--file"]
+
+COMPONENTS = [
+    {"Reference": "R1-R3", "Value": "10k", "Footprint": "lily_footprints:res_0805", "QUANTITY": "3",
+     "Manufacturer": "Yageo", "Manufacturer_ID": "RC0805FR-0710KL", "Lily_ID": "10000-00001", "JLCPCB_ID": "C84376"},
+    {"Reference": "C1", "Value": "100nF", "Footprint": "lily_footprints:cap_0603", "QUANTITY": "1",
+     "Manufacturer": "Yageo", "Manufacturer_ID": "CC0603KRX7R9BB104", "Lily_ID": "10001-00001",
+     "JLCPCB_ID": "C14663"}
+]
+POSITIONS = [
+    {"Ref": "C1", "Val": "100nF", "Package": "cap_0603", "PosX": "10.0000", "PosY": "20.0000", "Rot": "0.0000",
+     "Side": "top"},
+    {"Ref": "R1", "Val": "10k", "Package": "res_0805", "PosX": "12.3450", "PosY": "20.0000", "Rot": "90.0000",
+     "Side": "top"}
+]
+
+
+def _read_reference():
+    # Returns the settings of the jobs by type and the keys of an output
+    with open(REFERENCE_JOBSET, "r") as fp:
+        reference = json.load(fp)
+    return {job["type"]: job["settings"] for job in reference["jobs"]}, set(reference["outputs"][0])
+
+
+def _check_job(job, reference_settings):
+    # Returns the errors of the settings, the numbers can be integers or floats
+    errors = []
+    for key, value in job["settings"].items():
+        if key not in reference_settings:
+            errors.append(f"unknown setting '{key}'")
+            continue
+        expected = reference_settings[key]
+        if isinstance(expected, bool) or isinstance(value, bool):
+            is_valid = isinstance(expected, bool) and isinstance(value, bool)
+        elif isinstance(expected, (int, float)):
+            is_valid = isinstance(value, (int, float))
+        else:
+            is_valid = isinstance(value, type(expected))
+        if not is_valid:
+            errors.append(f"setting '{key}' is {type(value).__name__}, expected {type(expected).__name__}")
+    return errors
+
+
+def _sleep(duration):
+    time.sleep(duration * DELAY)
+
+
+def _write_file(filename, content):
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    with open(filename, "w", newline="") as fp:
+        fp.write(content)
+
+
+def _write_csv(filename, field_names, records, delimiter=","):
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    with open(filename, "w", newline="", encoding="utf-8") as fp:
+        writer = csv.DictWriter(fp, field_names, delimiter=delimiter, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def _export(job_type, output, settings):
+    _sleep(EXPORT_TIME.get(job_type, DEFAULT_EXPORT_TIME))
+    if job_type in FAIL:
+        if job_type in ("pcb_export_gerbers", "pcb_export_drill"):
+            os.makedirs(output, exist_ok=True)
+        print(f"Failed to export {job_type}", file=sys.stderr)
+        return False
+    if job_type == "sch_export_bom":
+        field_names = [re.sub(r"^\$\{(.*)}$", r"\1", field) for field in settings["fields"]]
+        _write_csv(output, field_names, COMPONENTS, settings.get("field_delimiter", ","))
+    elif job_type == "pcb_export_pos":
+        _write_csv(output, list(POSITIONS[0].keys()), POSITIONS)
+    elif job_type == "pcb_export_gerbers":
+        for layer in settings["layers"]:
+            _write_file(os.path.join(output, f"fake-{layer.replace(".", "_")}.gbr"), f"G04 {layer}*\n")
+    elif job_type == "pcb_export_drill":
+        for name in ("PTH", "NPTH"):
+            _write_file(os.path.join(output, f"fake-{name}.drl"), f"; {name}\n")
+    else:
+        _write_file(output, f"{job_type}\n")
+    print(f"Exported {job_type}: {output}")
+    return True
+
+
+def _parse_command(args):
+    options = {}
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] in VALUE_OPTIONS:
+            options[args[i]] = args[i + 1]
+            i += 1
+        elif args[i].startswith("--"):
+            options[args[i]] = True
+        else:
+            positional.append(args[i])
+        i += 1
+    return options, positional
+
+
+def _run_command(args):
+    command = " ".join(args[:3])
+    if command not in COMMANDS:
+        print(f"Unknown command: {" ".join(args)}", file=sys.stderr)
+        return 1
+    options, positional = _parse_command(args[3:])
+    if len(positional) != 1 or not os.path.isfile(positional[0]):
+        print("Input file does not exist", file=sys.stderr)
+        return 1
+    _sleep(LOAD_TIME)
+    settings = {
+        "fields": options.get("--fields", "").split(","),
+        "field_delimiter": options.get("--field-delimiter", ","),
+        "layers": options.get("--layers", "").split(",")
+    }
+    return 0 if _export(COMMANDS[command], options["--output"], settings) else 1
+
+
+def _run_jobset(args):
+    if int(VERSION.split(".")[0]) < 9:
+        print(f"Unknown command: {" ".join(args)}", file=sys.stderr)
+        return 1
+    options, positional = _parse_command(args[2:])
+    if len(positional) != 1 or not os.path.isfile(positional[0]):
+        print("Project file does not exist", file=sys.stderr)
+        return 1
+    with open(options["--file"], "r") as fp:
+        jobset = json.load(fp)
+    job_settings, output_keys = _read_reference()
+    for job in jobset["jobs"]:
+        if job["type"] not in job_settings:
+            print(f"Unknown job type: {job["type"]}", file=sys.stderr)
+            return 1
+        errors = _check_job(job, job_settings[job["type"]])
+        if len(errors) > 0:
+            print(f"Job type {job["type"]}: {", ".join(errors)}", file=sys.stderr)
+            return 1
+    for output in jobset["outputs"]:
+        if set(output) != output_keys:
+            print(f"Output '{output.get("description", "")}' does not have the keys: {", ".join(sorted(output_keys))}",
+                  file=sys.stderr)
+            return 1
+    for output in jobset["outputs"]:
+        loaded = set()
+        for job in filter(lambda x: x["id"] in output["only"], jobset["jobs"]):
+            # The schematics and the layout are loaded only once
+            kind = job["type"].split("_")[0]
+            if kind not in loaded:
+                _sleep(LOAD_TIME)
+                loaded.add(kind)
+            settings = {
+                "fields": job["settings"].get("fields_ordered", []),
+                "field_delimiter": job["settings"].get("field_delimiter", ","),
+                "layers": job["settings"].get("layers", [])
+            }
+            if not _export(job["type"], os.path.join(output["settings"]["output_path"],
+                                                     job["settings"]["output_filename"]), settings):
+                return 1
+    return 0
+
+
+def main(args):
+    _sleep(STARTUP_TIME)
+    if args == ["version"]:
+        print(VERSION)
+        return 0
+    if args[:2] == ["jobset", "run"]:
+        return _run_jobset(args)
+    return _run_command(args)
+
+
+if __name__ == "__main__":
+
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,108 @@
+"""
+Tests for generating product IDs, for the three product ID schemes in product_categories.json.
+Run with: python -m unittest toolbox.tests.test_product_ids
+"""
+
+import unittest
+
+from toolbox.models.product_categories import ProductCategories
+from toolbox.models.product_id_allocator import ProductIdAllocator
+
+
+class TestSequenceScheme(unittest.TestCase):
+
+    # 1xxxx: connectors 1910-1xxxx
+
+    def setUp(self):
+        self.categories = ProductCategories()
+
+    def test_no_existing_codes(self):
+        self.assertEqual("1910-10001", self.categories.generate_next_code("connectors", [], "", ""))
+
+    def test_first_gap(self):
+        codes = ["1910-10001", "1910-10002", "1910-10004", "1910-10007"]
+        self.assertEqual("1910-10003", self.categories.generate_next_code("connectors", codes, "", ""))
+
+    def test_no_gap(self):
+        codes = [f"1910-{number}" for number in range(10001, 10501)]
+        self.assertEqual("1910-10501", self.categories.generate_next_code("connectors", codes, "", ""))
+
+    def test_other_codes_are_ignored(self):
+        codes = ["1910-10001", "1911-10002", "1910-1002", "1910-1000x", "1910-00002", False]
+        self.assertEqual("1910-10002", self.categories.generate_next_code("connectors", codes, "", ""))
+
+    def test_all_used(self):
+        codes = [f"1910-{number}" for number in range(10001, 100000)]
+        self.assertEqual("", self.categories.generate_next_code("connectors", codes, "", ""))
+
+    def test_next_codes(self):
+        codes = ["1910-10001", "1910-10002", "1910-10004", "1910-10007"]
+        self.assertEqual(["1910-10005", "1910-10006"], self.categories.generate_next_codes("connectors", codes, 2))
+        self.assertEqual(["1910-10008", "1910-10009", "1910-10010"],
+                         self.categories.generate_next_codes("connectors", codes, 3))
+
+    def test_allocate_marks_used(self):
+        allocator = ProductIdAllocator("1910-1xxxx", ["1910-10001", "1910-10003"])
+        self.assertEqual(["1910-10002"], allocator.allocate())
+        self.assertTrue(allocator.is_used("1910-10002"))
+        self.assertEqual(["1910-10004", "1910-10005"], allocator.allocate(2))
+        self.assertEqual("1910-10006", allocator.get_next_code())
+
+    def test_allocate_too_many(self):
+        allocator = ProductIdAllocator("1910-1xxxx", [f"1910-{number}" for number in range(10001, 99990)])
+        self.assertEqual(10, len(allocator.allocate(10)))
+        self.assertRaises(Exception, allocator.allocate)
+
+
+class TestSequenceVersionScheme(unittest.TestCase):
+
+    # 1xxyy: fabricated PCB 2910-1xxyy
+
+    def setUp(self):
+        self.categories = ProductCategories()
+
+    def test_no_existing_codes(self):
+        self.assertEqual("2910-10101", self.categories.generate_next_code("fabricated PCB", [], "", ""))
+
+    def test_base_with_other_version_is_used(self):
+        codes = ["2910-10101", "2910-10102", "2910-10202", "2910-10401"]
+        self.assertEqual("2910-10301", self.categories.generate_next_code("fabricated PCB", codes, "", ""))
+
+    def test_next_codes(self):
+        codes = ["2910-10101", "2910-10102", "2910-10201", "2910-10401"]
+        self.assertEqual(["2910-10501", "2910-10601"],
+                         self.categories.generate_next_codes("fabricated PCB", codes, 2))
+
+    def test_all_used(self):
+        codes = [f"2910-{base:03d}03" for base in range(101, 1000)]
+        self.assertEqual("", self.categories.generate_next_code("fabricated PCB", codes, "", ""))
+
+    def test_no_sequence_number(self):
+        self.assertRaises(Exception, ProductIdAllocator, "1912-value", [])
+
+
+class TestValueScheme(unittest.TestCase):
+
+    # value: resistors 1913-value, capacitors 1912-value
+
+    def setUp(self):
+        self.categories = ProductCategories()
+
+    def test_resistor(self):
+        self.assertEqual("1913-14703", self.categories.generate_next_code("resistors", [], "1, 0805 1% 125mW", "4k7"))
+
+    def test_resistor_below_one(self):
+        self.assertEqual("1913-20470", self.categories.generate_next_code("resistors", [], "2, MF25 1% 150mW", "0R47"))
+
+    def test_capacitor(self):
+        self.assertEqual("1912-31005",
+                         self.categories.generate_next_code("capacitors", [], "3, 0805 C0G/NP0 5%", "100n"))
+
+    def test_already_exists(self):
+        self.assertEqual("already exist",
+                         self.categories.generate_next_code("resistors", ["1913-14703"], "1, 0805 1% 125mW", "4k7"))
+
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -20,11 +20,11 @@ class ViewCheckLibrary(wx.Panel):
         self._tree.AppendColumn("Checks", self._FIRST_COL_WIDTH)
         self._tree.AppendColumn("Result")
 
-        btn_run_checks = wx.Button(self, IdManager.ID_BTN_CHECK, "Run checks")
+        self._btn_run_checks = wx.Button(self, IdManager.ID_BTN_CHECK, "Run checks")
 
         sizer = wx.BoxSizer(wx.VERTICAL)
         sizer.Add(self._tree, 1, wx.EXPAND | wx.ALL, self._GAP)
-        sizer.Add(btn_run_checks, 0, wx.ALL, self._GAP)
+        sizer.Add(self._btn_run_checks, 0, wx.ALL, self._GAP)
 
         self.SetSizer(sizer)
 
@@ -54,6 +54,9 @@ class ViewCheckLibrary(wx.Panel):
                 break
             item = self._tree.GetNextItem(item)
 
+    def set_running(self, is_running):
+        self._btn_run_checks.SetLabel("Cancel checks" if is_running else "Run checks")
+
 
 if __name__ == "__main__":
 